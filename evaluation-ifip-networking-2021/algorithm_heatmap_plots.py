@@ -25,37 +25,34 @@
 
 This module handles all plotting related evaluation.
 """
+import hashlib
+import importlib
 import itertools
+import json
+import logging
+import multiprocessing
 import os
+import shutil
 import sys
 from collections import namedtuple
 from itertools import combinations, product
 from time import gmtime, strftime
 import copy
-
-from matplotlib.colors import LogNorm
+import csv
 
 try:
     import pickle as pickle
 except ImportError:
     import pickle
 
-import matplotlib
-matplotlib.use('Agg')
-matplotlib.rcParams['pdf.fonttype'] = 42
-matplotlib.rcParams['ps.fonttype'] = 42
-import matplotlib.patheffects as PathEffects
-import matplotlib.patches as mpatches
-from matplotlib import gridspec
 import yaml
-from matplotlib import font_manager
-import matplotlib.lines as mlines
-import matplotlib.pyplot as plt
 import numpy as np
 
 from alib import solutions, util
 from vnep_approx import vine, treewidth_model
 from evaluation_acm_ccr_2019 import plot_data
+from evaluation_acm_ccr_2019.metric_cube import MetricCube
+from evaluation_acm_ccr_2019.tracing import tracer, traced, dispatch_traced
 
 REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
 
@@ -66,8 +63,61 @@ FONTSIZE_INNER = 10.5
 
 ROUND_RESULTS_TO_INTEGERS = True
 
+# in non-paper mode, heatmaps are drawn using a single mesh and batched cell annotations instead of one stroked text
+# artist per cell (see render_single_heatmap); paper mode always uses the exact styling
+FAST_HEATMAP_RENDERING_IN_NON_PAPER_MODE = True
+
 logger = util.get_logger(__name__, make_file=False, propagate=True)
 
+#: output filetypes for which only the extracted plot data is written, without creating any figures
+DATA_EXPORT_FILETYPES = ("npz", "json")
+# CSV file in the output path to which the compared profits of the latency study are written
+COMPARISON_DIAGNOSTICS_FILENAME = "comparison_diagnostics.csv"
+
+#: name of the directory below the output path storing previously rendered plots by the digest of their render job
+RENDER_CACHE_DIRECTORY_NAME = ".render_cache"
+#: must be increased whenever the rendering changes without the render jobs' data changing
+RENDER_CACHE_VERSION = 1
+
+
+def import_matplotlib_module(module_name):
+    """ Imports the given matplotlib (sub-)module after configuring matplotlib for non-interactive use.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    matplotlib.rcParams['pdf.fonttype'] = 42
+    matplotlib.rcParams['ps.fonttype'] = 42
+    importlib.import_module("matplotlib.pyplot")
+    return importlib.import_module(module_name)
+
+
+class LazyModule(object):
+    """ Placeholder for a matplotlib module, which is only imported once one of its attributes is accessed.
+
+    This way, matplotlib is never imported when only the plot data is exported (see DATA_EXPORT_FILETYPES).
+    """
+
+    def __init__(self, module_name):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, name):
+        if self._module is None:
+            self._module = import_matplotlib_module(self._module_name)
+        return getattr(self._module, name)
+
+
+matplotlib = LazyModule("matplotlib")
+PathEffects = LazyModule("matplotlib.patheffects")
+mpatches = LazyModule("matplotlib.patches")
+gridspec = LazyModule("matplotlib.gridspec")
+font_manager = LazyModule("matplotlib.font_manager")
+mlines = LazyModule("matplotlib.lines")
+mcollections = LazyModule("matplotlib.collections")
+mtextpath = LazyModule("matplotlib.textpath")
+mtransforms = LazyModule("matplotlib.transforms")
+plt = LazyModule("matplotlib.pyplot")
+
 
 class HeatmapPlotType(object):
     ViNE = 0  # a plot only for OfflineViNEResult data
@@ -261,14 +311,10 @@ class AbstractHeatmapSpecificationVineFactory(object):
 
 
 def compute_aggregated_mean(list_of_aggregated_data, debug=False):
-    mean = 0.0
-    value_count = 0
-    for agg in list_of_aggregated_data:
-        mean += agg.mean * agg.value_count
-        value_count += agg.value_count
+    merged = plot_data.merge_list_of_aggregated_data(list_of_aggregated_data)
     if debug:
-        print((len(list_of_aggregated_data), value_count, mean/value_count))
-    return mean / value_count
+        print((len(list_of_aggregated_data), merged.value_count, merged.mean))
+    return merged.mean
 
 
 
@@ -704,21 +750,31 @@ def extractProfits(solution):
 
     return profits
 
-def _comparison_profit_best_relative_latency_study(baseline_result, with_latency_result, baseline_settings_list, with_latency_settings_list):
+def _best_profit_rr(rr_result, rr_settings_list):
+    return max([rr_result.profits[rr_settings].max for rr_settings in rr_settings_list])
 
-    # best_baseline = max([extractProfits(baseline_result)[rr_settings].max for rr_settings in baseline_settings_list])
-    # best_with_latency = max([extractProfits(with_latency_result)[rr_settings].max for rr_settings in with_latency_settings_list])
 
-    best_baseline = max([baseline_result.profits[rr_settings].max for rr_settings in baseline_settings_list])
-    best_with_latency = max([with_latency_result.profits[rr_settings].max for rr_settings in with_latency_settings_list])
+def _relative_profit_latency_study(best_baseline, best_with_latency):
+    """ Vectorized: the profits of the executions with latencies in percent of the profits of the baseline. """
+    best_baseline = np.asarray(best_baseline, dtype=float)
+    best_with_latency = np.asarray(best_with_latency, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(best_baseline == 0, 0.0, 100 * best_with_latency / best_baseline)
+
 
-    res = 0 if best_baseline == 0 else 100 * best_with_latency / best_baseline
+def _absolute_profit_difference_latency_study(best_baseline, best_with_latency):
+    """ Vectorized: the profits of the baseline minus the profits of the executions with latencies. """
+    return np.asarray(best_baseline, dtype=float) - np.asarray(best_with_latency, dtype=float)
+
+
+def _comparison_profit_best_relative_latency_study(baseline_result, with_latency_result, baseline_settings_list, with_latency_settings_list):
 
-    with open("_latency_results.txt", "a") as f:
-        f.write("{:^15.4f}     {:^15.4f}    ->    {:^15.4f}".format(best_baseline, best_with_latency, res))
-        f.write("\n")
+    # best_baseline = max([extractProfits(baseline_result)[rr_settings].max for rr_settings in baseline_settings_list])
+    # best_with_latency = max([extractProfits(with_latency_result)[rr_settings].max for rr_settings in with_latency_settings_list])
 
-    return 0 if best_baseline == 0 else 100 * best_with_latency / best_baseline
+    best_baseline = _best_profit_rr(baseline_result, baseline_settings_list)
+    best_with_latency = _best_profit_rr(with_latency_result, with_latency_settings_list)
+    return float(_relative_profit_latency_study(best_baseline, best_with_latency))
 
 
 def _comparison_profit_absolute(vine_result, rr_result, vine_settings_list, rr_settings_list):
@@ -729,8 +785,8 @@ def _comparison_profit_absolute(vine_result, rr_result, vine_settings_list, rr_s
 def _comparison_profit_absolute_latency_study(baseline_result, with_latency_result, baseline_settings_list, with_latency_settings_list):
     # best_baseline = max([extractProfits(baseline_result)[baseline_settings].max for baseline_settings in baseline_settings_list])
     # best_with_latency = max([extractProfits(with_latency_result)[with_latency_settings].max for with_latency_settings in with_latency_settings_list])
-    best_baseline = max([baseline_result.profits[rr_settings].max for rr_settings in baseline_settings_list])
-    best_with_latency = max([with_latency_result.profits[rr_settings].max for rr_settings in with_latency_settings_list])
+    best_baseline = _best_profit_rr(baseline_result, baseline_settings_list)
+    best_with_latency = _best_profit_rr(with_latency_result, with_latency_settings_list)
     return best_baseline - best_with_latency
     # return with_latency_result - baseline_result
 
@@ -784,7 +840,27 @@ class HSF_Comp_BestProfit(AbstractHeatmapSpecificationVineVsRandRoundFactory):
                                                                                                                                rr_settings_list)
     )
 
-class HSF_Comp_LatencyApproximationQuality(AbstractHeatmapSpecificationVineVsRandRoundFactory):
+class AbstractHeatmapSpecificationLatencyStudyComparisonFactory(AbstractHeatmapSpecificationVineVsRandRoundFactory):
+    """ Comparisons of the baseline with the results with latencies. Besides the lookup function on pairs of results,
+        the specifications provide the best profit of either result as metric specification on single results and
+        a vectorized combine function of these, such that the metric cube can evaluate whole columns of pairs.
+    """
+
+    @classmethod
+    def get_hs(cls, baseline_settings_list, with_latency_settings_list, name):
+        result = super(AbstractHeatmapSpecificationLatencyStudyComparisonFactory, cls).get_hs(
+            baseline_settings_list, with_latency_settings_list, name)
+        result['pair_metric_specifications'] = (
+            dict(lookup_function=lambda baseline_result: _best_profit_rr(baseline_result, baseline_settings_list),
+                 profit_reduction=("max", baseline_settings_list, np.max)),
+            dict(lookup_function=lambda with_latency_result: _best_profit_rr(with_latency_result,
+                                                                             with_latency_settings_list),
+                 profit_reduction=("max", with_latency_settings_list, np.max)),
+        )
+        return result
+
+
+class HSF_Comp_LatencyApproximationQuality(AbstractHeatmapSpecificationLatencyStudyComparisonFactory):
     prototype = dict(
         name="avg. Latency Value",
         filename="latency_approx_quality",
@@ -793,6 +869,7 @@ class HSF_Comp_LatencyApproximationQuality(AbstractHeatmapSpecificationVineVsRan
         colorbar_ticks=[x for x in range(0, 401, 100)],
         cmap="Reds",
         plot_type=HeatmapPlotType.ComparisonLatencyBaseline,
+        combine_function=_relative_profit_latency_study,
         lookup_function=lambda baseline_result, with_latency_result, baseline_settings_list,
                                with_latency_settings_list: _comparison_profit_best_relative_latency_study(baseline_result,
                                                                                                           with_latency_result,
@@ -800,7 +877,7 @@ class HSF_Comp_LatencyApproximationQuality(AbstractHeatmapSpecificationVineVsRan
                                                                                                           with_latency_settings_list)
     )
 
-class HSF_Comp_BestProfitLatencyStudy(AbstractHeatmapSpecificationVineVsRandRoundFactory):
+class HSF_Comp_BestProfitLatencyStudy(AbstractHeatmapSpecificationLatencyStudyComparisonFactory):
     prototype = dict(
         name="Relative profit: % of baseline",
         filename="comparison_baseline_with_latencies",
@@ -809,6 +886,7 @@ class HSF_Comp_BestProfitLatencyStudy(AbstractHeatmapSpecificationVineVsRandRoun
         colorbar_ticks=[x for x in range(0, 121, 20)],
         cmap="Reds",
         plot_type=HeatmapPlotType.ComparisonLatencyBaseline,
+        combine_function=_relative_profit_latency_study,
         lookup_function=lambda baseline_result, with_latency_result, baseline_settings_list,
                                with_latency_settings_list: _comparison_profit_best_relative_latency_study(baseline_result,
                                                                                                           with_latency_result,
@@ -816,7 +894,7 @@ class HSF_Comp_BestProfitLatencyStudy(AbstractHeatmapSpecificationVineVsRandRoun
                                                                                                           with_latency_settings_list)
     )
 
-class HSF_Comp_AbsoluteLatencyStudy(AbstractHeatmapSpecificationVineVsRandRoundFactory):
+class HSF_Comp_AbsoluteLatencyStudy(AbstractHeatmapSpecificationLatencyStudyComparisonFactory):
     prototype = dict(
         name="Absolute Profit: With Latencies vs. Baseline",
         filename="absolute_profit_comp",
@@ -825,6 +903,7 @@ class HSF_Comp_AbsoluteLatencyStudy(AbstractHeatmapSpecificationVineVsRandRoundF
         colorbar_ticks=[x for x in range(0, 101, 20)],
         cmap="Reds",
         plot_type=HeatmapPlotType.ComparisonLatencyBaseline,
+        combine_function=_absolute_profit_difference_latency_study,
         lookup_function=lambda baseline_result, with_latency_result, baseline_settings_list,
                                with_latency_settings_list: _comparison_profit_absolute_latency_study(
             baseline_result,
@@ -1260,47 +1339,16 @@ def extract_latency_parameters(algorithm_parameter_list, filter_exec_params=None
     return lat_params
 
 def find_scenarios_for_params(solution_container, algorithm_id, lat_params):
-
-    lat_scenarios = dict()
-
-    for key, valueList in list(lat_params.items()):
-        valueDict = {}
-        for value in valueList:
-            valueDict[value] = set()
-        lat_scenarios[key] = valueDict
-
-    container = solution_container.algorithm_scenario_solution_dictionary[algorithm_id]
-    exec_param_container = solution_container.execution_parameter_container.get_execution_ids(ALG_ID=algorithm_id)
-
-    exec_id_lookup = solution_container.execution_parameter_container.reverse_lookup['ReducedRandRoundSepLPOptDynVMPCollectionResult']['ALGORITHM_PARAMETERS']
-
-    for scenario_id in range(len(container)):
-
-        print(scenario_id)
-
-        # print ['latency_approximation_factor']
-        # exit()
-        #
-        #
-        # scenario_parameters = solution_container.retrieve_scenario_parameters_for_index(scenario_id)
-        # print scenario_parameters
-        #
-        # for execution_id in exec_param_container.get_execution_ids(ALG_ID=algorithm_id):
-        #
-        #     container = exec_param_container.algorithm_parameter_list[execution_id]['ALGORITHM_PARAMETERS']
-        #
-        #     print container
-        #     exit()
-        #
-        #
-        #         # if exec passt zu scenario id:
-        #
-        #         lat_scenarios[key][container[key]].add(scenario_id)
-
-    exit()
-
-    return lat_scenarios
-
+    """ Returns for each latency parameter and each of its values the set of scenario ids for which an execution of
+        the algorithm with this value exists (see ScenarioExecutionParameterIndex).
+    """
+    scenario_parameter_index = ScenarioParameterIndex(
+        solution_container.scenario_parameter_container.scenario_parameter_dict,
+        solution_container.algorithm_scenario_solution_dictionary[algorithm_id].keys())
+    index = ScenarioExecutionParameterIndex(scenario_parameter_index, solution_container.execution_parameter_container,
+                                            algorithm_id)
+    return {key: {value: index.get_scenario_ids(index.get_mask(key, value)) for value in values}
+            for key, values in lat_params.items()}
 
 
 def extract_generation_parameters(scenario_parameter_dict, scenario_id):
@@ -1363,12 +1411,447 @@ def lookup_scenario_parameter_room_dicts_on_path(scenario_parameter_space_dict,
     return dicts_on_path
 
 
+def _collect_scenario_id_sets(scenario_parameter_space_dict, path, scenario_id_sets):
+    for key, value in scenario_parameter_space_dict.items():
+        if isinstance(value, set):
+            scenario_id_sets[(path, key)] = value
+        elif isinstance(value, dict):
+            _collect_scenario_id_sets(value, path + (key,), scenario_id_sets)
+        elif isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            _collect_scenario_id_sets(value[0], path + (key,), scenario_id_sets)
+
+
+class ScenarioParameterIndex(object):
+    """ One-time index of a scenario parameter dict, mapping each (path, value) to a boolean mask over the scenario ids.
+
+        Paths are given as returned by extract_parameter_range; as in lookup_scenarios_having_specific_values, only
+        the string elements of a path are considered. Masks of different parameters can then be intersected with
+        a vectorized AND instead of walking the nested dictionaries and intersecting sets for every heatmap cell.
+    """
+
+    def __init__(self, scenario_parameter_space_dict, scenario_ids=()):
+        scenario_id_sets = {}
+        _collect_scenario_id_sets(scenario_parameter_space_dict, (), scenario_id_sets)
+
+        all_scenario_ids = set(scenario_ids)
+        for scenario_id_set in scenario_id_sets.values():
+            all_scenario_ids.update(scenario_id_set)
+        self.scenario_ids = np.array(sorted(all_scenario_ids), dtype=np.int64)
+        self._positions = {scenario_id: position for position, scenario_id in enumerate(self.scenario_ids.tolist())}
+        self._masks = {key: self.get_mask_of_scenario_ids(scenario_id_set)
+                       for key, scenario_id_set in scenario_id_sets.items()}
+
+    def get_mask_of_scenario_ids(self, scenario_ids):
+        mask = np.zeros(len(self.scenario_ids), dtype=bool)
+        mask[[self._positions[scenario_id] for scenario_id in scenario_ids if scenario_id in self._positions]] = True
+        return mask
+
+    def get_mask(self, path, value):
+        key = (tuple(element for element in path if isinstance(element, str)), value)
+        if key not in self._masks:
+            return np.zeros(len(self.scenario_ids), dtype=bool)
+        return self._masks[key]
+
+    def get_scenario_ids(self, mask):
+        return set(self.scenario_ids[mask].tolist())
+
+
+class ScenarioExecutionParameterIndex(object):
+    """ One-time index over all (scenario_id, exec_id) pairs of an algorithm, in which generation parameters (e.g.
+        topology) and execution parameters (e.g. latency_approximation_limit) are both first-class query axes.
+
+        Each (parameter name, value) is mapped to a boolean mask over the pairs, which are ordered by scenario id and
+        then by execution id. Any combination of axes and filters is hence selected by AND-ing masks, regardless of
+        whether the parameters stem from the scenario generation or from the algorithm execution.
+    """
+
+    def __init__(self, scenario_parameter_index, execution_parameter_container, algorithm_id):
+        self.execution_ids_of_algorithm = np.array(
+            sorted(execution_parameter_container.get_execution_ids(ALG_ID=algorithm_id)), dtype=np.int64)
+        number_of_scenarios = len(scenario_parameter_index.scenario_ids)
+        number_of_executions = len(self.execution_ids_of_algorithm)
+        self.scenario_ids = np.repeat(scenario_parameter_index.scenario_ids, number_of_executions)
+        self.exec_ids = np.tile(self.execution_ids_of_algorithm, number_of_scenarios)
+        self._scenario_parameter_index = scenario_parameter_index
+        self._execution_positions = {exec_id: position for position, exec_id in
+                                     enumerate(self.execution_ids_of_algorithm.tolist())}
+
+        # masks over the scenarios resp. the executions, which are broadcast over the pairs on demand
+        self._generation_parameter_masks = {}
+        for (path, value), scenario_mask in scenario_parameter_index._masks.items():
+            if len(path) < 3:
+                # the set of all scenarios of a generation strategy
+                continue
+            value_masks = self._generation_parameter_masks.setdefault(path[-1], {})
+            if value in value_masks:
+                value_masks[value] = value_masks[value] | scenario_mask
+            else:
+                value_masks[value] = scenario_mask
+
+        self._execution_parameter_masks = {}
+        for exec_id in self.execution_ids_of_algorithm.tolist():
+            algorithm_parameters = execution_parameter_container.algorithm_parameter_list[exec_id]['ALGORITHM_PARAMETERS']
+            for parameter, value in algorithm_parameters.items():
+                try:
+                    hash(value)
+                except TypeError:
+                    continue
+                if parameter in self._generation_parameter_masks:
+                    raise ValueError("Parameter {} is both a generation and an execution parameter.".format(parameter))
+                value_masks = self._execution_parameter_masks.setdefault(parameter, {})
+                if value not in value_masks:
+                    value_masks[value] = np.zeros(number_of_executions, dtype=bool)
+                value_masks[value][self._execution_positions[exec_id]] = True
+
+        self._masks = {}
+
+    def is_generation_parameter(self, parameter):
+        return parameter in self._generation_parameter_masks
+
+    def is_execution_parameter(self, parameter):
+        return parameter in self._execution_parameter_masks
+
+    def get_mask(self, parameter, value):
+        key = (parameter, value)
+        if key not in self._masks:
+            if parameter in self._generation_parameter_masks:
+                self._masks[key] = self._broadcast_scenario_mask(
+                    self._generation_parameter_masks[parameter].get(value, self._empty_scenario_mask()))
+            elif parameter in self._execution_parameter_masks:
+                self._masks[key] = self._broadcast_execution_mask(
+                    self._execution_parameter_masks[parameter].get(value, self._empty_execution_mask()))
+            else:
+                raise ValueError("Parameter {} is neither a generation nor an execution parameter.".format(parameter))
+        return self._masks[key]
+
+    def get_mask_of_scenario_ids(self, scenario_ids):
+        return self._broadcast_scenario_mask(self._scenario_parameter_index.get_mask_of_scenario_ids(scenario_ids))
+
+    def get_mask_of_execution_ids(self, exec_ids):
+        execution_mask = self._empty_execution_mask()
+        execution_mask[[self._execution_positions[exec_id] for exec_id in exec_ids
+                        if exec_id in self._execution_positions]] = True
+        return self._broadcast_execution_mask(execution_mask)
+
+    def get_pairs(self, mask):
+        return list(zip(self.scenario_ids[mask].tolist(), self.exec_ids[mask].tolist()))
+
+    def get_scenario_ids(self, mask):
+        return set(self.scenario_ids[mask].tolist())
+
+    def get_execution_ids(self, mask):
+        return set(self.exec_ids[mask].tolist())
+
+    def _empty_scenario_mask(self):
+        return np.zeros(len(self._scenario_parameter_index.scenario_ids), dtype=bool)
+
+    def _empty_execution_mask(self):
+        return np.zeros(len(self.execution_ids_of_algorithm), dtype=bool)
+
+    def _broadcast_scenario_mask(self, scenario_mask):
+        return np.repeat(scenario_mask, len(self.execution_ids_of_algorithm))
+
+    def _broadcast_execution_mask(self, execution_mask):
+        return np.tile(execution_mask, len(self._scenario_parameter_index.scenario_ids))
+
+
+class BaselineSolutionPairTable(object):
+    """ Join of the baseline results with the results with latencies, built by a comparing LatencyStudyPlotter on its
+        first lookup of pairs: each row of the ScenarioExecutionParameterIndex of the results with latencies, i.e. each
+        (scenario_id, exec_id), is aligned with the baseline result of the same scenario. Pairs of any mask over the
+        index are then obtained without looking up the storages. Executions missing in either storage are skipped.
+
+        Raises a RuntimeError if the storages do not cover the same scenarios.
+    """
+
+    def __init__(self, baseline_solution_storage, solution_storage, algorithm_id, baseline_execution_id, index):
+        baseline_solutions_by_scenario = baseline_solution_storage.algorithm_scenario_solution_dictionary[algorithm_id]
+        solutions_by_scenario = solution_storage.algorithm_scenario_solution_dictionary[algorithm_id]
+        scenarios_without_baseline = set(solutions_by_scenario.keys()) - set(baseline_solutions_by_scenario.keys())
+        scenarios_without_latencies = set(baseline_solutions_by_scenario.keys()) - set(solutions_by_scenario.keys())
+        if scenarios_without_baseline or scenarios_without_latencies:
+            raise RuntimeError("The baseline and the results with latencies do not cover the same scenarios: "
+                               "no baseline for scenarios {}, no results with latencies for scenarios {}.".format(
+                                    sorted(scenarios_without_baseline), sorted(scenarios_without_latencies)))
+
+        self.index = index
+        self.baseline_solutions = []
+        self.solutions = []
+        # rows lacking the result with latencies or the baseline result, e.g. of partially finished or filtered
+        # storages, are not paired
+        self.has_pair = np.zeros(len(index.scenario_ids), dtype=bool)
+        for row, (scenario_id, exec_id) in enumerate(zip(index.scenario_ids.tolist(), index.exec_ids.tolist())):
+            baseline_solution = baseline_solutions_by_scenario.get(scenario_id, {}).get(baseline_execution_id)
+            solution = solutions_by_scenario.get(scenario_id, {}).get(exec_id)
+            self.has_pair[row] = baseline_solution is not None and solution is not None
+            self.baseline_solutions.append(baseline_solution)
+            self.solutions.append(solution)
+
+    def get_pairs(self, mask):
+        """ Returns the (baseline result, result with latencies) pairs of the rows selected by the mask. All consumers,
+            i.e. the pair metric specifications and the ComparisonDiagnosticsSink, rely on this order.
+        """
+        return [(self.baseline_solutions[row], self.solutions[row])
+                for row in np.flatnonzero(mask & self.has_pair).tolist()]
+
+
+class ComparisonDiagnosticsSink(object):
+    """ Collects the best profits of the baseline and of the results with latencies of all compared pairs of an
+        evaluation together with their ratio, and writes them once as CSV into the output path (see
+        COMPARISON_DIAGNOSTICS_FILENAME). A pair contained in several cells is recorded once per algorithm variant.
+    """
+
+    columns = ("alg_variant", "scenario_id", "exec_id", "baseline_profit", "with_latency_profit", "ratio")
+
+    def __init__(self):
+        self._rows = {}
+
+    def add(self, metric_specification, pairs, metric_cube):
+        # as in the metric cube, pairs of solutions are identified by their exact type
+        if not pairs or type(pairs[0]) is not tuple or 'pair_metric_specifications' not in metric_specification:
+            return
+        baseline_specification, with_latency_specification = metric_specification['pair_metric_specifications']
+        baseline_profits = metric_cube.get_values(baseline_specification, [pair[0] for pair in pairs])
+        with_latency_profits = metric_cube.get_values(with_latency_specification, [pair[1] for pair in pairs])
+        ratios = np.atleast_1d(_relative_profit_latency_study(baseline_profits, with_latency_profits)).tolist()
+        scenario_ids, exec_ids = metric_cube.get_scenario_and_exec_ids([pair[1] for pair in pairs])
+        for scenario_id, exec_id, baseline_profit, with_latency_profit, ratio in zip(
+                scenario_ids, exec_ids, baseline_profits, with_latency_profits, ratios):
+            self._rows[(metric_specification['alg_variant'], scenario_id, exec_id)] = (
+                baseline_profit, with_latency_profit, ratio)
+
+    def write(self, output_path):
+        """ Writes the collected rows and returns the filename or None if no pairs were compared. """
+        if not self._rows:
+            return None
+        if not os.path.exists(output_path):
+            os.makedirs(output_path)
+        filename = os.path.join(output_path, COMPARISON_DIAGNOSTICS_FILENAME)
+        with open(filename, "w") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(self.columns)
+            for key in sorted(self._rows):
+                writer.writerow(key + self._rows[key])
+        return filename
+
+
+def _normalize_filter_specifications(filter_specifications):
+    if not filter_specifications:
+        return ()
+    normalized = []
+    for filter_specification in filter_specifications:
+        value = filter_specification['value']
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        normalized.append((filter_specification['parameter'], value))
+    return tuple(sorted(normalized, key=repr))
+
+
+class ScenarioSelectionCache(object):
+    """ Caches the scenario masks selected by filter specifications of a plotter, keyed by the normalized filter
+        specification. As the masks only depend on the plotter's results and the filter, they are shared across the
+        cells, metrics and axes of its plots. The cache is owned by the plotter, such that its masks are released
+        together with it.
+    """
+
+    def __init__(self):
+        self._masks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_mask(self, filter_specifications, compute_mask_function):
+        key = _normalize_filter_specifications(filter_specifications)
+        mask = self._masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            return mask
+        self.misses += 1
+        mask = compute_mask_function(filter_specifications)
+        self._masks[key] = mask
+        return mask
+
+    def clear(self):
+        self._masks.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_statistics(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._masks)}
+
+
 def load_reduced_pickle(reduced_pickle):
     with open(reduced_pickle, "rb") as f:
         data = pickle.load(f)
     return data
 
 
+def show_and_or_save_plots(output_path, filename, save_plot, show_plot, perform_tight_layout=True,
+                           additional_output_files=()):
+    """ Shows and / or saves the current figure. Besides filename, the figure is saved to all (output_path, filename)
+        tuples of additional_output_files, e.g. to store the same figure in several formats.
+    """
+    if perform_tight_layout:
+        plt.tight_layout()
+    if save_plot:
+        plt.tight_layout(pad=0)
+        for output_path, filename in [(output_path, filename)] + list(additional_output_files):
+            os.makedirs(output_path, exist_ok=True)
+            print(("saving plot: {}".format(filename)))
+            with tracer.span("savefig", category="plot", filename=filename):
+                plt.savefig(filename)
+    if show_plot:
+        plt.show()
+
+    plt.close()
+
+
+def normalize_output_filetypes(output_filetype):
+    """ Returns the list of output filetypes given either as single filetype or as list of filetypes.
+    """
+    if isinstance(output_filetype, str):
+        output_filetypes = [output_filetype]
+    else:
+        output_filetypes = list(output_filetype)
+    if not output_filetypes:
+        raise ValueError("At least one output filetype must be given")
+    if len(set(filetype in DATA_EXPORT_FILETYPES for filetype in output_filetypes)) > 1:
+        raise ValueError("The data export filetypes {} cannot be combined with figure filetypes, got {}".format(
+            DATA_EXPORT_FILETYPES, output_filetypes))
+    return output_filetypes
+
+
+def get_output_files(render_job):
+    """ Returns the list of (output_path, filename) tuples to which the render job writes.
+    """
+    return [(render_job['output_path'], render_job['filename'])] + list(render_job['additional_output_files'])
+
+
+def summarize_observed_values(observed_values):
+    """ Returns the minimum, mean and maximum of the given values, ignoring NaNs (all NaN if there are none).
+    """
+    observed_values = np.asarray(observed_values, dtype=np.float64)
+    observed_values = observed_values[~np.isnan(observed_values)]
+    if observed_values.size == 0:
+        return float("nan"), float("nan"), float("nan")
+    return float(observed_values.min()), float(observed_values.mean()), float(observed_values.max())
+
+
+def write_plot_data(output_path, filename, plot_data):
+    """ Writes the given dict of arrays, lists and scalars to filename: as JSON file if filename ends with .json
+        and as (uncompressed) NPZ file otherwise.
+    """
+    if not os.path.exists(output_path):
+        os.makedirs(output_path)
+    print(("saving plot data: {}".format(filename)))
+    if filename.endswith(".json"):
+        with open(filename, "w") as f:
+            json.dump({key: (value.tolist() if isinstance(value, np.ndarray) else value)
+                       for key, value in plot_data.items()}, f, indent=2)
+    else:
+        with open(filename, "wb") as f:
+            np.savez(f, **{key: np.asarray(value) for key, value in plot_data.items()})
+
+
+# entries of render jobs which do not influence the contents of the rendered file
+_RENDER_JOB_KEYS_NOT_AFFECTING_OUTPUT = ("render_function", "output_path", "filename", "additional_output_files",
+                                         "save_plot", "show_plot", "render_cache_path")
+
+
+def _update_render_job_digest(digest, value):
+    if isinstance(value, np.ndarray):
+        digest.update("ndarray:{}:{}:".format(value.dtype.str, value.shape).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update("dict:{}:".format(len(value)).encode())
+        for key, entry in value.items():
+            _update_render_job_digest(digest, key)
+            _update_render_job_digest(digest, entry)
+    elif isinstance(value, (list, tuple)):
+        digest.update("{}:{}:".format(type(value).__name__, len(value)).encode())
+        for entry in value:
+            _update_render_job_digest(digest, entry)
+    else:
+        representation = repr(value).encode()
+        digest.update("{}:".format(len(representation)).encode())
+        digest.update(representation)
+
+
+def compute_render_job_digest(render_job):
+    """ Computes a digest of everything determining the files created by the render job besides their filetype: the
+        extracted data (e.g. the heatmap's cells), the parts of the metric and axes specifications used for rendering
+        (titles, color map, value range, ...), the paper mode and the render function.
+    """
+    digest = hashlib.sha1()
+    render_function = render_job['render_function']
+    _update_render_job_digest(digest, (RENDER_CACHE_VERSION,
+                                       render_function.__module__,
+                                       render_function.__name__))
+    for key in sorted(render_job):
+        if key not in _RENDER_JOB_KEYS_NOT_AFFECTING_OUTPUT:
+            _update_render_job_digest(digest, key)
+            _update_render_job_digest(digest, render_job[key])
+    return digest.hexdigest()
+
+
+def execute_render_job(render_job):
+    """ Executes the given render job and returns whether the result was copied from the render cache.
+
+    If the render job specifies a render_cache_path, the files are only rendered if the cache does not contain files
+    of the same filetypes created by a render job having the same digest (see compute_render_job_digest). Newly
+    rendered files are added to the cache.
+    """
+    with tracer.span("render plot", category="plot", filename=render_job['filename']):
+        return _execute_render_job(render_job)
+
+
+def _execute_render_job(render_job):
+    render_cache_path = render_job.get('render_cache_path')
+    if render_cache_path is None or not render_job['save_plot'] or render_job['show_plot']:
+        render_job['render_function'](render_job)
+        return False
+
+    digest = compute_render_job_digest(render_job)
+    output_files = [(output_path, filename, os.path.join(render_cache_path, digest + os.path.splitext(filename)[1]))
+                    for output_path, filename in get_output_files(render_job)]
+    if all(os.path.exists(cached_filename) for _, _, cached_filename in output_files):
+        for output_path, filename, cached_filename in output_files:
+            os.makedirs(output_path, exist_ok=True)
+            logger.debug("Copying {} from render cache entry {}".format(filename, cached_filename))
+            shutil.copyfile(cached_filename, filename)
+        return True
+
+    render_job['render_function'](render_job)
+    os.makedirs(render_cache_path, exist_ok=True)
+    for _, filename, cached_filename in output_files:
+        # copy to a temporary file first, so that concurrently executed render jobs never see partially written entries
+        temporary_filename = "{}.{}.tmp".format(cached_filename, os.getpid())
+        shutil.copyfile(filename, temporary_filename)
+        os.replace(temporary_filename, cached_filename)
+    return False
+
+
+def run_render_jobs(render_jobs, number_of_jobs=1):
+    """ Renders the given render jobs, i.e. dicts created by the plotters' collect_render_jobs, which contain the
+        already extracted plot data together with the module-level function rendering them. Using more than one job,
+        the rendering is distributed across a pool of number_of_jobs processes.
+    """
+    if number_of_jobs < 1:
+        raise ValueError("The number of jobs must be at least 1, got {}".format(number_of_jobs))
+    logger.info("Rendering {} plots using {} processes".format(len(render_jobs), number_of_jobs))
+    if number_of_jobs == 1 or len(render_jobs) <= 1:
+        copied_from_cache = [execute_render_job(render_job) for render_job in render_jobs]
+    else:
+        pool = multiprocessing.Pool(processes=number_of_jobs)
+        try:
+            copied_from_cache = list(dispatch_traced(pool.imap_unordered, execute_render_job, render_jobs))
+        finally:
+            pool.close()
+            pool.join()
+    logger.info("{} of {} plots were copied from the render cache".format(sum(copied_from_cache), len(render_jobs)))
+
+
 class AbstractPlotter(object):
     ''' Abstract Plotter interface providing functionality used by the majority of plotting classes of this module.
     '''
@@ -1388,7 +1871,9 @@ class AbstractPlotter(object):
                  filter_exec_params=None,
                  ):
         self.output_path = output_path
-        self.output_filetype = output_filetype
+        # all plots are saved in each of the output filetypes; the paths are constructed for the first one by default
+        self.output_filetypes = normalize_output_filetypes(output_filetype)
+        self.output_filetype = self.output_filetypes[0]
         self.scenario_solution_storage = scenario_solution_storage
         self.second_solution_storage = second_solution_storage
 
@@ -1398,6 +1883,19 @@ class AbstractPlotter(object):
         self.scenario_parameter_dict = self.scenario_solution_storage.scenario_parameter_container.scenario_parameter_dict
         self.scenarioparameter_room = self.scenario_solution_storage.scenario_parameter_container.scenarioparameter_room
         self.all_scenario_ids = set(scenario_solution_storage.algorithm_scenario_solution_dictionary[self.algorithm_id].keys())
+        self.scenario_parameter_index = ScenarioParameterIndex(self.scenario_parameter_dict, self.all_scenario_ids)
+        self.all_scenario_mask = self.scenario_parameter_index.get_mask_of_scenario_ids(self.all_scenario_ids)
+        # ScenarioExecutionParameterIndex of each solution storage, built on first use
+        self._solution_indices = {}
+
+        # metric values of the solutions of the plotter's storages (see metric_cube.MetricCube); as the cube is owned
+        # by the plotter, it does not keep the storages alive beyond the evaluation
+        self.metric_cube = MetricCube()
+        self.metric_cube.add_solution_storage(self.scenario_solution_storage, self.algorithm_id)
+        for storage in (self.second_solution_storage or []):
+            self.metric_cube.add_solution_storage(storage, self.algorithm_id)
+        # scenario masks of the filter specifications (see ScenarioSelectionCache)
+        self.scenario_selection_cache = ScenarioSelectionCache()
 
         lat_params = extract_latency_parameters(
             scenario_solution_storage.execution_parameter_container.algorithm_parameter_list,
@@ -1420,6 +1918,8 @@ class AbstractPlotter(object):
         else:
             self.forbidden_scenario_ids = forbidden_scenario_ids
         self.paper_mode = paper_mode
+        # directory of the render cache (see execute_render_job) or None if plots shall always be rendered
+        self.render_cache_path = None
 
     def _construct_output_path_and_filename(self, title, filter_specifications=None):
         filter_spec_path = ""
@@ -1436,45 +1936,70 @@ class AbstractPlotter(object):
         filename = os.path.join(output_path, title + "_" + filter_filename)
         return output_path, filename
 
-    def _construct_path_and_filename_for_filter_spec(self, filter_specifications):
+    def _construct_path_and_filename_for_filter_spec(self, filter_specifications, output_filetype=None):
+        if output_filetype is None:
+            output_filetype = self.output_filetype
         filter_path = ""
         filter_filename = ""
         for spec in filter_specifications:
             filter_path = os.path.join(filter_path, (spec['parameter'] + "_" + str(spec['value'])))
             filter_filename += spec['parameter'] + "_" + str(spec['value']) + "_"
-        filter_filename = filter_filename[:-1] + "." + self.output_filetype
+        filter_filename = filter_filename[:-1] + "." + output_filetype
         return filter_path, filter_filename
 
-    def _obtain_scenarios_based_on_filters(self, filter_specifications=None):
-        allowed_scenario_ids = set(self.all_scenario_ids)
+    def _obtain_scenario_mask_based_on_filters(self, filter_specifications=None):
+        return self.scenario_selection_cache.get_mask(filter_specifications,
+                                                      self._compute_scenario_mask_based_on_filters)
+
+    def _compute_scenario_mask_based_on_filters(self, filter_specifications=None):
+        allowed_scenario_mask = self.all_scenario_mask
         sps = self.scenarioparameter_room
-        spd = self.scenario_parameter_dict
         if filter_specifications:
             for filter_specification in filter_specifications:
                 filter_path, _ = extract_parameter_range(sps, filter_specification['parameter'])
-                filter_indices = lookup_scenarios_having_specific_values(spd, filter_path,
-                                                                         filter_specification['value'])
-                allowed_scenario_ids = allowed_scenario_ids & filter_indices
+                allowed_scenario_mask = allowed_scenario_mask & self.scenario_parameter_index.get_mask(
+                    filter_path, filter_specification['value'])
 
-        return allowed_scenario_ids
+        return allowed_scenario_mask
+
+    def _obtain_scenarios_based_on_filters(self, filter_specifications=None):
+        return self.scenario_parameter_index.get_scenario_ids(
+            self._obtain_scenario_mask_based_on_filters(filter_specifications))
 
     def _obtain_scenarios_based_on_axis(self, axis_path, axis_value):
-        spd = self.scenario_parameter_dict
-        return lookup_scenarios_having_specific_values(spd, axis_path, axis_value)
+        return self.scenario_parameter_index.get_scenario_ids(
+            self.scenario_parameter_index.get_mask(axis_path, axis_value))
+
+    def _get_solution_index(self, solution_storage=None):
+        """ Returns the ScenarioExecutionParameterIndex of the given solution storage (default: the plotted one). """
+        if solution_storage is None:
+            solution_storage = self.scenario_solution_storage
+        if id(solution_storage) not in self._solution_indices:
+            if solution_storage is self.scenario_solution_storage:
+                scenario_parameter_index = self.scenario_parameter_index
+            else:
+                scenario_parameter_index = ScenarioParameterIndex(
+                    solution_storage.scenario_parameter_container.scenario_parameter_dict,
+                    solution_storage.algorithm_scenario_solution_dictionary[self.algorithm_id].keys())
+            # the storage is referenced by the entry, such that its id cannot be reused
+            self._solution_indices[id(solution_storage)] = (solution_storage, ScenarioExecutionParameterIndex(
+                scenario_parameter_index, solution_storage.execution_parameter_container, self.algorithm_id))
+        return self._solution_indices[id(solution_storage)][1]
+
+    def _is_execution_parameter(self, parameter):
+        return self._get_solution_index().is_execution_parameter(parameter)
+
+    def _obtain_scenarios_based_on_parameter(self, parameter, value):
+        """ Returns the scenario ids having the value of the given generation parameter or all scenario ids if the
+            parameter is an execution parameter.
+        """
+        index = self._get_solution_index()
+        if index.is_execution_parameter(parameter):
+            return self.all_scenario_ids
+        return index.get_scenario_ids(index.get_mask(parameter, value))
 
     def _show_and_or_save_plots(self, output_path, filename, perform_tight_layout=True):
-        if perform_tight_layout:
-            plt.tight_layout()
-        if self.save_plot:
-            if not os.path.exists(output_path):
-                os.makedirs(output_path)
-            print(("saving plot: {}".format(filename)))
-            plt.tight_layout(pad=0)
-            plt.savefig(filename)
-        if self.show_plot:
-            plt.show()
-
-        plt.close()
+        show_and_or_save_plots(output_path, filename, self.save_plot, self.show_plot, perform_tight_layout)
 
     def plot_figure(self, filter_specifications):
         raise RuntimeError("This is an abstract method")
@@ -1540,11 +2065,15 @@ class SingleHeatmapPlotter(AbstractPlotter):
 
     def _construct_output_path_and_filename(self, metric_specification,
                                             heatmap_axes_specification,
-                                            filter_specifications=None):
+                                            filter_specifications=None,
+                                            output_filetype=None):
+        if output_filetype is None:
+            output_filetype = self.output_filetype
         filter_spec_path = ""
-        filter_filename = "no_filter.{}".format(self.output_filetype)
+        filter_filename = "no_filter.{}".format(output_filetype)
         if filter_specifications:
-            filter_spec_path, filter_filename = self._construct_path_and_filename_for_filter_spec(filter_specifications)
+            filter_spec_path, filter_filename = self._construct_path_and_filename_for_filter_spec(filter_specifications,
+                                                                                                  output_filetype)
 
         base = os.path.normpath(self.output_path)
         date = strftime("%Y-%m-%d", gmtime())
@@ -1552,9 +2081,9 @@ class SingleHeatmapPlotter(AbstractPlotter):
         sub_param_string = metric_specification['alg_variant']
 
         if sub_param_string is not None:
-            output_path = os.path.join(base, date, self.output_filetype, axes_foldername, sub_param_string, filter_spec_path)
+            output_path = os.path.join(base, date, output_filetype, axes_foldername, sub_param_string, filter_spec_path)
         else:
-            output_path = os.path.join(base, date, self.output_filetype, axes_foldername, filter_spec_path)
+            output_path = os.path.join(base, date, output_filetype, axes_foldername, filter_spec_path)
 
         fname = "__".join(str(x) for x in [
             metric_specification['filename'],
@@ -1568,10 +2097,24 @@ class SingleHeatmapPlotter(AbstractPlotter):
             for metric_specfication in self.list_of_metric_specifications:
                 self.plot_single_heatmap_general(metric_specfication, axes_specification, filter_specifications)
 
+    def collect_render_jobs(self, filter_specifications):
+        render_jobs = []
+        for axes_specification in self.list_of_axes_specifications:
+            for metric_specfication in self.list_of_metric_specifications:
+                render_job = self.extract_single_heatmap_data(metric_specfication, axes_specification,
+                                                              filter_specifications)
+                if render_job is not None:
+                    render_jobs.append(render_job)
+        return render_jobs
+
 
     def _read_from_solution_dicts(self, solution_dicts, exec_id):
         return
 
+    def _record_compared_solutions(self, metric_specification, solutions):
+        """ Called with the solutions of each cell; plotters comparing pairs of solutions may record these. """
+        return
+
     def _lookup_solutions(self, scenario_ids, solution_storage=None, useSecond=False):
 
         container = solution_storage
@@ -1595,6 +2138,23 @@ class SingleHeatmapPlotter(AbstractPlotter):
         #         return None
         return result
 
+    def _select_scenario_execution_mask(self, solution_storage, scenario_ids, x_key, x_val, y_key, y_val):
+        """ Returns the mask of the (scenario_id, exec_id) pairs of the given scenarios matching both axes values and
+            the execution id filter, where the axes may be generation as well as execution parameters.
+        """
+        index = self._get_solution_index(solution_storage)
+        mask = (index.get_mask_of_scenario_ids(scenario_ids) &
+                index.get_mask(x_key, x_val) &
+                index.get_mask(y_key, y_val) &
+                index.get_mask_of_execution_ids(self.execution_id_filter))
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Using Exec_IDS: {}".format(index.get_execution_ids(mask)))
+            logger.debug("Using Scenarios: {}".format(index.get_scenario_ids(mask)))
+
+        return mask
+
+    @traced("lookup solutions")
     def _lookup_solutions_by_execution(self, scenario_ids, x_key, x_val, y_key, y_val, solution_container_in=None):
 
         container = solution_container_in
@@ -1602,33 +2162,10 @@ class SingleHeatmapPlotter(AbstractPlotter):
         if solution_container_in is None:
             container = self.scenario_solution_storage
 
-        try:
-            x_axis_exec_ids = self.exec_id_lookup[x_key][x_val]
-        except KeyError:
-            x_axis_exec_ids = container.execution_parameter_container.get_execution_ids(ALG_ID=self.algorithm_id)
-            path_x_axis, _ = extract_parameter_range(self.scenario_parameter_dict, x_key)
-            x_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_x_axis, x_val)
-            scenario_ids = scenario_ids & x_axis_scenarios
-
-        try:
-            y_axis_exec_ids = self.exec_id_lookup[y_key][y_val]
-        except KeyError:
-            y_axis_exec_ids = container.execution_parameter_container.get_execution_ids(ALG_ID=self.algorithm_id)
-            path_y_axis, _ = extract_parameter_range(self.scenario_parameter_dict, y_key)
-            y_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_y_axis, y_val)
-            scenario_ids = scenario_ids & y_axis_scenarios
-
-        exec_ids_to_consider = x_axis_exec_ids & y_axis_exec_ids & self.execution_id_filter
-
-        # except KeyError as e:
-        #     print "key not found, ", e
-        #     return self._lookup_solutions(scenario_ids)
-
-        print(("Using Exec_IDS: ", exec_ids_to_consider))
-        print(("Using Scenarios: ", scenario_ids))
-
-        solution_dicts = [container.get_solutions_by_scenario_index(x) for x in scenario_ids]
-        results = [solution[self.algorithm_id][exec_id] for solution in solution_dicts for exec_id in exec_ids_to_consider]
+        mask = self._select_scenario_execution_mask(container, scenario_ids, x_key, x_val, y_key, y_val)
+        solutions_by_scenario = container.algorithm_scenario_solution_dictionary[self.algorithm_id]
+        results = [solutions_by_scenario[scenario_id][exec_id] for scenario_id, exec_id in
+                   self._get_solution_index(container).get_pairs(mask)]
         return results
 
 
@@ -1636,20 +2173,35 @@ class SingleHeatmapPlotter(AbstractPlotter):
                                     heatmap_metric_specification,
                                     heatmap_axes_specification,
                                     filter_specifications=None):
-        # data extraction
+        render_job = self.extract_single_heatmap_data(heatmap_metric_specification,
+                                                      heatmap_axes_specification,
+                                                      filter_specifications)
+        if render_job is not None:
+            execute_render_job(render_job)
+
+    @traced("extract heatmap data", category="plot")
+    def extract_single_heatmap_data(self,
+                                    heatmap_metric_specification,
+                                    heatmap_axes_specification,
+                                    filter_specifications=None):
+        """ Extracts the data of a single heatmap and returns it as render job (see render_single_heatmap), or None
+            if the heatmap shall not be generated.
+        """
 
         sps = self.scenarioparameter_room
-        spd = self.scenario_parameter_dict
 
-        output_path, filename = self._construct_output_path_and_filename(heatmap_metric_specification,
-                                                                         heatmap_axes_specification,
-                                                                         filter_specifications)
+        output_files = [self._construct_output_path_and_filename(heatmap_metric_specification,
+                                                                 heatmap_axes_specification,
+                                                                 filter_specifications,
+                                                                 output_filetype)
+                        for output_filetype in self.output_filetypes]
+        output_path, filename = output_files[0]
 
         logger.debug("output_path is {};\t filename is {}".format(output_path, filename))
 
-        if not self.overwrite_existing_files and os.path.exists(filename):
+        if not self.overwrite_existing_files and all(os.path.exists(filename) for _, filename in output_files):
             logger.info("Skipping generation of {} as this file already exists".format(filename))
-            return
+            return None
 
         # check if filter specification conflicts with axes specification
         if filter_specifications is not None:
@@ -1657,7 +2209,7 @@ class SingleHeatmapPlotter(AbstractPlotter):
                 if (heatmap_axes_specification['x_axis_parameter'] == filter_specification['parameter'] or
                         heatmap_axes_specification['y_axis_parameter'] == filter_specification['parameter']):
                     logger.debug("Skipping generation of {} as the filter specification conflicts with the axes specification.")
-                    return
+                    return None
 
         path_x_axis, xaxis_parameters = extract_parameter_range(
             sps,
@@ -1674,6 +2226,8 @@ class SingleHeatmapPlotter(AbstractPlotter):
 
         # all heatmap values will be stored in X
         X = np.zeros((len(yaxis_parameters), len(xaxis_parameters)), dtype=np.int32 if ROUND_RESULTS_TO_INTEGERS else np.float32)
+        # number of values from which each square's mean was computed
+        value_counts = np.zeros((len(yaxis_parameters), len(xaxis_parameters)), dtype=np.int32)
         column_labels = [l for l in yaxis_parameters]
         row_labels = [l for l in xaxis_parameters]
 
@@ -1693,27 +2247,30 @@ class SingleHeatmapPlotter(AbstractPlotter):
         max_number_of_observed_values = 0
         observed_values = np.empty(0)
 
+        index = self.scenario_parameter_index
+        allowed_scenario_mask = (self._obtain_scenario_mask_based_on_filters(filter_specifications) &
+                                 ~index.get_mask_of_scenario_ids(self.forbidden_scenario_ids))
+        x_axis_is_execution_parameter = self._is_execution_parameter(heatmap_axes_specification['x_axis_parameter'])
+        y_axis_is_execution_parameter = self._is_execution_parameter(heatmap_axes_specification['y_axis_parameter'])
+
         for x_index, x_val in enumerate(xaxis_parameters):
             # all scenario indices which has x_val as xaxis parameter (e.g. node_resource_factor = 0.5
 
-            if path_x_axis[-1][:7] != "latency":
-                scenario_ids_matching_x_axis = lookup_scenarios_having_specific_values(spd, path_x_axis, x_val)
+            # execution parameters (e.g. latency_approximation_limit) are selected by _lookup_solutions_by_execution
+            if x_axis_is_execution_parameter:
+                scenario_mask_matching_x_axis = self.all_scenario_mask
             else:
-                scenario_ids_matching_x_axis = self.all_scenario_ids
-                # if self.heatmap_plot_type not in [HeatmapPlotType.LatencyStudy, HeatmapPlotType.ComparisonLatencyBaseline] \
+                scenario_mask_matching_x_axis = index.get_mask(path_x_axis, x_val)
 
             for y_index, y_val in enumerate(yaxis_parameters):
-                if path_x_axis[-1][:7] != "latency":
-                    scenario_ids_matching_y_axis = lookup_scenarios_having_specific_values(spd, path_y_axis, y_val)
+                if y_axis_is_execution_parameter:
+                    scenario_mask_matching_y_axis = self.all_scenario_mask
                 else:
-                    scenario_ids_matching_y_axis = self.all_scenario_ids
-                # if self.heatmap_plot_type not in [HeatmapPlotType.LatencyStudy, HeatmapPlotType.ComparisonLatencyBaseline] \
-                #     else set([i for i in range(len(self.scenario_solution_storage.algorithm_scenario_solution_dictionary[self.algorithm_id]))])
+                    scenario_mask_matching_y_axis = index.get_mask(path_y_axis, y_val)
 
-                filter_indices = self._obtain_scenarios_based_on_filters(filter_specifications)
-                scenario_ids_to_consider = (scenario_ids_matching_x_axis &
-                                            scenario_ids_matching_y_axis &
-                                            filter_indices) - self.forbidden_scenario_ids
+                scenario_ids_to_consider = index.get_scenario_ids(scenario_mask_matching_x_axis &
+                                                                  scenario_mask_matching_y_axis &
+                                                                  allowed_scenario_mask)
 
                 if self.heatmap_plot_type in [HeatmapPlotType.LatencyStudy, HeatmapPlotType.ComparisonLatencyBaseline]:
                     solutions = self._lookup_solutions_by_execution(scenario_ids_to_consider, heatmap_axes_specification['x_axis_parameter'], x_val, heatmap_axes_specification['y_axis_parameter'], y_val)
@@ -1723,8 +2280,8 @@ class SingleHeatmapPlotter(AbstractPlotter):
                 # for solution in solutions:
                 #     print solution
 
-                values = [heatmap_metric_specification['lookup_function'](solution)
-                          for solution in solutions]
+                values = self.metric_cube.get_values(heatmap_metric_specification, solutions)
+                self._record_compared_solutions(heatmap_metric_specification, solutions)
 
                 if self.second_solution_storage is not None:
                     print (" --- extract from secondary result --- ")
@@ -1735,7 +2292,8 @@ class SingleHeatmapPlotter(AbstractPlotter):
                             second_solutions = self._lookup_solutions_by_execution(scenario_ids_to_consider, heatmap_axes_specification['x_axis_parameter'], x_val, heatmap_axes_specification['y_axis_parameter'], y_val, storage)
                         else:
                             second_solutions = self._lookup_solutions(scenario_ids_to_consider, storage)
-                        second_values = [ heatmap_metric_specification['lookup_function'](solution) for solution in second_solutions]
+                        second_values = self.metric_cube.get_values(heatmap_metric_specification, second_solutions)
+                        self._record_compared_solutions(heatmap_metric_specification, second_solutions)
 
                         if summed_second_values is None:
                             summed_second_values = second_values
@@ -1748,6 +2306,7 @@ class SingleHeatmapPlotter(AbstractPlotter):
                     values = [value for value in values if heatmap_metric_specification['metric_filter'](value)]
 
                 observed_values = np.append(observed_values, values)
+                value_counts[y_index, x_index] = len(values)
 
                 if len(values) < min_number_of_observed_values:
                     min_number_of_observed_values = len(values)
@@ -1771,9 +2330,8 @@ class SingleHeatmapPlotter(AbstractPlotter):
             solution_count_string = "between {} and {} values per square".format(min_number_of_observed_values,
                                                                                  max_number_of_observed_values)
 
-        fig, ax = plt.subplots(figsize=FIGSIZE)
         if self.paper_mode:
-            ax.set_title(heatmap_metric_specification['name'], fontsize=FONTSIZE_HEADLINE) # todo: former 17
+            title = heatmap_metric_specification['name']
         else:
             title = heatmap_metric_specification['name'] + "\n"
             title += heatmap_metric_specification['alg_variant'] + "\n"
@@ -1784,12 +2342,114 @@ class SingleHeatmapPlotter(AbstractPlotter):
                                                                      np.nanmean(observed_values),
                                                                      np.nanmax(observed_values))
 
-            ax.set_title(title)
+        if self.output_filetype in DATA_EXPORT_FILETYPES:
+            render_function = export_single_heatmap_data
+        else:
+            render_function = render_single_heatmap
+
+        return dict(
+            render_function=render_function,
+            output_path=output_path,
+            filename=filename,
+            additional_output_files=output_files[1:],
+            save_plot=self.save_plot,
+            show_plot=self.show_plot,
+            render_cache_path=self.render_cache_path,
+            paper_mode=self.paper_mode,
+            fast_rendering=not self.paper_mode and FAST_HEATMAP_RENDERING_IN_NON_PAPER_MODE,
+            title=title,
+            X=X,
+            value_counts=value_counts,
+            observed_values_summary=summarize_observed_values(observed_values),
+            column_labels=column_labels,
+            row_labels=row_labels,
+            name=heatmap_metric_specification['name'],
+            cmap=heatmap_metric_specification['cmap'],
+            vmin=heatmap_metric_specification['vmin'],
+            vmax=heatmap_metric_specification['vmax'],
+            colorbar_ticks=heatmap_metric_specification['colorbar_ticks'],
+            x_axis_title=heatmap_axes_specification['x_axis_title'],
+            y_axis_title=heatmap_axes_specification['y_axis_title'],
+        )
+
+
+def export_single_heatmap_data(render_job):
+    """ Writes the data extracted by SingleHeatmapPlotter.extract_single_heatmap_data instead of rendering it.
+
+    Note that the row labels denote the columns of X (x axis) while the column labels denote its rows (y axis).
+    """
+    observed_min, observed_mean, observed_max = render_job['observed_values_summary']
+    heatmap_data = dict(
+        X=render_job['X'],
+        value_counts=render_job['value_counts'],
+        row_labels=[str(label) for label in render_job['row_labels']],
+        column_labels=[str(label) for label in render_job['column_labels']],
+        observed_min=observed_min,
+        observed_mean=observed_mean,
+        observed_max=observed_max,
+        title=render_job['title'],
+        name=render_job['name'],
+        x_axis_title=render_job['x_axis_title'],
+        y_axis_title=render_job['y_axis_title'],
+    )
+    for output_path, filename in get_output_files(render_job):
+        write_plot_data(output_path, filename, heatmap_data)
 
+
+def _annotate_heatmap_cells_batched(fig, ax, X):
+    """ Annotates each cell of the heatmap with its value, using two path collections (black outline and white fill)
+        of pre-computed text paths instead of one stroked text artist per cell.
+    """
+    font_properties = font_manager.FontProperties(family="monospace")
+    centered_text_paths = {}
+    paths = []
+    offsets = []
+    for x_index in range(X.shape[1]):
+        for y_index in range(X.shape[0]):
+            label = str(X[y_index, x_index])
+            if label not in centered_text_paths:
+                text_path = mtextpath.TextPath((0, 0), label, size=FONTSIZE_INNER, prop=font_properties)
+                extents = text_path.get_extents()
+                centered_text_paths[label] = text_path.transformed(mtransforms.Affine2D().translate(
+                    -extents.x0 - extents.width / 2.0, -extents.y0 - extents.height / 2.0))
+            paths.append(centered_text_paths[label])
+            offsets.append((x_index + .5, y_index + .5))
+
+    # the text paths are given in points and are placed at the cells' centers
+    points_to_pixels = mtransforms.Affine2D().scale(fig.dpi / 72.0)
+    for facecolor, edgecolor, linewidth in [("k", "k", 3), ("w", "none", 0)]:
+        ax.add_collection(mcollections.PathCollection(paths,
+                                                      offsets=offsets,
+                                                      transOffset=ax.transData,
+                                                      transform=points_to_pixels,
+                                                      facecolors=facecolor,
+                                                      edgecolors=edgecolor,
+                                                      linewidths=linewidth))
+
+
+def render_single_heatmap(render_job):
+    """ Renders a heatmap from the data extracted by SingleHeatmapPlotter.extract_single_heatmap_data.
+    """
+    X = render_job['X']
+
+    fig, ax = plt.subplots(figsize=FIGSIZE)
+    if render_job['paper_mode']:
+        ax.set_title(render_job['title'], fontsize=FONTSIZE_HEADLINE) # todo: former 17
+    else:
+        ax.set_title(render_job['title'])
+
+    if render_job['fast_rendering']:
+        heatmap = ax.pcolormesh(X,
+                                cmap=render_job['cmap'],
+                                vmin=render_job['vmin'],
+                                vmax=render_job['vmax'],
+                                )
+        _annotate_heatmap_cells_batched(fig, ax, X)
+    else:
         heatmap = ax.pcolor(X,
-                            cmap=heatmap_metric_specification['cmap'],
-                            vmin=heatmap_metric_specification['vmin'],
-                            vmax=heatmap_metric_specification['vmax'],
+                            cmap=render_job['cmap'],
+                            vmin=render_job['vmin'],
+                            vmax=render_job['vmax'],
                             )
 
         for x_index in range(X.shape[1]):
@@ -1806,40 +2466,43 @@ class SingleHeatmapPlotter(AbstractPlotter):
                          path_effects=[PathEffects.withStroke(linewidth=3, foreground="k")]
                          )
 
-        if not self.paper_mode:
-            fig.colorbar(heatmap, label=heatmap_metric_specification['name'] + ' - mean in blue')
-        else:
-            ticks = heatmap_metric_specification['colorbar_ticks']
+    if not render_job['paper_mode']:
+        fig.colorbar(heatmap, label=render_job['name'] + ' - mean in blue')
+    else:
+        ticks = render_job['colorbar_ticks']
 
-            if ticks[-1] >= 1000:
-                tick_labels = [(str(tick).ljust(4) if tick < 1000 else
-                                    "{}k".format(int(tick / 1000))
-                                ) for tick in ticks]
-            else:
-                tick_labels = [str(tick).ljust(3) for tick in ticks]
+        if ticks[-1] >= 1000:
+            tick_labels = [(str(tick).ljust(4) if tick < 1000 else
+                                "{}k".format(int(tick / 1000))
+                            ) for tick in ticks]
+        else:
+            tick_labels = [str(tick).ljust(3) for tick in ticks]
 
-            cbar = fig.colorbar(heatmap)
-            cbar.set_ticks(ticks)
-            cbar.set_ticklabels(tick_labels)
-            # for label in cbar.ax.get_yticklabels():
-            #    label.set_fontproperties(font_manager.FontProperties(family="Courier New",weight='bold'))
+        cbar = fig.colorbar(heatmap)
+        cbar.set_ticks(ticks)
+        cbar.set_ticklabels(tick_labels)
+        # for label in cbar.ax.get_yticklabels():
+        #    label.set_fontproperties(font_manager.FontProperties(family="Courier New",weight='bold'))
 
-            cbar.ax.tick_params(labelsize=9)
+        cbar.ax.tick_params(labelsize=9)
 
-        ax.set_yticks(np.arange(X.shape[0]) + 0.5, minor=False)
-        ax.set_xticks(np.arange(X.shape[1]) + 0.5, minor=False)
+    ax.set_yticks(np.arange(X.shape[0]) + 0.5, minor=False)
+    ax.set_xticks(np.arange(X.shape[1]) + 0.5, minor=False)
 
-        ax.set_xticklabels(row_labels, minor=False, fontsize=9) # 15.5)
-        ax.set_xlabel(heatmap_axes_specification['x_axis_title'], fontsize=9) # 16)
-        ax.set_ylabel(heatmap_axes_specification['y_axis_title'], fontsize=9) # 16)
-        ax.set_yticklabels(column_labels, minor=False, fontsize=9) # 15.5)#
+    ax.set_xticklabels(render_job['row_labels'], minor=False, fontsize=9) # 15.5)
+    ax.set_xlabel(render_job['x_axis_title'], fontsize=9) # 16)
+    ax.set_ylabel(render_job['y_axis_title'], fontsize=9) # 16)
+    ax.set_yticklabels(render_job['column_labels'], minor=False, fontsize=9) # 15.5)#
 
-        plt.tight_layout(pad=0)
+    plt.tight_layout(pad=0)
 
-        self._show_and_or_save_plots(output_path, filename)
-        plt.close(fig)
+    show_and_or_save_plots(render_job['output_path'], render_job['filename'],
+                           render_job['save_plot'], render_job['show_plot'],
+                           additional_output_files=render_job['additional_output_files'])
+    plt.close(fig)
 
 
+@traced("enumerate filter specifications")
 def _construct_filter_specs(scenario_parameter_space_dict, parameter_filter_keys, maxdepth=3):
     parameter_value_dic = dict()
     for parameter in parameter_filter_keys:
@@ -1927,7 +2590,8 @@ class LatencyStudyPlotter(SingleHeatmapPlotter):
                  save_plot=True,
                  overwrite_existing_files=False,
                  forbidden_scenario_ids=None,
-                 paper_mode=True
+                 paper_mode=True,
+                 comparison_diagnostics_sink=None
                  ):
         super(LatencyStudyPlotter, self).__init__(output_path,
                                                        output_filetype,
@@ -1946,104 +2610,58 @@ class LatencyStudyPlotter(SingleHeatmapPlotter):
                                                        forbidden_scenario_ids,
                                                        paper_mode)
         self.baseline_solution_storage = baseline_solution_storage
+        if baseline_solution_storage is not None:
+            self.metric_cube.add_solution_storage(baseline_solution_storage, algorithm_id)
         self.is_comparison = comparison
+        # ComparisonDiagnosticsSink recording the compared pairs or None
+        self.comparison_diagnostics_sink = comparison_diagnostics_sink
         if baseline_solution_storage is not None and not comparison:
             self.scenarioparameter_room['latency_approx'][0]['latency_approximation_type'].append('no latencies')
 
+        # join of the baseline with each storage of results with latencies (see BaselineSolutionPairTable), built on
+        # the first lookup of pairs, such that only plotters actually comparing pay for it
+        self._baseline_pair_tables = {}
 
+    def _record_compared_solutions(self, metric_specification, solutions):
+        if self.comparison_diagnostics_sink is not None and self.is_comparison:
+            self.comparison_diagnostics_sink.add(metric_specification, solutions, self.metric_cube)
 
-    def _lookup_solutions_by_execution(self, scenario_ids, x_key, x_val, y_key, y_val, solution_container=None):
+    def _get_baseline_pair_table(self, solution_storage):
+        if id(solution_storage) not in self._baseline_pair_tables:
+            self._baseline_pair_tables[id(solution_storage)] = (solution_storage, BaselineSolutionPairTable(
+                self.baseline_solution_storage, solution_storage, self.algorithm_id, self.execution_id,
+                self._get_solution_index(solution_storage)))
+        return self._baseline_pair_tables[id(solution_storage)][1]
 
-        print((x_key, " : ", x_val, "   &   ", y_key , " :  ", y_val))
+
+
+    @traced("lookup solutions")
+    def _lookup_solutions_by_execution(self, scenario_ids, x_key, x_val, y_key, y_val, solution_container=None):
 
         if solution_container is None:
             solution_container = self.scenario_solution_storage
 
         if self.baseline_solution_storage is not None:
-            if x_key == "latency_approximation_type":
-
-                path_y_axis, _ = extract_parameter_range(self.scenarioparameter_room, y_key)
-
-                if y_key[:7] != "latency":
-                    y_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_y_axis, y_val)
-                else:
-                    y_axis_scenarios = self.all_scenario_ids
-
-                scenario_ids = scenario_ids & y_axis_scenarios
-
-                solution_dicts_baseline = [self.baseline_solution_storage.get_solutions_by_scenario_index(x) for x in scenario_ids]
-
-                if x_val == "no latencies":
-                    return [x[self.algorithm_id][self.execution_id] for x in solution_dicts_baseline]
-                elif self.is_comparison:
-                    solution_dicts = [solution_container.get_solutions_by_scenario_index(x) \
-                                      for x in scenario_ids]
-
-                    y_axis_exec_ids = self.exec_id_lookup.get(y_key, {}).get(y_val, self.execution_id_filter)
-                    x_axis_exec_ids = self.exec_id_lookup.get(x_key, {}).get(x_val, self.execution_id_filter)
-                    exec_ids_to_consider = y_axis_exec_ids & x_axis_exec_ids & self.execution_id_filter
-
-                    print(("   Using Exec_IDS: ", exec_ids_to_consider))
-                    print(("   Using Scenarios: ", scenario_ids))
-
-                    return [(x[self.algorithm_id][self.execution_id], y[self.algorithm_id][exec_id]) \
-                              for (x, y) in zip(solution_dicts_baseline, solution_dicts) \
-                              for exec_id in exec_ids_to_consider]
+            baseline_solutions_by_scenario = \
+                self.baseline_solution_storage.algorithm_scenario_solution_dictionary[self.algorithm_id]
 
-            elif y_key == "latency_approximation_type":
+            if "latency_approximation_type" in (x_key, y_key):
 
-                path_x_axis, _ = extract_parameter_range(self.scenarioparameter_room, x_key)
-
-                if x_key[:7] != "latency":
-                    x_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_x_axis, x_val)
+                if x_key == "latency_approximation_type":
+                    type_val, other_key, other_val = x_val, y_key, y_val
                 else:
-                    x_axis_scenarios = self.all_scenario_ids
-                scenario_ids = scenario_ids & x_axis_scenarios
-
-                solution_dicts_baseline = [self.baseline_solution_storage.get_solutions_by_scenario_index(x) for x in scenario_ids]
-
-                if y_val == "no latencies":
-                    return [x[self.algorithm_id][self.execution_id] for x in solution_dicts_baseline]
-                elif self.is_comparison:
-
-                    solution_dicts = [solution_container.get_solutions_by_scenario_index(x) \
-                                      for x in scenario_ids]
-
-
-                    y_axis_exec_ids = self.exec_id_lookup.get(y_key, {}).get(y_val, self.execution_id_filter)
-                    x_axis_exec_ids = self.exec_id_lookup.get(x_key, {}).get(x_val, self.execution_id_filter)
-                    exec_ids_to_consider = y_axis_exec_ids & x_axis_exec_ids & self.execution_id_filter
-
-                    print(("   Using Exec_IDS: ", exec_ids_to_consider))
-                    print(("   Using Scenarios: ", scenario_ids))
+                    type_val, other_key, other_val = y_val, x_key, x_val
 
-                    return [(y[self.algorithm_id][exec_id], x[self.algorithm_id][self.execution_id]) \
-                              for (x, y) in zip(solution_dicts_baseline, solution_dicts) \
-                              for exec_id in exec_ids_to_consider]
-
-                    # solution_dicts = [self.scenario_solution_storage.get_solutions_by_scenario_index(x) for x in
-                    #                   scenario_ids]
-                    # result = [x[self.algorithm_id][self.execution_id] for x in solution_dicts]
-                    # return zip(result_baseline, result)
-
-            elif self.is_comparison: # no axis is type
-
-                solution_dicts = [solution_container.get_solutions_by_scenario_index(x) for x in scenario_ids]
-
-                solution_dicts_baseline = [self.baseline_solution_storage.get_solutions_by_scenario_index(x) for x in scenario_ids]
-
-                y_axis_exec_ids = self.exec_id_lookup.get(y_key, {}).get(y_val, self.execution_id_filter)
-                x_axis_exec_ids = self.exec_id_lookup.get(x_key, {}).get(x_val, self.execution_id_filter)
-                exec_ids_to_consider = y_axis_exec_ids & x_axis_exec_ids & self.execution_id_filter
-
-                print(("   Using Exec_IDS: ", exec_ids_to_consider))
-                print(("   Using Scenarios: ", scenario_ids))
-
-                return [(x[self.algorithm_id][self.execution_id], y[self.algorithm_id][exec_id]) \
-                        for (x, y) in zip(solution_dicts_baseline, solution_dicts) \
-                        for exec_id in exec_ids_to_consider]
+                scenario_ids = scenario_ids & self._obtain_scenarios_based_on_parameter(other_key, other_val)
 
+                if type_val == "no latencies":
+                    return [baseline_solutions_by_scenario[x][self.execution_id] for x in scenario_ids]
 
+            if self.is_comparison:
+                # the pairs are (baseline result, result with latencies) regardless of the axis showing the type
+                return self._get_baseline_pair_table(solution_container).get_pairs(
+                    self._select_scenario_execution_mask(solution_container, scenario_ids,
+                                                         x_key, x_val, y_key, y_val))
 
         return super(LatencyStudyPlotter, self)._lookup_solutions_by_execution(scenario_ids,
                                                       x_key, x_val, y_key, y_val, solution_container)
@@ -2072,13 +2690,16 @@ class ComparisonPlotter_ECDF_BoxPlot(AbstractPlotter):
                  rr_settings_to_consider=None,
                  request_sets=None
                  ):
-        super(ComparisonPlotter_ECDF_BoxPlot, self).__init__(output_path, output_filetype, vine_solution_storage,
+        super(ComparisonPlotter_ECDF_BoxPlot, self).__init__(output_path, output_filetype, vine_solution_storage, None,
                                                              vine_algorithm_id, vine_execution_id, show_plot, save_plot,
                                                              overwrite_existing_files, forbidden_scenario_ids, paper_mode)
         self.randround_solution_storage = randround_solution_storage
         self.randround_algorithm_id = randround_algorithm_id
         self.randround_execution_id = randround_execution_id
         self.both_randround = both_randround
+        self.metric_cube.add_solution_storage(self.randround_solution_storage, self.randround_algorithm_id)
+        if self.both_randround:
+            self.metric_cube.add_solution_storage(self.scenario_solution_storage, self.randround_algorithm_id)
 
         filter_path_number_of_requests, list_number_of_requests = extract_parameter_range(self.scenarioparameter_room,
                                                                                           "number_of_requests")
@@ -2106,6 +2727,16 @@ class ComparisonPlotter_ECDF_BoxPlot(AbstractPlotter):
         else:
             self.request_sets = request_sets
 
+        # best profits as metrics on single results, such that they are evaluated once as columns of the metric cube
+        self._best_vine_profit_specification = dict(lookup_function=self._compute_best_vine_profit)
+        if self.both_randround:
+            self._best_vine_profit_specification['profit_reduction'] = ("max", self.vine_settings_to_consider, np.max)
+        self._best_rr_profit_specification = dict(lookup_function=self._compute_best_rr_profit,
+                                                  profit_reduction=("max", self.rr_settings_to_consider, np.max))
+        # relative profit of each scenario of the scenario parameter index (see _get_relative_profits)
+        self._relative_profits = None
+        self._relative_profits_computed = None
+
 
     def _lookup_vine_solution(self, scenario_id):
         if self.both_randround:
@@ -2117,13 +2748,39 @@ class ComparisonPlotter_ECDF_BoxPlot(AbstractPlotter):
     def _lookup_randround_solution(self, scenario_id):
         return self.randround_solution_storage.get_solutions_by_scenario_index(scenario_id)[self.randround_algorithm_id][self.randround_execution_id]
 
-    def _compute_profit_best_rr_div_best_vine(self, vine_result, rr_result):
-        best_rr = max([rr_result.profits[rr_settings].max for rr_settings in self.rr_settings_to_consider])
+    def _compute_best_vine_profit(self, vine_result):
         if self.both_randround:
-            best_vine = max([vine_result.profits[vine_settings].max for vine_settings in self.vine_settings_to_consider])
+            return max([vine_result.profits[vine_settings].max for vine_settings in self.vine_settings_to_consider])
         else:
-            best_vine = max([vine_result[vine_settings][0].profit.max for vine_settings in self.vine_settings_to_consider])
-        return best_rr / best_vine
+            return max([vine_result[vine_settings][0].profit.max for vine_settings in self.vine_settings_to_consider])
+
+    def _compute_best_rr_profit(self, rr_result):
+        return max([rr_result.profits[rr_settings].max for rr_settings in self.rr_settings_to_consider])
+
+    def _compute_profit_best_rr_div_best_vine(self, vine_result, rr_result):
+        return self._compute_best_rr_profit(rr_result) / self._compute_best_vine_profit(vine_result)
+
+    def _get_relative_profits(self, scenario_mask):
+        """ Returns the best randround profit divided by the best ViNE profit for each scenario of the scenario
+            parameter index, gathered from the best profit columns of the metric cube. Each scenario is computed once,
+            when it is first contained in the given mask; the others are NaN.
+        """
+        if self._relative_profits is None:
+            self._relative_profits = np.full(len(self.scenario_parameter_index.scenario_ids), np.nan)
+            self._relative_profits_computed = np.zeros(len(self._relative_profits), dtype=bool)
+        scenarios_to_compute = scenario_mask & ~self._relative_profits_computed
+        if scenarios_to_compute.any():
+            scenario_ids = self.scenario_parameter_index.scenario_ids[scenarios_to_compute].tolist()
+            vine_solutions = [self._lookup_vine_solution(scenario_id) for scenario_id in scenario_ids]
+            rr_solutions = [self._lookup_randround_solution(scenario_id) for scenario_id in scenario_ids]
+            best_vine_profits = np.array(
+                self.metric_cube.get_values(self._best_vine_profit_specification, vine_solutions), dtype=float)
+            best_rr_profits = np.array(
+                self.metric_cube.get_values(self._best_rr_profit_specification, rr_solutions), dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._relative_profits[scenarios_to_compute] = best_rr_profits / best_vine_profits
+            self._relative_profits_computed |= scenarios_to_compute
+        return self._relative_profits
 
     def compute_relative_profits_arrays(self, list_of_scenarios):
 
@@ -2133,18 +2790,20 @@ class ComparisonPlotter_ECDF_BoxPlot(AbstractPlotter):
                   for edge_rf in self._edge_rfs_list
                   }
 
+        scenario_mask = self.scenario_parameter_index.get_mask_of_scenario_ids(list_of_scenarios)
+        relative_profits = self._get_relative_profits(scenario_mask)
+        number_of_requests_masks = {
+            number_of_requests: self._obtain_scenario_mask_based_on_filters(
+                [{"parameter": "number_of_requests", "value": number_of_requests}])
+            for number_of_requests in self._number_of_requests_list
+        }
+
         for edge_rf in self._edge_rfs_list:
+            edge_rf_mask = scenario_mask & self._obtain_scenario_mask_based_on_filters(
+                [{"parameter": "edge_resource_factor", "value": edge_rf}])
             for number_of_requests in self._number_of_requests_list:
-                scenario_ids_with_right_edge_rf = self._obtain_scenarios_based_on_filters([{"parameter": "edge_resource_factor", "value": edge_rf}])
-                scenario_ids_with_right_number_requests = self._obtain_scenarios_based_on_filters([{"parameter": "number_of_requests", "value": number_of_requests}])
-                scenario_ids_to_consider = set(list_of_scenarios)
-                scenario_ids_to_consider &= scenario_ids_with_right_edge_rf
-                scenario_ids_to_consider &= scenario_ids_with_right_number_requests
-                result[edge_rf][number_of_requests] = np.full(len(scenario_ids_to_consider), np.NaN)
-                for i, scenario_id in enumerate(scenario_ids_to_consider):
-                    vine_result = self._lookup_vine_solution(scenario_id)
-                    rr_result = self._lookup_randround_solution(scenario_id)
-                    result[edge_rf][number_of_requests][i] = self._compute_profit_best_rr_div_best_vine(vine_result, rr_result)
+                result[edge_rf][number_of_requests] = \
+                    relative_profits[edge_rf_mask & number_of_requests_masks[number_of_requests]]
 
         return result
 
@@ -2801,6 +3460,7 @@ class ComparisonPlotter_ECDF_BoxPlot(AbstractPlotter):
 
 
 
+@traced("evaluate vine and randround")
 def evaluate_vine_and_randround(dc_vine,
                                 vine_algorithm_id,
                                 vine_execution_id,
@@ -2953,6 +3613,7 @@ def evaluate_vine_and_randround(dc_vine,
             plotter.plot_figure(filter_spec)
 
 
+@traced("evaluate latency and baseline")
 def evaluate_latency_and_baseline(dc_baseline,
                                 dc_with_latencies,
                                 algorithm_id,
@@ -2968,7 +3629,10 @@ def evaluate_latency_and_baseline(dc_baseline,
                                 output_path="./",
                                 output_filetype="svg",
                                 filter_type=None,
-                                filter_exec_params=None):
+                                filter_exec_params=None,
+                                number_of_jobs=1,
+                                use_render_cache=False,
+                                plot_comparison=False):
     """ Main function for evaluation, creating plots and saving them in a specific directory hierarchy.
     A large variety of plots is created. For heatmaps, a generic plotter is used while for general
     comparison plots (ECDF and scatter) an own class is used. The plots that shall be generated cannot
@@ -2990,7 +3654,14 @@ def evaluate_latency_and_baseline(dc_baseline,
     :param papermode:                  nicely layouted plots (papermode) or rather additional information?
     :param maxdepthfilter:             length of filter permutations that shall be considered
     :param output_path:                path to which the results shall be written
-    :param output_filetype:            filetype supported by matplotlib to export figures
+    :param output_filetype:            filetype supported by matplotlib to export figures or, to only export the
+                                       heatmap data without creating figures, one of DATA_EXPORT_FILETYPES; a list
+                                       of filetypes saves each figure in all of them
+    :param number_of_jobs:             number of processes among which the rendering of the plots is distributed
+    :param use_render_cache:           only render plots whose data changed, copying all others from the render
+                                       cache in the output path (see execute_render_job)
+    :param plot_comparison:            additionally plot the comparison heatmaps of the profits with and without
+                                       latencies and write the compared profits (see ComparisonDiagnosticsSink)
     :return: None
     """
 
@@ -3052,28 +3723,51 @@ def evaluate_latency_and_baseline(dc_baseline,
                                              paper_mode=papermode)
     plotters.append(randround_plotter)
 
-    comparison_plotter = LatencyStudyPlotter(output_path=output_path,
-                                                  output_filetype=output_filetype,
-                                                  baseline_solution_storage=dc_baseline,
-                                                  algorithm_id=algorithm_id,
-                                                  comparison=True,
-                                                  with_latencies_solution_storage=dc_with_latencies,
-                                                second_with_latencies_results=second_with_latencies_results,
-                                                  heatmap_plot_type=HeatmapPlotType.ComparisonLatencyBaseline,
-                                                filter_type=filter_type,
-                                                filter_exec_params=filter_exec_params,
-                                                  list_of_axes_specifications=global_heatmap_axes_specifications_latency_study_comparison,
-                                                  show_plot=show_plot,
-                                                  save_plot=save_plot,
-                                                  overwrite_existing_files=overwrite_existing_files,
-                                                  forbidden_scenario_ids=forbidden_scenario_ids,
-                                                  paper_mode=papermode)
-    # plotters.append(comparison_plotter)
-
-
-    for filter_spec in filter_specs:
+    comparison_diagnostics_sink = None
+    if plot_comparison:
+        comparison_diagnostics_sink = ComparisonDiagnosticsSink()
+        comparison_plotter = LatencyStudyPlotter(output_path=output_path,
+                                                      output_filetype=output_filetype,
+                                                      baseline_solution_storage=dc_baseline,
+                                                      algorithm_id=algorithm_id,
+                                                      comparison=True,
+                                                      with_latencies_solution_storage=dc_with_latencies,
+                                                    second_with_latencies_results=second_with_latencies_results,
+                                                      heatmap_plot_type=HeatmapPlotType.ComparisonLatencyBaseline,
+                                                    filter_type=filter_type,
+                                                    filter_exec_params=filter_exec_params,
+                                                      list_of_axes_specifications=global_heatmap_axes_specifications_latency_study_comparison,
+                                                      show_plot=show_plot,
+                                                      save_plot=save_plot,
+                                                      overwrite_existing_files=overwrite_existing_files,
+                                                      forbidden_scenario_ids=forbidden_scenario_ids,
+                                                      paper_mode=papermode,
+                                                      comparison_diagnostics_sink=comparison_diagnostics_sink)
+        plotters.append(comparison_plotter)
+
+    if use_render_cache:
         for plotter in plotters:
-            plotter.plot_figure(filter_spec)
+            plotter.render_cache_path = os.path.join(os.path.normpath(output_path), RENDER_CACHE_DIRECTORY_NAME)
+
+    if number_of_jobs == 1:
+        for filter_spec in filter_specs:
+            for plotter in plotters:
+                plotter.plot_figure(filter_spec)
+    else:
+        render_jobs = [render_job
+                       for filter_spec in filter_specs
+                       for plotter in plotters
+                       for render_job in plotter.collect_render_jobs(filter_spec)]
+        run_render_jobs(render_jobs, number_of_jobs)
+
+    if comparison_diagnostics_sink is not None:
+        diagnostics_filename = comparison_diagnostics_sink.write(output_path)
+        if diagnostics_filename is not None:
+            logger.info("Wrote the compared profits of the latency study to {}".format(diagnostics_filename))
+
+    for plotter in plotters:
+        logger.info("Scenario selection cache statistics of {}: {}".format(
+            type(plotter).__name__, plotter.scenario_selection_cache.get_statistics()))
 
 
 
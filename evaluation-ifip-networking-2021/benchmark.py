@@ -0,0 +1,306 @@
+# MIT License
+#
+# Copyright (c) 2016-2018 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Benchmarks of the reduction, lookup and plotting stages on synthetic results (see synthetic_data).
+
+Each stage is timed at several scales, where a scale is the number of scenarios relative to the latency study
+(scale 1 corresponds to a scenario repetition of 10). For each scale and stage, the minimal wall time over a number of
+repetitions and the peak memory (as traced by tracemalloc, i.e. excluding memory not allocated via Python's
+allocators) are reported. The caches filled by a stage (scenario selection cache and metric cubes) are cleared before
+each execution, such that all executions are measured cold. Results are written as JSON and can be compared against a
+previously stored baseline file to detect performance regressions before running the evaluation on the actual results.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from time import gmtime, strftime
+
+import numpy as np
+
+from alib import util
+from evaluation_acm_ccr_2019 import plot_data, synthetic_data
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+BENCHMARK_STAGES = (
+    "reduce_single_solution",
+    "get_aggregated_data",
+    "extract_parameter_range",
+    "lookup_scenarios_having_specific_values",
+    "_lookup_solutions_by_execution",
+    "plot_single_heatmap_general",
+    "plot_single_boxplot_general",
+)
+
+DEFAULT_BENCHMARK_SCALES = (0.1, 1.0)
+#: scenario repetition of the latency study, i.e. of scale 1
+PRODUCTION_SCENARIO_REPETITION = 10
+
+#: relative increase of wall time or peak memory (compared to the baseline) that is reported as regression
+DEFAULT_REGRESSION_TOLERANCE = 0.25
+#: wall times (in seconds) and peak memory (in bytes) below which differences are considered to be noise
+MINIMAL_SIGNIFICANT_WALL_TIME = 0.005
+MINIMAL_SIGNIFICANT_PEAK_MEMORY = 1024 * 1024
+
+
+def get_scenario_repetition_for_scale(scale):
+    return max(1, int(round(PRODUCTION_SCENARIO_REPETITION * scale)))
+
+
+def measure(function, repetitions=3, setup=None):
+    """ Returns the minimal wall time (in seconds) of function over the given number of repetitions and the peak
+        memory (in bytes) of an additional traced execution. Unless None, setup is called (untimed and untraced)
+        before each execution, e.g. to clear caches such that each execution is measured cold.
+    """
+    if repetitions < 1:
+        raise ValueError("The number of repetitions must be at least 1, got {}".format(repetitions))
+    if setup is not None:
+        setup()
+    # only allocations after starting the trace are traced, i.e. the peak is the one of the function call
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    wall_times = []
+    for _ in range(repetitions):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        wall_times.append(time.perf_counter() - start)
+    return dict(wall_time=min(wall_times), peak_memory=peak_memory)
+
+
+class BenchmarkContext(object):
+    """ Synthetic results and plotters of a single scale, on which the stages are benchmarked. The plots are written
+        into a temporary directory which is removed by cleanup.
+    """
+
+    def __init__(self, scale, seed=0, output_filetype="png"):
+        # the plotting modules are imported here, such that matplotlib is only loaded when running benchmarks
+        from evaluation_acm_ccr_2019 import algorithm_heatmap_plots, runtime_evaluation
+        self.algorithm_heatmap_plots = algorithm_heatmap_plots
+
+        self.scale = scale
+        scenario_repetition = get_scenario_repetition_for_scale(scale)
+        self.baseline, self.with_latencies = synthetic_data.generate_latency_study_storages(
+            scenario_repetition=scenario_repetition, seed=seed)
+        self.algorithm_id = synthetic_data.ALGORITHM_ID
+
+        # raw results of a single execution for each of the first scenario_repetition scenario parameter combinations,
+        # i.e. their number grows linearly with the scale (as the number of scenarios does)
+        random_state = np.random.RandomState(seed)
+        scenario_parameter_container = self.with_latencies.scenario_parameter_container
+        algorithm_parameters = self.with_latencies.execution_parameter_container.algorithm_parameter_list[0][
+            'ALGORITHM_PARAMETERS']
+        self.raw_results = [synthetic_data.generate_raw_result(random_state, scenario_parameters, algorithm_parameters)
+                            for scenario_parameters in
+                            scenario_parameter_container.scenario_parameter_combination_list[:scenario_repetition]]
+        self.reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer()
+
+        # one list of per-request runtimes for each reduced result, as aggregated during the reduction
+        self.value_lists = [list(random_state.lognormal(size=30)) for _ in range(
+            len(self.with_latencies.execution_parameter_container.algorithm_parameter_list) *
+            scenario_parameter_container.get_number_of_scenarios())]
+
+        self.output_path = tempfile.mkdtemp(prefix="benchmark_")
+        with _suppress_output():
+            self.heatmap_plotter = algorithm_heatmap_plots.LatencyStudyPlotter(
+                output_path=self.output_path,
+                output_filetype=output_filetype,
+                baseline_solution_storage=self.baseline,
+                with_latencies_solution_storage=self.with_latencies,
+                second_with_latencies_results=None,
+                algorithm_id=self.algorithm_id,
+                heatmap_plot_type=algorithm_heatmap_plots.HeatmapPlotType.LatencyStudy,
+                list_of_axes_specifications=algorithm_heatmap_plots.global_heatmap_axes_specifications_latency_study,
+                overwrite_existing_files=True)
+            self.boxplot_plotter = runtime_evaluation.RuntimeBoxplotPlotter_LatencyStudy(
+                output_path=self.output_path,
+                output_filetype=output_filetype,
+                scenario_solution_storage=self.with_latencies,
+                baseline_solution_storage=self.baseline,
+                list_of_outer_axes_specifications=runtime_evaluation.boxplot_outer_axes_specifications_lat,
+                list_of_inner_axes_specifications=runtime_evaluation.boxplot_inner_axes_specifications_lat,
+                algorithm_id=self.algorithm_id,
+                overwrite_existing_files=True)
+
+        scenario_parameter_dict = scenario_parameter_container.scenario_parameter_dict
+        self.parameter_keys = [key
+                               for generators in scenario_parameter_container.scenarioparameter_room.values()
+                               for generator in generators
+                               for classes in generator.values()
+                               for parameters in classes.values()
+                               for key in parameters]
+        self.parameter_paths_and_values = [
+            algorithm_heatmap_plots.extract_parameter_range(scenario_parameter_dict, key)
+            for key in self.parameter_keys]
+        self.scenario_parameter_dict = scenario_parameter_dict
+
+    def clear_caches(self):
+        """ Clears the plotters' scenario selection caches and the metric values of their metric cubes, which are
+            otherwise filled by the first execution of a stage and reused by all subsequent ones.
+        """
+        for plotter in (self.heatmap_plotter, self.boxplot_plotter):
+            plotter.scenario_selection_cache.clear()
+            plotter.metric_cube.clear_values()
+
+    def cleanup(self):
+        # release the synthetic results (also referenced by the plotters' metric cubes) before the next scale is built
+        self.heatmap_plotter = None
+        self.boxplot_plotter = None
+        self.baseline = None
+        self.with_latencies = None
+        self.raw_results = None
+        shutil.rmtree(self.output_path, ignore_errors=True)
+
+    def run_reduce_single_solution(self):
+        for raw_result in self.raw_results:
+            self.reducer.reduce_single_solution(raw_result)
+
+    def run_get_aggregated_data(self):
+        for values in self.value_lists:
+            plot_data.get_aggregated_data(values)
+
+    def run_extract_parameter_range(self):
+        for key in self.parameter_keys:
+            self.algorithm_heatmap_plots.extract_parameter_range(self.scenario_parameter_dict, key)
+
+    def run_lookup_scenarios_having_specific_values(self):
+        for path, values in self.parameter_paths_and_values:
+            for value in values:
+                self.algorithm_heatmap_plots.lookup_scenarios_having_specific_values(self.scenario_parameter_dict,
+                                                                                     path, value)
+
+    def run__lookup_solutions_by_execution(self):
+        axes_specification = self.heatmap_plotter.list_of_axes_specifications[0]
+        x_key = axes_specification['x_axis_parameter']
+        y_key = axes_specification['y_axis_parameter']
+        _, x_values = self.algorithm_heatmap_plots.extract_parameter_range(self.heatmap_plotter.scenarioparameter_room,
+                                                                           x_key)
+        _, y_values = self.algorithm_heatmap_plots.extract_parameter_range(self.heatmap_plotter.scenarioparameter_room,
+                                                                           y_key)
+        with _suppress_output():
+            for x_value in x_values:
+                for y_value in y_values:
+                    self.heatmap_plotter._lookup_solutions_by_execution(set(self.heatmap_plotter.all_scenario_ids),
+                                                                        x_key, x_value, y_key, y_value)
+
+    def run_plot_single_heatmap_general(self):
+        with _suppress_output():
+            self.heatmap_plotter.plot_single_heatmap_general(self.heatmap_plotter.list_of_metric_specifications[0],
+                                                             self.heatmap_plotter.list_of_axes_specifications[0])
+
+    def run_plot_single_boxplot_general(self):
+        with _suppress_output():
+            self.boxplot_plotter.plot_single_boxplot_general(self.boxplot_plotter.metric_specifications[0],
+                                                             self.boxplot_plotter.boxplot_outer_axes_specifications[0],
+                                                             self.boxplot_plotter.boxplot_inner_axes_specifications[0])
+
+
+@contextlib.contextmanager
+def _suppress_output():
+    # the plotters print their selections, which would dominate the measured wall times
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def run_benchmarks(scales=DEFAULT_BENCHMARK_SCALES, repetitions=3, seed=0, stages=None):
+    """ Benchmarks the given stages (default: all BENCHMARK_STAGES) at each of the given scales.
+
+    :return: dict holding the environment under 'metadata' and, under 'results', a dict mapping the scale (as string)
+             to a dict mapping the stage to its wall time (in seconds) and peak memory (in bytes)
+    """
+    if stages is None:
+        stages = BENCHMARK_STAGES
+    for stage in stages:
+        if stage not in BENCHMARK_STAGES:
+            raise ValueError("Unknown benchmark stage {}; must be one of {}".format(stage, BENCHMARK_STAGES))
+
+    results = {}
+    for scale in scales:
+        logger.info("Benchmarking at scale {} (scenario repetition {})".format(
+            scale, get_scenario_repetition_for_scale(scale)))
+        context = BenchmarkContext(scale, seed=seed)
+        try:
+            results[str(scale)] = {}
+            for stage in stages:
+                measurement = measure(getattr(context, "run_" + stage), repetitions, setup=context.clear_caches)
+                logger.info("   {:<45} {:>10.4f}s {:>10.1f} MiB".format(
+                    stage, measurement['wall_time'], measurement['peak_memory'] / (1024.0 * 1024.0)))
+                results[str(scale)][stage] = measurement
+        finally:
+            context.cleanup()
+
+    return dict(
+        metadata=dict(
+            date=strftime("%Y-%m-%d %H:%M:%S", gmtime()),
+            python=platform.python_version(),
+            numpy=np.__version__,
+            platform=platform.platform(),
+            repetitions=repetitions,
+            seed=seed,
+        ),
+        results=results,
+    )
+
+
+def compare_to_baseline(benchmark_results, baseline_results, tolerance=DEFAULT_REGRESSION_TOLERANCE):
+    """ Returns the list of regressions, i.e. of dicts detailing scale, stage, measure, baseline and current value,
+        for which the current value exceeds the baseline by more than the given relative tolerance. Stages or scales
+        missing in either of the results are ignored.
+    """
+    minimal_significant_values = dict(wall_time=MINIMAL_SIGNIFICANT_WALL_TIME,
+                                      peak_memory=MINIMAL_SIGNIFICANT_PEAK_MEMORY)
+    regressions = []
+    for scale, stage_results in sorted(benchmark_results['results'].items()):
+        for stage, measurement in sorted(stage_results.items()):
+            baseline_measurement = baseline_results['results'].get(scale, {}).get(stage)
+            if baseline_measurement is None:
+                continue
+            for measure_name, minimal_significant_value in minimal_significant_values.items():
+                current = measurement[measure_name]
+                baseline = baseline_measurement[measure_name]
+                if current - baseline > max(tolerance * baseline, minimal_significant_value):
+                    regressions.append(dict(scale=scale, stage=stage, measure=measure_name,
+                                            baseline=baseline, current=current))
+    return regressions
+
+
+def write_benchmark_results(benchmark_results, filename):
+    with open(filename, "w") as f:
+        json.dump(benchmark_results, f, indent=2, sort_keys=True)
+
+
+def read_benchmark_results(filename):
+    with open(filename, "r") as f:
+        return json.load(f)
@@ -20,32 +20,49 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 #
-import matplotlib
-matplotlib.use('Agg')
-
+import functools
 import os
 import sys
 import logging
 
 import click
-from . import treewidth_computation_experiments
-from . import treewidth_computation_plots
-from . import runtime_comparison_separation_dynvmp_vs_lp as sep_dynvmp_vs_lp
-from . import plot_data, algorithm_heatmap_plots, runtime_evaluation
-from alib import util
-from alib import datamodel
 
 try:
     import pickle as pickle
 except ImportError:
     import pickle
 
+# Note that alib and the evaluation modules (and hence numpy and matplotlib) are only imported by the commands
+# requiring them, such that e.g. --help does not depend on them and each command only pays for its own imports.
+# The tracing module only depends on the standard library.
+from .tracing import tracer
+
 
 def initialize_logger(filename, log_level_print, log_level_file, allow_override=False):
+    from alib import util
     log_level_print = logging.getLevelName(log_level_print.upper())
     log_level_file = logging.getLevelName(log_level_file.upper())
     util.initialize_root_logger(filename, log_level_print, log_level_file, allow_override=allow_override)
 
+def trace_option(command):
+    """ Adds the --trace option to the command, which writes a Chrome trace of the command's stages (see tracing)
+        to the given file.
+    """
+    @functools.wraps(command)
+    def wrapper(*args, **kwargs):
+        trace = kwargs.pop('trace')
+        if trace is None:
+            return command(*args, **kwargs)
+        tracer.enable()
+        try:
+            with tracer.span(command.__name__, category="command"):
+                return command(*args, **kwargs)
+        finally:
+            tracer.disable()
+            tracer.write(trace)
+    return click.option('--trace', type=click.Path(), default=None,
+                        help="write a Chrome trace-event JSON of the command's stages to this file")(wrapper)
+
 @click.group()
 def cli():
     """
@@ -61,11 +78,15 @@ def cli():
     pass
 
 @cli.command(short_help="Extracts data to be plotted for the latency evaluation of the randomized rounding algorithms")
+@trace_option
 @click.argument('input_pickle_file', type=click.Path())
 @click.option('--output_pickle_file', type=click.Path(), default=None, help="file to write to")
+@click.option('--workers', type=click.INT, default=1, help="number of processes among which the executions are distributed")
+@click.option('--streaming/--no_streaming', default=False, help="input is a scenario split directory which is reduced scenario by scenario")
+@click.option('--incremental/--no_incremental', default=False, help="reuse cached reductions of unchanged executions")
 @click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
 @click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
-def reduce_to_plotdata_rr_seplp_optdynvmp(input_pickle_file, output_pickle_file, log_level_print, log_level_file):
+def reduce_to_plotdata_rr_seplp_optdynvmp(input_pickle_file, output_pickle_file, workers, streaming, incremental, log_level_print, log_level_file):
     """ Given a scenario solution pickle (input_pickle_file) this function extracts data
         to be plotted and writes it to --output_pickle_file. If --output_pickle_file is not
         given, a default name (derived from the input's basename) is derived.
@@ -73,70 +94,284 @@ def reduce_to_plotdata_rr_seplp_optdynvmp(input_pickle_file, output_pickle_file,
         The input_file must be contained in ALIB_EXPERIMENT_HOME/input and the output
         will be written to ALIB_EXPERIMENT_HOME/output while the log is saved in
         ALIB_EXPERIMENT_HOME/log.
+
+        Using --workers N, the reduction of the single executions is distributed across N processes.
+        The resulting pickle is the same as the one of the sequential reduction.
+
+        Using --streaming, the input must be a directory written by split_solution_pickle. Scenarios are then
+        loaded, reduced and written one by one, such that the whole solution pickle never needs to fit into memory.
+        The output is a directory holding one reduced pickle per scenario (by default named after the input with
+        suffix _reduced), which evaluate_separation_with_latencies reads in place of a reduced pickle.
+
+        Using --incremental, reduced records are cached next to the output pickle (suffix .cache) together with a
+        hash of the respective raw solution. Subsequent runs only reduce new or changed executions.
     """
+    from alib import util
+    from . import plot_data
     util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
     log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
                             "reduce_{}.log".format(os.path.basename(input_pickle_file)))
     initialize_logger(log_file, log_level_print, log_level_file)
-    reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer()
-    reducer.reduce_randround_result_collection(input_pickle_file, output_pickle_file)
-
-
+    if streaming and incremental:
+        raise ValueError("--incremental is not supported together with --streaming")
+    reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(number_of_workers=workers,
+                                                                       incremental=incremental)
+    if streaming:
+        reducer.reduce_randround_result_collection_streaming(input_pickle_file, output_pickle_file)
+    else:
+        reducer.reduce_randround_result_collection(input_pickle_file, output_pickle_file)
+
+
+@cli.command(short_help="Exports a reduced pickle into a columnar NumPy (.npz) file for external analyses")
+@trace_option
+@click.argument('reduced_pickle_file', type=click.Path())
+@click.option('--output_npz_file', type=click.Path(), default=None, help="file to write to")
+@click.option('--algorithm_id', type=click.STRING, default="RandRoundSepLPOptDynVMPCollection", help="algorithm whose results are converted")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def convert_reduced_to_columnar(reduced_pickle_file, output_npz_file, algorithm_id, log_level_print, log_level_file):
+    """ Given a reduced pickle (reduced_pickle_file) contained in ALIB_EXPERIMENT_HOME/input, this function writes
+        one NumPy array per reduced field, indexed by a dense (scenario_id, exec_id) row table, into an .npz file
+        in ALIB_EXPERIMENT_HOME/output. The file can be read via reduced_data.ColumnarReducedRandRoundResults.load or
+        directly via numpy.load; the evaluation commands keep reading the reduced pickles.
+    """
+    from alib import util
+    from . import plot_data
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "columnar_{}.log".format(os.path.basename(reduced_pickle_file)))
+    initialize_logger(log_file, log_level_print, log_level_file)
+    plot_data.convert_reduced_pickle_to_columnar(reduced_pickle_file, output_npz_file, algorithm_id)
 
 
-@cli.command(short_help="Create plots comparing the DynVMP runtime with and without considering latencies")
+@cli.command(short_help="Exports reduced baseline and latency results into a SQLite database")
+@trace_option
 @click.argument('baseline_reduced_pickle', type=click.Path())       #pickle in ALIB_EXPERIMENT_HOME/input storing baseline results
 @click.argument('with_latencies_reduced_pickle', type=click.Path())     #pickle in ALIB_EXPERIMENT_HOME/input storing randround results
-@click.argument('output_directory', type=click.Path())          #path to which the result will be written
-@click.option('--exclude_generation_parameters', type=click.STRING, default=None, help="generation parameters that shall be excluded. "
-                                                                                       "Must ge given as python evaluable list of dicts. "
-                                                                                       "Example format: \"{'number_of_requests': [20]}\"")
-@click.option('--filter_parameter_keys', type=click.STRING, default=None, help="generation parameters whose values will represent filters. "
-                                                                               "Must be given as string detailing a python list containing strings."
-                                                                               "Example: \"['number_of_requests', 'edge_resource_factor', 'node_resource_factor']\"")
-@click.option('--filter_exec_params', type=click.STRING, default=None, help="execution parameters that shall be used, dropping other options. "
-                                                                                       "Must ge given as python evaluable list of dicts. "
-                                                                                       "Example format: \"{'latency_approximation_type': ['flex']}\"")
-@click.option('--overwrite/--no_overwrite', default=True, help="overwrite existing files?")
-@click.option('--papermode/--non-papermode', default=True, help="output 'paper-ready' figures or figures containing additional statistical data?")
-@click.option('--output_filetype', type=click.Choice(['png', 'pdf', 'eps', "svg"]), default="png", help="the filetype which shall be created")
-@click.option('--filter_type', type=click.Choice(['strict', 'flex', 'no latencies']), default=None, help="If the solutions should be filtered for one type")
+@click.option('--output_database_file', type=click.Path(), default="latency_study.sqlite", help="file to write to")
+@click.option('--algorithm_id', type=click.STRING, default="RandRoundSepLPOptDynVMPCollection", help="algorithm whose results are exported")
+@click.option('--overwrite/--no_overwrite', default=False, help="replace an existing database?")
 @click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
-@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for stdout")
-def evaluate_separation_with_latencies( baseline_reduced_pickle,
-                                         with_latencies_reduced_pickle,
-                                          output_directory,
-                                          exclude_generation_parameters,
-                                          filter_parameter_keys,
-                                          filter_exec_params,
-                                          overwrite,
-                                          papermode,
-                                          output_filetype,
-                                          filter_type,
-                                          log_level_print,
-                                          log_level_file):
-
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def export_to_sqlite(baseline_reduced_pickle, with_latencies_reduced_pickle, output_database_file, algorithm_id,
+                     overwrite, log_level_print, log_level_file):
+    """ Given the reduced pickles of the baseline and of the latency results contained in ALIB_EXPERIMENT_HOME/input,
+        this function writes a SQLite database (see sqlite_export) into ALIB_EXPERIMENT_HOME/output. It holds one row
+        per (source, scenario, execution, randomized rounding setting), where source is 'baseline' or
+        'with_latencies', with the generation and algorithm parameters as indexed columns.
+    """
+    from alib import util
+    from . import sqlite_export
     util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
     log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
-                            "evaluate_pickles_{}_{}.log".format(os.path.basename(with_latencies_reduced_pickle),
-                                                                os.path.basename(baseline_reduced_pickle)))
-    initialize_logger(log_file, log_level_print, log_level_file, allow_override=True)
+                            "sqlite_{}.log".format(os.path.basename(output_database_file)))
+    initialize_logger(log_file, log_level_print, log_level_file)
 
-    baseline_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, baseline_reduced_pickle)
-    with_lat_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, with_latencies_reduced_pickle)
+    storages_by_source = []
+    for source, reduced_pickle in [("baseline", baseline_reduced_pickle),
+                                   ("with_latencies", with_latencies_reduced_pickle)]:
+        reduced_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, reduced_pickle)
+        logging.getLogger().info("Reading reduced {} pickle at {}".format(source, reduced_pickle_path))
+        storages_by_source.append((source, _load_reduced_results(reduced_pickle_path)))
 
-    #get root logger
-    logger = logging.getLogger()
+    sqlite_export.export_reduced_storages_to_sqlite(
+        os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, output_database_file),
+        storages_by_source, algorithm_id, overwrite=overwrite)
 
-    logger.info("Reading reduced baseline pickle at {}".format(baseline_pickle_path))
-    baseline_results = None
-    with open(baseline_pickle_path, "rb") as f:
-        baseline_results = pickle.load(f, encoding='latin1')
 
-    logger.info("Reading reduced with_latencies pickle at {}".format(with_latencies_reduced_pickle))
-    with_latencies_results = None
-    with open(with_lat_pickle_path, "rb") as f:
-        with_latencies_results = pickle.load(f, encoding='latin1')
+@cli.command(short_help="Splits scenario solution pickles into one pickle per scenario for streaming reduction")
+@trace_option
+@click.argument('input_pickle_files', type=click.Path(), nargs=-1, required=True)
+@click.option('--output_directory', type=click.Path(), default=None, help="directory to write to")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def split_solution_pickle(input_pickle_files, output_directory, log_level_print, log_level_file):
+    """ Given one or several scenario solution pickles (input_pickle_files) contained in ALIB_EXPERIMENT_HOME/input,
+        this function writes a header pickle and one pickle per scenario into --output_directory (by default a
+        directory in ALIB_EXPERIMENT_HOME/output named after the first input's basename). The resulting directory can
+        be reduced via reduce_to_plotdata_rr_seplp_optdynvmp --streaming.
+
+        Several pickles must cover disjoint sets of scenarios, as obtained by executing the experiment in chunks of
+        scenario indices. They are loaded one after the other, such that only the largest of them needs to fit into
+        memory.
+    """
+    from alib import util
+    from . import plot_data
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "split_{}.log".format(os.path.basename(input_pickle_files[0])))
+    initialize_logger(log_file, log_level_print, log_level_file)
+    if output_directory is None:
+        output_directory = os.path.basename(input_pickle_files[0]).split(".")[0] + "_split"
+    output_directory = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, output_directory)
+    input_pickle_paths = [os.path.join(util.ExperimentPathHandler.INPUT_DIR, input_pickle_file)
+                          for input_pickle_file in input_pickle_files]
+    plot_data.write_scenario_split_of_pickles(input_pickle_paths, output_directory)
+
+
+@cli.command(short_help="Generates synthetic reduced baseline and latency results for offline benchmarking")
+@trace_option
+@click.option('--scenario_repetition', type=click.INT, default=10, help="number of scenarios per combination of scenario parameters")
+@click.option('--latency_approximation_limits', type=click.STRING, default=None, help="latency approximation limits of the executions. "
+                                                                                       "Must be given as string detailing a python list. "
+                                                                                       "Example: \"[3, 5, 10, 15]\"")
+@click.option('--seed', type=click.INT, default=0, help="seed of the random values")
+@click.option('--baseline_output_pickle_file', type=click.Path(), default="synthetic_baseline_reduced.pickle", help="file to write the baseline results to")
+@click.option('--with_latencies_output_pickle_file', type=click.Path(), default="synthetic_with_latencies_reduced.pickle", help="file to write the latency results to")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def generate_synthetic_results(scenario_repetition, latency_approximation_limits, seed, baseline_output_pickle_file,
+                               with_latencies_output_pickle_file, log_level_print, log_level_file):
+    """ Writes synthetic reduced pickles of the baseline and of the latency results into ALIB_EXPERIMENT_HOME/output.
+        The scenario and execution parameters mirror those of the latency study; the number of scenarios is scaled
+        via --scenario_repetition and the number of executions via --latency_approximation_limits. The pickles can
+        be evaluated via evaluate_separation_with_latencies (after moving them to ALIB_EXPERIMENT_HOME/input).
+    """
+    from alib import util
+    from . import synthetic_data
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR, "generate_synthetic_results.log")
+    initialize_logger(log_file, log_level_print, log_level_file)
+    if latency_approximation_limits is not None:
+        latency_approximation_limits = eval(latency_approximation_limits)
+    storages = synthetic_data.generate_latency_study_storages(scenario_repetition=scenario_repetition,
+                                                              latency_approximation_limits=latency_approximation_limits,
+                                                              seed=seed)
+    for storage, output_pickle_file in zip(storages, [baseline_output_pickle_file, with_latencies_output_pickle_file]):
+        output_pickle_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, output_pickle_file)
+        logging.getLogger().info("Writing synthetic results to {}".format(output_pickle_path))
+        with open(output_pickle_path, "wb") as f:
+            pickle.dump(storage, f)
+
+
+@cli.command(short_help="Benchmarks the reduction, lookup and plotting stages on synthetic results")
+@trace_option
+@click.option('--scales', type=click.STRING, default=None, help="number of scenarios relative to the latency study. "
+                                                                 "Must be given as string detailing a python list. "
+                                                                 "Example: \"[0.1, 1, 10]\"")
+@click.option('--stages', type=click.STRING, default=None, help="stages to benchmark (default: all). "
+                                                                 "Must be given as string detailing a python list containing strings. "
+                                                                 "Example: \"['reduce_single_solution', 'plot_single_heatmap_general']\"")
+@click.option('--repetitions', type=click.INT, default=3, help="number of timed executions per stage, of which the fastest is reported")
+@click.option('--seed', type=click.INT, default=0, help="seed of the synthetic results")
+@click.option('--output_json_file', type=click.Path(), default="benchmark_results.json", help="file to write the results to")
+@click.option('--baseline_json_file', type=click.Path(), default=None, help="results of a previous run to compare against")
+@click.option('--tolerance', type=click.FLOAT, default=0.25, help="relative increase of wall time or peak memory that is reported as regression")
+@click.option('--update_baseline', is_flag=True, default=False, help="overwrite --baseline_json_file with the results of this run")
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def benchmark(scales, stages, repetitions, seed, output_json_file, baseline_json_file, tolerance, update_baseline,
+              log_level_print, log_level_file):
+    """ Times the reduction, lookup and plotting stages on synthetic results (see generate_synthetic_results) at
+        several scales and writes wall times and peak memory as JSON into ALIB_EXPERIMENT_HOME/output.
+
+        Using --baseline_json_file, the results are compared against those of a previous run: each stage whose wall
+        time or peak memory increased by more than --tolerance is reported and the command exits with status 1.
+        Using --update_baseline, the baseline file is replaced by the results of this run instead.
+    """
+    from alib import util
+    from . import benchmark as benchmark_module
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR, "benchmark.log")
+    initialize_logger(log_file, log_level_print, log_level_file)
+    if update_baseline and baseline_json_file is None:
+        raise ValueError("--update_baseline requires --baseline_json_file")
+
+    if scales is None:
+        scales = benchmark_module.DEFAULT_BENCHMARK_SCALES
+    else:
+        scales = eval(scales)
+    if stages is not None:
+        stages = eval(stages)
+
+    benchmark_results = benchmark_module.run_benchmarks(scales=scales, repetitions=repetitions, seed=seed,
+                                                        stages=stages)
+    output_json_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, output_json_file)
+    logging.getLogger().info("Writing benchmark results to {}".format(output_json_path))
+    benchmark_module.write_benchmark_results(benchmark_results, output_json_path)
+
+    if baseline_json_file is None:
+        return
+    if update_baseline:
+        logging.getLogger().info("Updating the baseline {}".format(baseline_json_file))
+        benchmark_module.write_benchmark_results(benchmark_results, baseline_json_file)
+        return
+
+    regressions = benchmark_module.compare_to_baseline(benchmark_results,
+                                                       benchmark_module.read_benchmark_results(baseline_json_file),
+                                                       tolerance=tolerance)
+    for regression in regressions:
+        logging.getLogger().error("Regression at scale {scale} in {stage}: {measure} increased from "
+                                  "{baseline:.4g} to {current:.4g}".format(**regression))
+    if regressions:
+        sys.exit(1)
+    logging.getLogger().info("No regressions compared to the baseline {}".format(baseline_json_file))
+
+
+
+
+# options shared by all commands evaluating the latency study (see _evaluate_latency_study)
+_latency_study_evaluation_options = [
+    click.option('--exclude_generation_parameters', type=click.STRING, default=None, help="generation parameters that shall be excluded. "
+                                                                                          "Must ge given as python evaluable list of dicts. "
+                                                                                          "Example format: \"{'number_of_requests': [20]}\""),
+    click.option('--filter_parameter_keys', type=click.STRING, default=None, help="generation parameters whose values will represent filters. "
+                                                                                  "Must be given as string detailing a python list containing strings."
+                                                                                  "Example: \"['number_of_requests', 'edge_resource_factor', 'node_resource_factor']\""),
+    click.option('--filter_exec_params', type=click.STRING, default=None, help="execution parameters that shall be used, dropping other options. "
+                                                                               "Must ge given as python evaluable list of dicts. "
+                                                                               "Example format: \"{'latency_approximation_type': ['flex']}\""),
+    click.option('--overwrite/--no_overwrite', default=True, help="overwrite existing files?"),
+    click.option('--papermode/--non-papermode', default=True, help="output 'paper-ready' figures or figures containing additional statistical data?"),
+    click.option('--output_filetype', type=click.Choice(['png', 'pdf', 'eps', "svg"]), multiple=True, default=["png"], help="the filetype which shall be created; may be given multiple times to save each figure in several formats"),
+    click.option('--filter_type', type=click.Choice(['strict', 'flex', 'no latencies']), default=None, help="If the solutions should be filtered for one type"),
+    click.option('--jobs', type=click.INT, default=1, help="number of processes among which the rendering of the plots is distributed"),
+    click.option('--render_cache/--no_render_cache', default=False, help="only render plots whose data changed, copying all others from a cache in the output directory"),
+    click.option('--data_only', is_flag=True, default=False, help="only export the data of the plots (see --data_format) without creating any figures"),
+    click.option('--data_format', type=click.Choice(['npz', 'json']), default="npz", help="the filetype of the data exported when using --data_only"),
+    click.option('--comparison_plots/--no_comparison_plots', default=False, help="additionally plot the comparison of the profits with and without latencies and write the compared profits"),
+]
+
+
+def _load_reduced_results(path):
+    """ Loads a reduced pickle or, if path is a directory, the reduced scenario split written by
+        reduce_to_plotdata_rr_seplp_optdynvmp --streaming.
+    """
+    if os.path.isdir(path):
+        from . import plot_data
+        return plot_data.read_scenario_split(path)
+    with tracer.span("load pickle", category="io", filename=path):
+        with open(path, "rb") as f:
+            return pickle.load(f, encoding='latin1')
+
+
+def latency_study_evaluation_options(command):
+    for option in reversed(_latency_study_evaluation_options):
+        command = option(command)
+    return command
+
+
+def _evaluate_latency_study(baseline_results,
+                            with_latencies_results,
+                            output_directory,
+                            exclude_generation_parameters,
+                            filter_parameter_keys,
+                            filter_exec_params,
+                            overwrite,
+                            papermode,
+                            output_filetype,
+                            filter_type,
+                            jobs,
+                            render_cache,
+                            data_only,
+                            data_format,
+                            comparison_plots):
+    """ Creates the heatmaps and runtime boxplots of the latency study given the reduced baseline and latency results.
+    """
+    from . import algorithm_heatmap_plots, runtime_evaluation
+
+    #get root logger
+    logger = logging.getLogger()
 
     logger.info("Loading algorithm identifiers and execution ids..")
 
@@ -154,12 +389,14 @@ def evaluate_separation_with_latencies( baseline_reduced_pickle,
 
     logger.info("Starting evaluation...")
 
-    if exclude_generation_parameters is not None:
-        exclude_generation_parameters = eval(exclude_generation_parameters)
-
     if filter_exec_params is not None:
         filter_exec_params = eval(filter_exec_params)
 
+    if data_only:
+        # the plotters only export the plot data when given a data filetype; matplotlib is then never imported
+        output_filetype = [data_format]
+    else:
+        output_filetype = list(output_filetype)
 
     algorithm_heatmap_plots.evaluate_latency_and_baseline (
         dc_baseline=baseline_results,
@@ -176,6 +413,9 @@ def evaluate_separation_with_latencies( baseline_reduced_pickle,
         output_path=output_directory,
         output_filetype=output_filetype,
         filter_exec_params=filter_exec_params,
+        number_of_jobs=jobs,
+        use_render_cache=render_cache,
+        plot_comparison=comparison_plots,
     )
 
     runtime_evaluation.evaluate_randround_runtimes_latency_study(
@@ -193,8 +433,94 @@ def evaluate_separation_with_latencies( baseline_reduced_pickle,
         output_path=output_directory,
         output_filetype=output_filetype,
         filter_exec_params=filter_exec_params,
+        number_of_jobs=jobs,
+        use_render_cache=render_cache,
     )
 
+
+@cli.command(short_help="Create plots comparing the DynVMP runtime with and without considering latencies")
+@trace_option
+@click.argument('baseline_reduced_pickle', type=click.Path())       #pickle in ALIB_EXPERIMENT_HOME/input storing baseline results
+@click.argument('with_latencies_reduced_pickle', type=click.Path())     #pickle in ALIB_EXPERIMENT_HOME/input storing randround results
+@click.argument('output_directory', type=click.Path())          #path to which the result will be written
+@latency_study_evaluation_options
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for stdout")
+def evaluate_separation_with_latencies(baseline_reduced_pickle,
+                                       with_latencies_reduced_pickle,
+                                       output_directory,
+                                       log_level_print,
+                                       log_level_file,
+                                       **evaluation_options):
+    from alib import util
+
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "evaluate_pickles_{}_{}.log".format(os.path.basename(with_latencies_reduced_pickle),
+                                                                os.path.basename(baseline_reduced_pickle)))
+    initialize_logger(log_file, log_level_print, log_level_file, allow_override=True)
+
+    baseline_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, baseline_reduced_pickle)
+    with_lat_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, with_latencies_reduced_pickle)
+
+    #get root logger
+    logger = logging.getLogger()
+
+    logger.info("Reading reduced baseline pickle at {}".format(baseline_pickle_path))
+    baseline_results = _load_reduced_results(baseline_pickle_path)
+
+    logger.info("Reading reduced with_latencies pickle at {}".format(with_latencies_reduced_pickle))
+    with_latencies_results = _load_reduced_results(with_lat_pickle_path)
+
+    _evaluate_latency_study(baseline_results, with_latencies_results, output_directory, **evaluation_options)
+
+
+@cli.command(short_help="Reduces the baseline and latency results and directly creates the latency study's plots")
+@trace_option
+@click.argument('baseline_pickle', type=click.Path())            #pickle in ALIB_EXPERIMENT_HOME/input storing raw baseline results
+@click.argument('with_latencies_pickle', type=click.Path())      #pickle in ALIB_EXPERIMENT_HOME/input storing raw randround results
+@click.argument('output_directory', type=click.Path())           #path to which the result will be written
+@click.option('--workers', type=click.INT, default=1, help="number of processes among which the reduction of the executions is distributed")
+@click.option('--incremental/--no_incremental', default=False, help="reuse cached reductions of unchanged executions")
+@click.option('--checkpoint/--no_checkpoint', default=False, help="additionally write the reduced pickles to ALIB_EXPERIMENT_HOME/output")
+@latency_study_evaluation_options
+@click.option('--log_level_print', type=click.STRING, default="info", help="log level for stdout")
+@click.option('--log_level_file', type=click.STRING, default="debug", help="log level for log file")
+def pipeline(baseline_pickle,
+             with_latencies_pickle,
+             output_directory,
+             workers,
+             incremental,
+             checkpoint,
+             log_level_print,
+             log_level_file,
+             **evaluation_options):
+    """ Reduces the raw scenario solution pickles baseline_pickle and with_latencies_pickle (both contained in
+        ALIB_EXPERIMENT_HOME/input) and hands the reduced results directly to the evaluation, as done by
+        evaluate_separation_with_latencies, without writing and re-reading the reduced pickles.
+
+        Using --checkpoint, the reduced pickles are nevertheless written to ALIB_EXPERIMENT_HOME/output (named as by
+        reduce_to_plotdata_rr_seplp_optdynvmp), such that the evaluation can later be repeated on its own.
+        The caches of --incremental are kept next to the reduced pickles' paths, regardless of --checkpoint.
+    """
+    from alib import util
+    from . import plot_data
+
+    util.ExperimentPathHandler.initialize(check_emptiness_log=False, check_emptiness_output=False)
+    log_file = os.path.join(util.ExperimentPathHandler.LOG_DIR,
+                            "pipeline_{}_{}.log".format(os.path.basename(with_latencies_pickle),
+                                                        os.path.basename(baseline_pickle)))
+    initialize_logger(log_file, log_level_print, log_level_file, allow_override=True)
+
+    reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(number_of_workers=workers,
+                                                                       incremental=incremental)
+    baseline_results = reducer.reduce_randround_result_collection(baseline_pickle,
+                                                                  write_output_pickle=checkpoint)
+    with_latencies_results = reducer.reduce_randround_result_collection(with_latencies_pickle,
+                                                                        write_output_pickle=checkpoint)
+
+    _evaluate_latency_study(baseline_results, with_latencies_results, output_directory, **evaluation_options)
+
 # --------------------------------------------- END ---------------------------------------------
 
 
@@ -0,0 +1,221 @@
+# MIT License
+#
+# Copyright (c) 2016-2018 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Precomputed metric values for the heatmap and boxplot plotters.
+
+Plotters evaluate the lookup functions of their metric specifications for each cell. As the same solution appears
+in the cells of many axes and filter specifications, the metric cube evaluates each metric once per solution of the
+registered solution storages, when the solution is first requested, and stores the values in a dense column over
+these solutions. Cells then gather the values of their solutions from the column. Each plotter owns the cube of its
+solution storages.
+"""
+
+import numpy as np
+
+from alib import util
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+
+def _pad(array, shape, fill_value):
+    """ Returns the array extended to the given shape, filling the new entries with fill_value. """
+    if array.shape == shape:
+        return array
+    padded = np.full(shape, fill_value, dtype=array.dtype)
+    padded[tuple(slice(0, length) for length in array.shape)] = array
+    return padded
+
+
+class MetricCube(object):
+    """ Stores, for each metric specification, the values of its lookup function over all solutions of the registered
+        scenario solution storages. Each solution corresponds to one row, i.e. one (storage, scenario_id, exec_id).
+
+        Columns are computed lazily: only the rows of requested solutions are evaluated, such that solutions excluded
+        by the filters of a plotter are never looked up. If the lookup function
+        fails for a row, the row is marked as failed and the lookup is re-run when the row is requested, such that
+        plotting raises exactly as when evaluating the lookup functions directly. Solutions that are not contained
+        in any registered storage are evaluated directly as well.
+
+        Comparison metrics are evaluated on pairs of solutions. If the specification provides a metric specification
+        for either element of the pairs ('pair_metric_specifications') and a vectorized 'combine_function' of their
+        values, the comparison is evaluated on the columns of these; otherwise, the lookup function is evaluated on
+        each pair.
+
+        Metrics reducing a statistic of the profits over a group of algorithm settings (e.g. the best profit over all
+        randomized rounding settings) may provide a 'profit_reduction' (statistic, settings_list, reduction). Their
+        columns are then derived from a matrix of the statistic per solution and setting, whose rows are built once for
+        all metrics, by reducing the columns of the group's settings.
+    """
+
+    def __init__(self):
+        self._registered_storages = {}
+        self._solutions = []
+        self._row_of_solution = {}
+        self.scenario_ids = []
+        self.exec_ids = []
+        self._columns = {}
+        self._profit_matrices = {}
+
+    def add_solution_storage(self, scenario_solution_storage, algorithm_id):
+        key = (id(scenario_solution_storage), algorithm_id)
+        if key in self._registered_storages:
+            return
+        self._registered_storages[key] = scenario_solution_storage
+        scenario_solution_dict = scenario_solution_storage.algorithm_scenario_solution_dictionary[algorithm_id]
+        for scenario_id, exec_solution_dict in scenario_solution_dict.items():
+            for exec_id, solution in exec_solution_dict.items():
+                if solution is None or id(solution) in self._row_of_solution:
+                    continue
+                self._row_of_solution[id(solution)] = len(self._solutions)
+                self._solutions.append(solution)
+                self.scenario_ids.append(scenario_id)
+                self.exec_ids.append(exec_id)
+        logger.debug("Metric cube contains {} solutions".format(len(self._solutions)))
+
+    def clear_values(self):
+        """ Drops all computed columns while keeping the registered solutions, such that the metrics are evaluated
+            anew on their next use.
+        """
+        self._columns = {}
+        self._profit_matrices = {}
+
+    def _get_column(self, metric_specification, rows):
+        """ Returns the values of the metric and the mask of failed lookups over all rows, of which (at least) the
+            given rows are computed.
+        """
+        entry = self._columns.get(id(metric_specification))
+        if entry is None:
+            entry = (metric_specification, np.empty(0, dtype=object), np.zeros(0, dtype=bool), np.zeros(0, dtype=bool))
+        _, values, failed, computed = entry
+        number_of_rows = len(self._solutions)
+        values = _pad(values, (number_of_rows,), None)
+        failed = _pad(failed, (number_of_rows,), False)
+        computed = _pad(computed, (number_of_rows,), False)
+        rows_to_compute = np.unique(rows[~computed[rows]])
+        if len(rows_to_compute):
+            # rows which are not derived from the profit matrix are evaluated by the lookup function
+            rows_to_look_up = rows_to_compute
+            if 'profit_reduction' in metric_specification:
+                reduced, rows_reduced = self._reduce_profit_matrix(metric_specification['profit_reduction'],
+                                                                   rows_to_compute)
+                values[rows_to_compute[rows_reduced]] = reduced
+                rows_to_look_up = rows_to_compute[~rows_reduced]
+            lookup_function = metric_specification['lookup_function']
+            for row in rows_to_look_up.tolist():
+                try:
+                    values[row] = lookup_function(self._solutions[row])
+                except Exception:
+                    values[row] = np.nan
+                    failed[row] = True
+            computed[rows_to_compute] = True
+        self._columns[id(metric_specification)] = (metric_specification, values, failed, computed)
+        return values, failed
+
+    def _get_profit_matrix(self, statistic, rows):
+        """ Returns the mapping of algorithm settings to columns, the matrix of the given statistic (e.g. 'max') of
+            the profits per solution and setting and the mask of the entries which are present, of which (at least)
+            the given rows are computed.
+        """
+        entry = self._profit_matrices.get(statistic)
+        if entry is None:
+            entry = ({}, np.empty((0, 0)), np.zeros((0, 0), dtype=bool), np.zeros(0, dtype=bool))
+        column_of_setting, values, present, computed = entry
+        computed = _pad(computed, (len(self._solutions),), False)
+        rows_to_compute = np.unique(rows[~computed[rows]]).tolist()
+        profits_of_rows = []
+        for row in rows_to_compute:
+            profits = getattr(self._solutions[row], 'profits', None)
+            profits_of_rows.append(profits if isinstance(profits, dict) else {})
+            for setting in profits_of_rows[-1]:
+                column_of_setting.setdefault(setting, len(column_of_setting))
+        shape = (len(self._solutions), len(column_of_setting))
+        values = _pad(values, shape, np.nan)
+        present = _pad(present, shape, False)
+        for row, profits in zip(rows_to_compute, profits_of_rows):
+            for setting, aggregated_data in profits.items():
+                try:
+                    values[row, column_of_setting[setting]] = getattr(aggregated_data, statistic)
+                except (AttributeError, TypeError, ValueError):
+                    continue
+                present[row, column_of_setting[setting]] = True
+        computed[rows_to_compute] = True
+        self._profit_matrices[statistic] = (column_of_setting, values, present, computed)
+        return column_of_setting, values, present
+
+    def _reduce_profit_matrix(self, profit_reduction, rows):
+        """ Returns the reduced profits of the given rows having all settings of the group, together with the mask of
+            these rows.
+        """
+        statistic, settings_list, reduction = profit_reduction
+        column_of_setting, values, present = self._get_profit_matrix(statistic, rows)
+        values, present = values[rows], present[rows]
+        if not settings_list or any(setting not in column_of_setting for setting in settings_list):
+            return np.empty(0), np.zeros(len(rows), dtype=bool)
+        columns = [column_of_setting[setting] for setting in settings_list]
+        rows_reduced = present[:, columns].all(axis=1)
+        return reduction(values[rows_reduced][:, columns], axis=1), rows_reduced
+
+    def get_values(self, metric_specification, solutions):
+        """ Returns the list of values of the metric for the given solutions, in the given order.
+        """
+        if len(solutions) == 0:
+            return []
+        lookup_function = metric_specification['lookup_function']
+        # reduced results are namedtuples themselves, hence pairs of solutions are identified by their exact type
+        if type(solutions[0]) is tuple:
+            if 'combine_function' in metric_specification:
+                values = self._get_combined_pair_values(metric_specification, solutions)
+                if values is not None:
+                    return values
+            return [lookup_function(pair) for pair in solutions]
+
+        rows = np.fromiter((self._row_of_solution.get(id(solution), -1) for solution in solutions),
+                           dtype=np.int64, count=len(solutions))
+        if (rows < 0).any():
+            return [lookup_function(solution) for solution in solutions]
+        values, failed = self._get_column(metric_specification, rows)
+        if failed[rows].any():
+            return [lookup_function(solution) for solution in solutions]
+        return values[rows].tolist()
+
+    def get_scenario_and_exec_ids(self, solutions):
+        """ Returns the lists of scenario ids and of execution ids of the given registered solutions.
+        """
+        rows = [self._row_of_solution[id(solution)] for solution in solutions]
+        return [self.scenario_ids[row] for row in rows], [self.exec_ids[row] for row in rows]
+
+    def _get_combined_pair_values(self, metric_specification, pairs):
+        """ Returns the values of the comparison for the given pairs or None if these cannot be gathered from the
+            columns, i.e. if a solution is not registered or its lookup failed.
+        """
+        columns = []
+        for position, element_specification in enumerate(metric_specification['pair_metric_specifications']):
+            rows = np.fromiter((self._row_of_solution.get(id(pair[position]), -1) for pair in pairs),
+                               dtype=np.int64, count=len(pairs))
+            if (rows < 0).any():
+                return None
+            values, failed = self._get_column(element_specification, rows)
+            if failed[rows].any():
+                return None
+            columns.append(values[rows].astype(float))
+        return np.asarray(metric_specification['combine_function'](*columns)).tolist()
@@ -22,6 +22,9 @@
 #
 
 import os
+import functools
+import hashlib
+import multiprocessing
 from collections import namedtuple
 import numpy as np
 from alib import solutions, util
@@ -33,6 +36,12 @@ except ImportError:
     import pickle
 
 from vnep_approx import vine, treewidth_model
+from evaluation_acm_ccr_2019.tracing import tracer, dispatch_traced
+from evaluation_acm_ccr_2019.reduced_data import SubstrateResourceIndex, ColumnarReducedRandRoundResults, \
+    get_rr_settings_name
+# re-exported, as reduced pickles reference AggregatedData of this module
+from evaluation_acm_ccr_2019.reduced_data import AggregatedData, get_aggregated_data, merge_aggregated_data, \
+    merge_list_of_aggregated_data
 
 REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
 
@@ -72,31 +81,6 @@ ReducedRandRoundSepLPOptDynVMPCollectionResult = namedtuple(
     ],
 )
 
-AggregatedData = namedtuple(
-    "AggregatedData",
-    [
-        "min",
-        "mean",
-        "max",
-        "std_dev",
-        "value_count"
-    ]
-)
-
-
-def get_aggregated_data(list_of_values):
-    _min = np.min(list_of_values)
-    _mean = np.mean(list_of_values)
-    _max = np.max(list_of_values)
-    _std_dev = np.std(list_of_values)
-    _value_count = len(list_of_values)
-    return AggregatedData(min=_min,
-                          max=_max,
-                          mean=_mean,
-                          std_dev=_std_dev,
-                          value_count=_value_count)
-
-
 logger = util.get_logger(__name__, make_file=False, propagate=True)
 
 
@@ -124,11 +108,13 @@ class OfflineViNEResultCollectionReducer(object):
         logger.info("\nWill read from ..\n\t{} \n\t\tand store reduced data into\n\t{}\n".format(baseline_solutions_input_pickle_path, reduced_baseline_solutions_output_pickle_path))
 
         logger.info("Reading pickle file at {}".format(baseline_solutions_input_pickle_path))
-        with open(baseline_solutions_input_pickle_path, "rb") as input_file:
-            scenario_solution_storage = pickle.load(input_file)
+        with tracer.span("load pickle", category="io", filename=baseline_solutions_input_pickle_path):
+            with open(baseline_solutions_input_pickle_path, "rb") as input_file:
+                scenario_solution_storage = pickle.load(input_file)
 
         ssd = scenario_solution_storage.algorithm_scenario_solution_dictionary
         ssd_reduced = {}
+        resource_indices = {}
         for algorithm in list(ssd.keys()):
             logger.info(".. Reducing results of algorithm {}".format(algorithm))
             ssd_reduced[algorithm] = {}
@@ -138,6 +124,9 @@ class OfflineViNEResultCollectionReducer(object):
                 for exec_id in list(ssd[algorithm][scenario_id].keys()):
                     ssd_reduced[algorithm][scenario_id][exec_id] = {}
                     params, scenario = scenario_solution_storage.scenario_parameter_container.scenario_triple[scenario_id]
+                    if scenario_id not in resource_indices:
+                        resource_indices[scenario_id] = SubstrateResourceIndex(scenario)
+                    resource_index = resource_indices[scenario_id]
                     solution_collection = ssd[algorithm][scenario_id][exec_id].get_solution()
                     for vine_settings, result_list in solution_collection.items():
                         ssd_reduced[algorithm][scenario_id][exec_id][vine_settings] = []
@@ -162,7 +151,8 @@ class OfflineViNEResultCollectionReducer(object):
                             solution_object = result.get_solution()
                             mappings = solution_object.request_mapping
 
-                            load = _initialize_load_dict(scenario)
+                            load_slots = []
+                            load_demands = []
                             for req in scenario.requests:
                                 runtimes_per_request_vals.append(
                                     result.runtime_per_request[req]
@@ -170,14 +160,15 @@ class OfflineViNEResultCollectionReducer(object):
                                 req_mapping = mappings[req]
                                 if req_mapping is not None and req_mapping.is_embedded:
                                     profit_vals[result_index] += req.profit
-                                    _compute_mapping_load(load, req, req_mapping)
+                                    _compute_mapping_load(resource_index, load_slots, load_demands, req, req_mapping)
 
                             edge_mapping_failed, lp_failed, is_embedded, node_mapping_failed = self._count_mapping_status(result)
                             num_edge_mapping_failed += edge_mapping_failed
                             num_initial_lp_failed += lp_failed
                             num_node_mapping_failed += node_mapping_failed
 
-                            max_edge_load, max_node_load = get_max_node_and_edge_load(load, scenario.substrate)
+                            load = resource_index.compute_load_vector(load_slots, load_demands)
+                            max_edge_load, max_node_load = resource_index.get_max_node_and_edge_load(load)
                             max_node_load_vals[result_index] = max_node_load
                             max_edge_load_vals[result_index] = max_edge_load
                             total_runtime_vals[result_index] = result.total_runtime
@@ -200,8 +191,9 @@ class OfflineViNEResultCollectionReducer(object):
         scenario_solution_storage.algorithm_scenario_solution_dictionary = ssd_reduced
 
         logger.info("Writing result pickle to {}".format(reduced_baseline_solutions_output_pickle_path))
-        with open(reduced_baseline_solutions_output_pickle_path, "wb") as f:
-            pickle.dump(scenario_solution_storage, f)
+        with tracer.span("dump pickle", category="io", filename=reduced_baseline_solutions_output_pickle_path):
+            with open(reduced_baseline_solutions_output_pickle_path, "wb") as f:
+                pickle.dump(scenario_solution_storage, f)
         logger.info("All done.")
         return scenario_solution_storage
 
@@ -225,14 +217,213 @@ class OfflineViNEResultCollectionReducer(object):
         return num_edge_mapping_failed, num_initial_lp_failed, num_is_embedded, num_node_mapping_failed
 
 
+SCENARIO_SPLIT_HEADER_FILENAME = "header.pickle"
+SCENARIO_SPLIT_FILENAME_PREFIX = "scenario_"
+REDUCTION_CACHE_SUFFIX = ".cache"
+# version of the reduced records stored in the reduction cache; must be incremented whenever reduce_single_solution or
+# the layout of the reduced records changes, such that caches written before are discarded
+REDUCTION_CACHE_VERSION = 1
+
+
+def _get_scenario_split_path(directory, sc_id):
+    return os.path.join(directory, "{}{}.pickle".format(SCENARIO_SPLIT_FILENAME_PREFIX, sc_id))
+
+
+def _write_scenario_split_header(scenario_solution_storage, output_directory, algorithm_ids):
+    scenario_solution_storage.scenario_parameter_container.scenario_list = None
+    scenario_solution_storage.scenario_parameter_container.scenario_triple = None
+    scenario_solution_storage.algorithm_scenario_solution_dictionary = {alg: {} for alg in algorithm_ids}
+    header_path = os.path.join(output_directory, SCENARIO_SPLIT_HEADER_FILENAME)
+    logger.info("Writing header of scenario split to {}".format(header_path))
+    with open(header_path, "wb") as f:
+        pickle.dump(scenario_solution_storage, f)
+
+
+def _write_scenarios_of_storage(scenario_solution_storage, output_directory):
+    """ Writes one pickle per scenario of the storage into output_directory, removing the scenarios' solutions from
+        the storage in the process, and returns the written scenario ids.
+    """
+    ssd = scenario_solution_storage.algorithm_scenario_solution_dictionary
+    scenario_ids = sorted(set(sc_id for scenario_solution_dict in ssd.values() for sc_id in scenario_solution_dict.keys()))
+    for sc_id in scenario_ids:
+        algorithm_solutions = {alg: ssd[alg].pop(sc_id) for alg in ssd.keys() if sc_id in ssd[alg]}
+        scenario_path = _get_scenario_split_path(output_directory, sc_id)
+        logger.info("   .. writing scenario {} to {}".format(sc_id, scenario_path))
+        with open(scenario_path, "wb") as f:
+            pickle.dump((sc_id, algorithm_solutions), f)
+    return scenario_ids
+
+
+def write_scenario_split(scenario_solution_storage, output_directory):
+    """ Splits a scenario solution storage into a directory holding a header pickle (the storage without any
+        solutions) and one pickle per scenario, mapping algorithm ids to the execution id -> solution dicts
+        of that scenario. Such a directory can be reduced scenario by scenario without ever holding all
+        solutions in memory (see RandRoundSepLPOptDynVMPCollectionResultReducer.reduce_randround_result_collection_streaming).
+
+        Note that the passed storage is emptied in the process.
+    """
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    algorithm_ids = list(scenario_solution_storage.algorithm_scenario_solution_dictionary.keys())
+    _write_scenarios_of_storage(scenario_solution_storage, output_directory)
+    _write_scenario_split_header(scenario_solution_storage, output_directory, algorithm_ids)
+
+
+def write_scenario_split_of_pickles(input_pickle_paths, output_directory):
+    """ Writes a single scenario split (see write_scenario_split) of several scenario solution pickles covering
+        disjoint sets of scenarios, e.g. the results of executing an experiment in chunks of scenario indices.
+        The pickles are loaded one after the other, such that only a single one needs to fit into memory. The
+        header is taken from the first pickle.
+
+        Raises a ValueError if a scenario is contained in more than one of the pickles.
+    """
+    if not input_pickle_paths:
+        raise ValueError("At least one scenario solution pickle must be given")
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    header_storage = None
+    algorithm_ids = []
+    written_scenario_ids = set()
+    for input_pickle_path in input_pickle_paths:
+        logger.info("Reading pickle file at {}".format(input_pickle_path))
+        with tracer.span("load pickle", category="io", filename=input_pickle_path):
+            with open(input_pickle_path, "rb") as f:
+                scenario_solution_storage = pickle.load(f)
+        ssd = scenario_solution_storage.algorithm_scenario_solution_dictionary
+        scenario_ids = set(sc_id for scenario_solution_dict in ssd.values() for sc_id in scenario_solution_dict.keys())
+        if scenario_ids & written_scenario_ids:
+            raise ValueError("The scenarios {} of {} are contained in a previously split pickle".format(
+                sorted(scenario_ids & written_scenario_ids), input_pickle_path))
+        algorithm_ids.extend(alg for alg in ssd.keys() if alg not in algorithm_ids)
+        written_scenario_ids.update(_write_scenarios_of_storage(scenario_solution_storage, output_directory))
+        if header_storage is None:
+            header_storage = scenario_solution_storage
+    _write_scenario_split_header(header_storage, output_directory, algorithm_ids)
+
+
+def read_scenario_split(input_directory):
+    """ Returns the scenario solution storage of a scenario split (see write_scenario_split), e.g. of the reduced
+        results written by RandRoundSepLPOptDynVMPCollectionResultReducer.reduce_randround_result_collection_streaming.
+    """
+    header_path = os.path.join(input_directory, SCENARIO_SPLIT_HEADER_FILENAME)
+    with tracer.span("load pickle", category="io", filename=header_path):
+        with open(header_path, "rb") as f:
+            scenario_solution_storage = pickle.load(f)
+    ssd = scenario_solution_storage.algorithm_scenario_solution_dictionary
+    for scenario_path in _get_scenario_split_files(input_directory):
+        with tracer.span("load pickle", category="io", filename=scenario_path):
+            with open(scenario_path, "rb") as f:
+                sc_id, algorithm_solutions = pickle.load(f)
+        for alg, ex_param_solution_dict in algorithm_solutions.items():
+            ssd.setdefault(alg, {})[sc_id] = ex_param_solution_dict
+    return scenario_solution_storage
+
+
+#: fixed protocol of the pickled LP status and statistics, such that digests do not change with the Python version
+REDUCTION_DIGEST_PICKLE_PROTOCOL = 4
+
+
+def _update_digest_with_values(digest, values):
+    values = np.asarray(values, dtype=np.float64)
+    digest.update(np.int64(values.size).tobytes())
+    digest.update(values.tobytes())
+
+
+def _compute_solution_digest(solution):
+    """ Returns the digest of exactly those fields of a raw RandRoundSepLPOptDynVMPCollectionResult that are read by
+        RandRoundSepLPOptDynVMPCollectionResultReducer.reduce_single_solution. The randomized rounding settings are
+        ordered by name and the values are hashed as float arrays, such that the digest identifies an execution's
+        result across re-runs: it neither depends on the order in which the solutions were added nor on objects
+        (e.g. sets, graphs) which the reduction does not consider.
+    """
+    digest = hashlib.sha1()
+    if solution is None:
+        return digest.hexdigest()
+    lp_information = solution.lp_computation_information
+    digest.update(pickle.dumps((lp_information.status,
+                                lp_information.profit,
+                                lp_information.number_of_generated_mappings,
+                                lp_information.time_preprocessing,
+                                lp_information.time_optimization),
+                               protocol=REDUCTION_DIGEST_PICKLE_PROTOCOL))
+    _update_digest_with_values(digest, lp_information.tree_decomp_runtimes)
+    _update_digest_with_values(digest, lp_information.dynvmp_init_runtimes)
+    _update_digest_with_values(digest, lp_information.gurobi_runtimes)
+    digest.update(np.int64(len(lp_information.dynvmp_computation_runtimes)).tobytes())
+    for values in lp_information.dynvmp_computation_runtimes:
+        _update_digest_with_values(digest, values)
+
+    for algorithm_sub_parameters in sorted(solution.solutions.keys(), key=get_rr_settings_name):
+        digest.update(get_rr_settings_name(algorithm_sub_parameters).encode("utf-8"))
+        rounding_values = []
+        # number of latencies of each request mapping, or -1 for rounding results without solution
+        latency_counts = []
+        latencies = []
+        for rounding_result in solution.solutions[algorithm_sub_parameters]:
+            rounding_values.extend((rounding_result.max_node_load, rounding_result.max_edge_load,
+                                    rounding_result.time_to_round_solution, rounding_result.profit))
+            if rounding_result.solution is None:
+                latency_counts.append(-1)
+                continue
+            for mapping in rounding_result.solution.request_mapping.values():
+                mapping_latencies = list(mapping.mapping_latencies.values())
+                latency_counts.append(len(mapping_latencies))
+                latencies.append(mapping.latency_limit)
+                latencies.extend(mapping_latencies)
+        _update_digest_with_values(digest, rounding_values)
+        _update_digest_with_values(digest, latency_counts)
+        _update_digest_with_values(digest, latencies)
+    return digest.hexdigest()
+
+
+def _get_scenario_split_files(input_directory):
+    scenario_files = []
+    for filename in os.listdir(input_directory):
+        if filename.startswith(SCENARIO_SPLIT_FILENAME_PREFIX) and filename.endswith(".pickle"):
+            sc_id = int(filename[len(SCENARIO_SPLIT_FILENAME_PREFIX):-len(".pickle")])
+            scenario_files.append((sc_id, os.path.join(input_directory, filename)))
+    return [path for (_, path) in sorted(scenario_files)]
+
+
+def _reduce_single_randround_solution(solution):
+    # module-level helper such that it can be dispatched to the worker processes of a multiprocessing.Pool
+    with tracer.span("reduce execution", category="reduction"):
+        return RandRoundSepLPOptDynVMPCollectionResultReducer().reduce_single_solution(solution)
+
+
+def _reduce_randround_scenario_file(output_directory, scenario_path):
+    # module-level helper: reduces the solutions of a single scenario of a scenario split and writes the reduced
+    # records to the same file name in output_directory, such that only the scenario id is returned to the caller
+    with tracer.span("load pickle", category="io", filename=scenario_path):
+        with open(scenario_path, "rb") as f:
+            sc_id, algorithm_solutions = pickle.load(f)
+    reducer = RandRoundSepLPOptDynVMPCollectionResultReducer()
+    for alg, ex_param_solution_dict in algorithm_solutions.items():
+        with tracer.span("reduce scenario", category="reduction", algorithm=alg, scenario=sc_id):
+            for ex_id, solution in ex_param_solution_dict.items():
+                ex_param_solution_dict[ex_id] = reducer.reduce_single_solution(solution)
+    reduced_scenario_path = os.path.join(output_directory, os.path.basename(scenario_path))
+    with tracer.span("dump pickle", category="io", filename=reduced_scenario_path):
+        with open(reduced_scenario_path, "wb") as f:
+            pickle.dump((sc_id, algorithm_solutions), f)
+    return sc_id
+
+
 class RandRoundSepLPOptDynVMPCollectionResultReducer(object):
 
-    def __init__(self):
-        pass
+    def __init__(self, number_of_workers=1, incremental=False):
+        if number_of_workers < 1:
+            raise ValueError("The number of workers must be at least 1, got {}".format(number_of_workers))
+        self.number_of_workers = number_of_workers
+        self.incremental = incremental
 
     def reduce_randround_result_collection(self,
                                            randround_solutions_input_pickle_name,
-                                           reduced_randround_solutions_output_pickle_name=None):
+                                           reduced_randround_solutions_output_pickle_name=None,
+                                           write_output_pickle=True):
+        """ Reduces the scenario solution storage contained in ALIB_EXPERIMENT_HOME/input and returns it. Unless
+            write_output_pickle is False, the reduced storage is also written to ALIB_EXPERIMENT_HOME/output.
+        """
 
         randround_solutions_input_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR,
                                                              randround_solutions_input_pickle_name)
@@ -249,25 +440,170 @@ class RandRoundSepLPOptDynVMPCollectionResultReducer(object):
             randround_solutions_input_pickle_path, reduced_randround_solutions_output_pickle_path))
 
         logger.info("Reading pickle file at {}".format(randround_solutions_input_pickle_path))
-        with open(randround_solutions_input_pickle_path, "rb") as f:
-            sss = pickle.load(f)
+        with tracer.span("load pickle", category="io", filename=randround_solutions_input_pickle_path):
+            with open(randround_solutions_input_pickle_path, "rb") as f:
+                sss = pickle.load(f)
 
         sss.scenario_parameter_container.scenario_list = None
         sss.scenario_parameter_container.scenario_triple = None
 
+        if self.incremental:
+            self._reduce_incrementally(sss, reduced_randround_solutions_output_pickle_path + REDUCTION_CACHE_SUFFIX)
+        else:
+            for alg, scenario_solution_dict in sss.algorithm_scenario_solution_dictionary.items():
+                logger.info(".. Reducing results of algorithm {}".format(alg))
+                with tracer.span("reduce algorithm", category="reduction", algorithm=alg):
+                    if self.number_of_workers > 1:
+                        self._reduce_scenario_solution_dict_in_parallel(scenario_solution_dict)
+                        continue
+                    for sc_id, ex_param_solution_dict in scenario_solution_dict.items():
+                        logger.info("   .. handling scenario {}".format(sc_id))
+                        with tracer.span("reduce scenario", category="reduction", algorithm=alg, scenario=sc_id):
+                            for ex_id, solution in ex_param_solution_dict.items():
+                                compressed = self.reduce_single_solution(solution)
+                                ex_param_solution_dict[ex_id] = compressed
+
+        if write_output_pickle:
+            logger.info("Writing result pickle to {}".format(reduced_randround_solutions_output_pickle_path))
+            with tracer.span("dump pickle", category="io", filename=reduced_randround_solutions_output_pickle_path):
+                with open(reduced_randround_solutions_output_pickle_path, "wb") as f:
+                    pickle.dump(sss, f)
+        logger.info("All done.")
+        return sss
+
+    def _reduce_incrementally(self, sss, cache_path):
+        """ Reduces only those executions whose raw solution is not contained in the sidecar cache at cache_path.
+
+            The cache stores the REDUCTION_CACHE_VERSION it was written with and maps (algorithm_id, scenario_id,
+            exec_id) to the digest of the fields of the raw solution read by the reduction (see
+            _compute_solution_digest) and the corresponding reduced record. Caches of another version are discarded.
+            Records whose digest matches are reused, all others are reduced (using the configured number of workers).
+            Afterwards, the cache is rewritten to contain exactly the current executions.
+        """
+        cache = {}
+        if os.path.exists(cache_path):
+            logger.info("Reading reduction cache at {}".format(cache_path))
+            with tracer.span("load pickle", category="io", filename=cache_path):
+                with open(cache_path, "rb") as f:
+                    cache_content = pickle.load(f)
+            # caches written before the version was introduced are plain dicts of the entries
+            cache_version = cache_content.get("version")
+            if cache_version == REDUCTION_CACHE_VERSION:
+                cache = cache_content["entries"]
+            else:
+                logger.info(".. Discarding reduction cache of version {}, the current version is {}".format(
+                    cache_version, REDUCTION_CACHE_VERSION))
+
+        updated_cache = {}
+        misses = []
         for alg, scenario_solution_dict in sss.algorithm_scenario_solution_dictionary.items():
-            logger.info(".. Reducing results of algorithm {}".format(alg))
             for sc_id, ex_param_solution_dict in scenario_solution_dict.items():
-                logger.info("   .. handling scenario {}".format(sc_id))
                 for ex_id, solution in ex_param_solution_dict.items():
-                    compressed = self.reduce_single_solution(solution)
-                    ex_param_solution_dict[ex_id] = compressed
+                    key = (alg, sc_id, ex_id)
+                    digest = _compute_solution_digest(solution)
+                    cached_entry = cache.get(key)
+                    if cached_entry is not None and cached_entry[0] == digest:
+                        updated_cache[key] = cached_entry
+                        ex_param_solution_dict[ex_id] = _restore_shared_references(cached_entry[1], solution)
+                    else:
+                        updated_cache[key] = (digest, None)
+                        misses.append(key)
+
+        logger.info(".. Reusing {} cached reductions, reducing {} new or changed executions".format(
+            len(updated_cache) - len(misses), len(misses)))
+
+        ssd = sss.algorithm_scenario_solution_dictionary
+        raw_solutions = [ssd[alg][sc_id][ex_id] for (alg, sc_id, ex_id) in misses]
+        with tracer.span("reduce changed executions", category="reduction", executions=len(misses)):
+            for (alg, sc_id, ex_id), raw_solution, compressed in zip(misses, raw_solutions,
+                                                                     self._reduce_solutions(raw_solutions)):
+                updated_cache[(alg, sc_id, ex_id)] = (updated_cache[(alg, sc_id, ex_id)][0], compressed)
+                ssd[alg][sc_id][ex_id] = _restore_shared_references(compressed, raw_solution)
+
+        logger.info("Writing reduction cache to {}".format(cache_path))
+        with tracer.span("dump pickle", category="io", filename=cache_path):
+            with open(cache_path, "wb") as f:
+                pickle.dump({"version": REDUCTION_CACHE_VERSION, "entries": updated_cache}, f)
+
+    def _reduce_solutions(self, raw_solutions):
+        if self.number_of_workers == 1 or len(raw_solutions) <= 1:
+            for raw_solution in raw_solutions:
+                yield self.reduce_single_solution(raw_solution)
+            return
+        chunksize = max(1, len(raw_solutions) // (4 * self.number_of_workers))
+        pool = multiprocessing.Pool(processes=self.number_of_workers)
+        try:
+            for compressed in dispatch_traced(functools.partial(pool.imap, chunksize=chunksize),
+                                              _reduce_single_randround_solution, raw_solutions):
+                yield compressed
+        finally:
+            pool.close()
+            pool.join()
+
+    def reduce_randround_result_collection_streaming(self,
+                                                     randround_solutions_input_directory_name,
+                                                     reduced_randround_solutions_output_directory_name=None):
+        """ Reduces a scenario split (see write_scenario_split) contained in ALIB_EXPERIMENT_HOME/input into a
+            scenario split of the reduced results in ALIB_EXPERIMENT_HOME/output, which can be read via
+            read_scenario_split. Scenarios are loaded, reduced and written one at a time (or one per worker), such
+            that the peak memory is bounded by a single scenario's solutions instead of the whole experiment.
+
+            Returns the path of the output directory.
+        """
+        input_directory = os.path.join(util.ExperimentPathHandler.INPUT_DIR,
+                                       randround_solutions_input_directory_name)
+
+        if reduced_randround_solutions_output_directory_name is None:
+            file_basename = os.path.basename(os.path.normpath(input_directory)).split(".")[0]
+            reduced_randround_solutions_output_directory_name = file_basename + "_reduced"
+        output_directory = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR,
+                                        reduced_randround_solutions_output_directory_name)
+
+        logger.info("\nWill stream from ..\n\t{} \n\t\tand store reduced data into\n\t{}\n".format(
+            input_directory, output_directory))
+        if not os.path.exists(output_directory):
+            os.makedirs(output_directory)
+
+        header_path = os.path.join(input_directory, SCENARIO_SPLIT_HEADER_FILENAME)
+        with tracer.span("load pickle", category="io", filename=header_path):
+            with open(header_path, "rb") as f:
+                header = pickle.load(f)
+        _write_scenario_split_header(header, output_directory,
+                                     list(header.algorithm_scenario_solution_dictionary.keys()))
+
+        scenario_files = _get_scenario_split_files(input_directory)
+        reduce_scenario_file = functools.partial(_reduce_randround_scenario_file, output_directory)
+
+        pool = None
+        if self.number_of_workers > 1:
+            pool = multiprocessing.Pool(processes=self.number_of_workers)
+            reduced_scenario_ids = dispatch_traced(pool.imap, reduce_scenario_file, scenario_files)
+        else:
+            reduced_scenario_ids = map(reduce_scenario_file, scenario_files)
+
+        try:
+            for sc_id in reduced_scenario_ids:
+                logger.info("   .. reduced scenario {}".format(sc_id))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
-        logger.info("Writing result pickle to {}".format(reduced_randround_solutions_output_pickle_path))
-        with open(reduced_randround_solutions_output_pickle_path, "wb") as f:
-            pickle.dump(sss, f)
         logger.info("All done.")
-        return sss
+        return output_directory
+
+    def _reduce_scenario_solution_dict_in_parallel(self, scenario_solution_dict):
+        """ Shards the (scenario_id, exec_id) pairs of a single algorithm across a process pool and writes the
+            reduced results back into scenario_solution_dict, such that the layout is the one of the sequential path.
+        """
+        keys = [(sc_id, ex_id)
+                for sc_id, ex_param_solution_dict in scenario_solution_dict.items()
+                for ex_id in ex_param_solution_dict.keys()]
+        raw_solutions = [scenario_solution_dict[sc_id][ex_id] for (sc_id, ex_id) in keys]
+
+        logger.info("   .. distributing {} executions across {} workers".format(len(keys), self.number_of_workers))
+        for (sc_id, ex_id), raw_solution, compressed in zip(keys, raw_solutions, self._reduce_solutions(raw_solutions)):
+            scenario_solution_dict[sc_id][ex_id] = _restore_shared_references(compressed, raw_solution)
 
     def _extract_latency_information(self, solution: RandRoundSepLPOptDynVMPCollectionResult):
         values = list()
@@ -341,6 +677,30 @@ class RandRoundSepLPOptDynVMPCollectionResultReducer(object):
         return solution_reduced
 
 
+def _restore_shared_references(reduced_solution, raw_solution):
+    """ Results returned by worker processes are copies. To obtain exactly the pickle of the sequential reduction,
+        the objects that reduce_single_solution takes over from the raw solution (algorithm sub parameters used as keys
+        and the LP statistics) are replaced by the original ones, such that pickle's memoization sees the same objects.
+    """
+    if reduced_solution is None:
+        return None
+    lp_information = raw_solution.lp_computation_information
+    dict_fields = ["max_node_loads", "max_edge_loads", "rounding_runtimes", "profits"]
+    restored_dicts = {
+        field: {algorithm_sub_parameters: getattr(reduced_solution, field)[algorithm_sub_parameters]
+                for algorithm_sub_parameters in raw_solution.solutions.keys()}
+        for field in dict_fields
+    }
+    return reduced_solution._replace(
+        lp_time_preprocess=lp_information.time_preprocessing,
+        lp_time_optimization=lp_information.time_optimization,
+        lp_status=lp_information.status,
+        lp_profit=lp_information.profit,
+        lp_generated_columns=lp_information.number_of_generated_mappings,
+        **restored_dicts
+    )
+
+
 def _initialize_load_dict(scenario):
     load = dict([((u, v), 0.0) for (u, v) in scenario.substrate.edges])
     for u in scenario.substrate.nodes:
@@ -349,41 +709,66 @@ def _initialize_load_dict(scenario):
     return load
 
 
-def _compute_mapping_load(load, req, req_mapping):
+def get_max_node_and_edge_load(load_dict, substrate):
+    """ Returns the maximal edge and node load of a dict mapping resources to their loads. The reduction accumulates
+        the loads via SubstrateResourceIndex instead, whose get_max_node_and_edge_load yields the same values.
+    """
+    max_node_load = 0
+    max_edge_load = 0
+    for resource, value in load_dict.items():
+        x, y = resource
+        if resource in substrate.edges:
+            max_edge_load = max(max_edge_load, value)
+        elif x in substrate.get_types() and y in substrate.nodes:
+            max_node_load = max(max_node_load, value)
+        else:
+            raise ValueError("Invalid resource {}".format(resource))
+    return max_edge_load, max_node_load
+
+
+def _compute_mapping_load(resource_index, slots, demands, req, req_mapping):
     for i, u in req_mapping.mapping_nodes.items():
-        node_demand = req.get_node_demand(i)
-        load[(req.get_type(i), u)] += node_demand
+        slots.append(resource_index.get_slot((req.get_type(i), u)))
+        demands.append(req.get_node_demand(i))
 
     if isinstance(req_mapping, solutions.Mapping):
-        _compute_mapping_edge_load_unsplittable(load, req, req_mapping)
+        _compute_mapping_edge_load_unsplittable(resource_index, slots, demands, req, req_mapping)
     elif isinstance(req_mapping, vine.SplittableMapping):
-        _compute_mapping_edge_load_splittable(load, req, req_mapping)
-    return load
+        _compute_mapping_edge_load_splittable(resource_index, slots, demands, req, req_mapping)
 
 
-def _compute_mapping_edge_load_unsplittable(load, req, req_mapping):
+def _compute_mapping_edge_load_unsplittable(resource_index, slots, demands, req, req_mapping):
     for ij, sedge_list in req_mapping.mapping_edges.items():
         edge_demand = req.get_edge_demand(ij)
         for uv in sedge_list:
-            load[uv] += edge_demand
+            slots.append(resource_index.get_slot(uv))
+            demands.append(edge_demand)
 
 
-def _compute_mapping_edge_load_splittable(load, req, req_mapping):
+def _compute_mapping_edge_load_splittable(resource_index, slots, demands, req, req_mapping):
     for ij, edge_vars_dict in req_mapping.mapping_edges.items():
         edge_demand = req.get_edge_demand(ij)
         for uv, x in list(edge_vars_dict.items()):
-            load[uv] += edge_demand * x
-
-
-def get_max_node_and_edge_load(load_dict, substrate):
-    max_node_load = 0
-    max_edge_load = 0
-    for resource, value in load_dict.items():
-        x, y = resource
-        if resource in substrate.edges:
-            max_edge_load = max(max_edge_load, value)
-        elif x in substrate.get_types() and y in substrate.nodes:
-            max_node_load = max(max_node_load, value)
-        else:
-            raise ValueError("Invalid resource {}".format(resource))
-    return max_edge_load, max_node_load
+            slots.append(resource_index.get_slot(uv))
+            demands.append(edge_demand * x)
+
+
+def convert_reduced_pickle_to_columnar(reduced_pickle_name, npz_output_name=None,
+                                       algorithm_id="RandRoundSepLPOptDynVMPCollection"):
+    """ Reads a reduced pickle from ALIB_EXPERIMENT_HOME/input and writes its columnar representation
+        as .npz into ALIB_EXPERIMENT_HOME/output.
+    """
+    reduced_pickle_path = os.path.join(util.ExperimentPathHandler.INPUT_DIR, reduced_pickle_name)
+    if npz_output_name is None:
+        npz_output_name = os.path.basename(reduced_pickle_path).split(".")[0] + "_columnar.npz"
+    npz_output_path = os.path.join(util.ExperimentPathHandler.OUTPUT_DIR, npz_output_name)
+
+    logger.info("Reading reduced pickle at {}".format(reduced_pickle_path))
+    with tracer.span("load pickle", category="io", filename=reduced_pickle_path):
+        with open(reduced_pickle_path, "rb") as f:
+            scenario_solution_storage = pickle.load(f)
+
+    columnar = ColumnarReducedRandRoundResults.from_scenario_solution_storage(scenario_solution_storage, algorithm_id)
+    logger.info("Writing {} rows in columnar format to {}".format(len(columnar), npz_output_path))
+    columnar.save(npz_output_path)
+    return columnar
@@ -0,0 +1,247 @@
+# MIT License
+#
+# Copyright (c) 2016-2018 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""NumPy data structures of the reduced results.
+
+This module depends on NumPy only, such that the reduced data can be processed (and tested) without alib and
+vnep_approx. The reducers in plot_data create these structures and re-export them.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+AggregatedData = namedtuple(
+    "AggregatedData",
+    [
+        "min",
+        "mean",
+        "max",
+        "std_dev",
+        "value_count"
+    ]
+)
+
+
+def get_aggregated_data(list_of_values):
+    _min = np.min(list_of_values)
+    _mean = np.mean(list_of_values)
+    _max = np.max(list_of_values)
+    _std_dev = np.std(list_of_values)
+    _value_count = len(list_of_values)
+    return AggregatedData(min=_min,
+                          max=_max,
+                          mean=_mean,
+                          std_dev=_std_dev,
+                          value_count=_value_count)
+
+
+def merge_aggregated_data(first, second):
+    """ Exactly combines two AggregatedData objects of disjoint samples as if get_aggregated_data had been applied to
+        the union of the samples. As std_dev is the population standard deviation, the sum of squared deviations of
+        each part is value_count * std_dev ** 2, which is combined with the pairwise update of Chan et al.
+    """
+    if first.value_count == 0:
+        return second
+    if second.value_count == 0:
+        return first
+    value_count = first.value_count + second.value_count
+    delta = second.mean - first.mean
+    mean = first.mean + delta * second.value_count / value_count
+    sum_of_squared_deviations = (first.value_count * first.std_dev ** 2 +
+                                 second.value_count * second.std_dev ** 2 +
+                                 delta ** 2 * first.value_count * second.value_count / value_count)
+    return AggregatedData(min=min(first.min, second.min),
+                          max=max(first.max, second.max),
+                          mean=mean,
+                          std_dev=np.sqrt(sum_of_squared_deviations / value_count),
+                          value_count=value_count)
+
+
+def merge_list_of_aggregated_data(list_of_aggregated_data):
+    if len(list_of_aggregated_data) == 0:
+        raise ValueError("Cannot merge an empty list of aggregated data")
+    result = list_of_aggregated_data[0]
+    for aggregated_data in list_of_aggregated_data[1:]:
+        result = merge_aggregated_data(result, aggregated_data)
+    return result
+
+
+class SubstrateResourceIndex(object):
+    """ Maps the resources of a scenario's substrate, i.e. the edges (u, v) and the node resources (type, u), to
+        integer slots, such that loads can be accumulated in a single NumPy vector. Edges occupy the first slots.
+    """
+
+    def __init__(self, scenario):
+        substrate = scenario.substrate
+        resources = list(substrate.edges)
+        self.number_of_edge_resources = len(resources)
+        for u in substrate.nodes:
+            for t in substrate.node[u]['supported_types']:
+                resources.append((t, u))
+        self.resources = resources
+        self.resource_slots = {resource: slot for slot, resource in enumerate(resources)}
+        self.edge_mask = np.zeros(len(resources), dtype=bool)
+        self.edge_mask[:self.number_of_edge_resources] = True
+
+    def get_slot(self, resource):
+        try:
+            return self.resource_slots[resource]
+        except KeyError:
+            raise ValueError("Invalid resource {}".format(resource))
+
+    def compute_load_vector(self, slots, demands):
+        return np.bincount(np.asarray(slots, dtype=np.int64),
+                           weights=np.asarray(demands, dtype=np.float64),
+                           minlength=len(self.resources))
+
+    def get_max_node_and_edge_load(self, load_vector):
+        max_edge_load = float(np.max(load_vector[self.edge_mask], initial=0.0))
+        max_node_load = float(np.max(load_vector[~self.edge_mask], initial=0.0))
+        return max_edge_load, max_node_load
+
+
+def get_rr_settings_name(algorithm_sub_parameters):
+    """ Returns a string representation of the randomized rounding settings (LP recomputation mode, rounding order),
+        which is used to label the per-setting columns of the columnar format.
+    """
+    return "__".join(str(getattr(parameter, "name", parameter)) for parameter in algorithm_sub_parameters)
+
+
+class ColumnarReducedRandRoundResults(object):
+    """ Columnar export format of reduced RandRoundSepLPOptDynVMPCollection results, e.g. for analyses with NumPy or
+        pandas outside of this evaluation. The plotters themselves work on the reduced pickles.
+
+        Each row corresponds to a single (scenario_id, exec_id) pair, whose ids are stored in the columns
+        'scenario_id' and 'exec_id'. All other columns are NumPy arrays:
+
+        - scalar LP data: lp_time_preprocess, lp_time_optimization, lp_status, lp_profit, lp_generated_columns
+        - AggregatedData fields: <field>_<statistic> for the statistics min, mean, max, std_dev and value_count
+        - per randomized rounding setting: <field>_<statistic> of shape (rows, number of settings), whose columns
+          follow the order of rr_settings_names
+
+        Rows without a solution are marked in 'has_solution' and hold NaN values.
+    """
+
+    SCALAR_FIELDS = ["lp_time_preprocess", "lp_time_optimization", "lp_profit", "lp_generated_columns"]
+    AGGREGATED_FIELDS = ["lp_time_tree_decomposition", "lp_time_dynvmp_initialization",
+                         "lp_time_gurobi_optimization", "latency_information"]
+    PER_RR_SETTING_FIELDS = ["max_node_loads", "max_edge_loads", "rounding_runtimes", "profits"]
+
+    def __init__(self, columns, rr_settings_names):
+        self.columns = columns
+        self.rr_settings_names = list(rr_settings_names)
+        self.scenario_ids = columns["scenario_id"]
+        self.exec_ids = columns["exec_id"]
+        self._row_lookup = {(sc_id, ex_id): row for row, (sc_id, ex_id) in
+                            enumerate(zip(self.scenario_ids.tolist(), self.exec_ids.tolist()))}
+
+    def __len__(self):
+        return len(self.scenario_ids)
+
+    def __getitem__(self, column_name):
+        return self.columns[column_name]
+
+    def get_row(self, scenario_id, exec_id):
+        return self._row_lookup[(scenario_id, exec_id)]
+
+    def get_rr_setting_column(self, rr_settings):
+        return self.rr_settings_names.index(get_rr_settings_name(rr_settings))
+
+    def get_mask(self, scenario_ids=None, exec_ids=None):
+        mask = np.ones(len(self), dtype=bool)
+        if scenario_ids is not None:
+            mask &= np.isin(self.scenario_ids, list(scenario_ids))
+        if exec_ids is not None:
+            mask &= np.isin(self.exec_ids, list(exec_ids))
+        return mask
+
+    def save(self, npz_path):
+        np.savez_compressed(npz_path, rr_settings_names=np.array(self.rr_settings_names, dtype=str), **self.columns)
+
+    @classmethod
+    def load(cls, npz_path):
+        with np.load(npz_path) as data:
+            columns = {key: data[key] for key in data.files if key != "rr_settings_names"}
+            rr_settings_names = data["rr_settings_names"].tolist()
+        return cls(columns, rr_settings_names)
+
+    @classmethod
+    def from_scenario_solution_storage(cls, scenario_solution_storage, algorithm_id):
+        scenario_solution_dict = scenario_solution_storage.algorithm_scenario_solution_dictionary[algorithm_id]
+        keys = sorted((sc_id, ex_id)
+                      for sc_id, ex_param_solution_dict in scenario_solution_dict.items()
+                      for ex_id in ex_param_solution_dict.keys())
+
+        rr_settings_names = []
+        for sc_id, ex_id in keys:
+            solution = scenario_solution_dict[sc_id][ex_id]
+            if solution is None:
+                continue
+            for algorithm_sub_parameters in solution.profits.keys():
+                name = get_rr_settings_name(algorithm_sub_parameters)
+                if name not in rr_settings_names:
+                    rr_settings_names.append(name)
+
+        number_of_rows = len(keys)
+        statistics = AggregatedData._fields
+        columns = {
+            "scenario_id": np.array([sc_id for (sc_id, _) in keys], dtype=np.int64),
+            "exec_id": np.array([ex_id for (_, ex_id) in keys], dtype=np.int64),
+            "has_solution": np.zeros(number_of_rows, dtype=bool),
+            "lp_status": np.full(number_of_rows, "", dtype=object),
+            "lp_time_dynvmp_computation_sum_of_means": np.full(number_of_rows, np.nan),
+            "lp_time_dynvmp_computation_number_of_separations": np.zeros(number_of_rows, dtype=np.int64),
+        }
+        for field in cls.SCALAR_FIELDS:
+            columns[field] = np.full(number_of_rows, np.nan)
+        for field in cls.AGGREGATED_FIELDS:
+            for statistic in statistics:
+                columns["{}_{}".format(field, statistic)] = np.full(number_of_rows, np.nan)
+        for field in cls.PER_RR_SETTING_FIELDS:
+            for statistic in statistics:
+                columns["{}_{}".format(field, statistic)] = np.full((number_of_rows, len(rr_settings_names)), np.nan)
+
+        for row, (sc_id, ex_id) in enumerate(keys):
+            solution = scenario_solution_dict[sc_id][ex_id]
+            if solution is None:
+                continue
+            columns["has_solution"][row] = True
+            columns["lp_status"][row] = str(solution.lp_status)
+            columns["lp_time_dynvmp_computation_sum_of_means"][row] = sum(agg.mean for agg in solution.lp_time_dynvmp_computation)
+            columns["lp_time_dynvmp_computation_number_of_separations"][row] = len(solution.lp_time_dynvmp_computation)
+            for field in cls.SCALAR_FIELDS:
+                columns[field][row] = getattr(solution, field)
+            for field in cls.AGGREGATED_FIELDS:
+                aggregated_data = getattr(solution, field)
+                for statistic in statistics:
+                    columns["{}_{}".format(field, statistic)][row] = getattr(aggregated_data, statistic)
+            for field in cls.PER_RR_SETTING_FIELDS:
+                for algorithm_sub_parameters, aggregated_data in getattr(solution, field).items():
+                    column = rr_settings_names.index(get_rr_settings_name(algorithm_sub_parameters))
+                    for statistic in statistics:
+                        columns["{}_{}".format(field, statistic)][row, column] = getattr(aggregated_data, statistic)
+
+        columns["lp_status"] = columns["lp_status"].astype(str)
+        return cls(columns, rr_settings_names)
@@ -26,23 +26,21 @@
 This module handles all plotting related evaluation.
 """
 import itertools
+import logging
 import os
 from itertools import combinations, product
 from time import gmtime, strftime
 
-import matplotlib
-matplotlib.rcParams['pdf.fonttype'] = 42
-matplotlib.rcParams['ps.fonttype'] = 42
-
-import matplotlib.patches as mpatches
-import matplotlib.colors
-import matplotlib.pyplot as plt
-from matplotlib import rc
 import numpy as np
 
 from alib import solutions, util
 from vnep_approx import vine, treewidth_model
-from evaluation_acm_ccr_2019.algorithm_heatmap_plots import extract_latency_parameters
+from evaluation_acm_ccr_2019.algorithm_heatmap_plots import extract_latency_parameters, ScenarioParameterIndex, \
+    ScenarioExecutionParameterIndex, ScenarioSelectionCache, run_render_jobs, execute_render_job, LazyModule, DATA_EXPORT_FILETYPES, write_plot_data, \
+    RENDER_CACHE_DIRECTORY_NAME, normalize_output_filetypes, get_output_files, show_and_or_save_plots
+from evaluation_acm_ccr_2019.metric_cube import MetricCube
+from evaluation_acm_ccr_2019.plot_data import merge_list_of_aggregated_data
+from evaluation_acm_ccr_2019.tracing import traced
 
 try:
     import pickle as pickle
@@ -51,6 +49,11 @@ except ImportError:
 
 REQUIRED_FOR_PICKLE = solutions  # this prevents pycharm from removing this import, which is required for unpickling solutions
 
+# matplotlib is only imported once a plot is actually rendered
+matplotlib = LazyModule("matplotlib")
+mpatches = LazyModule("matplotlib.patches")
+plt = LazyModule("matplotlib.pyplot")
+
 BOX_WIDTH = 0.5
 BOX_SEPARATION_WITHIN_GROUP = 0.6
 BOX_SEPARATION_BETWEEN_GROUPS = 0.3
@@ -146,14 +149,10 @@ def get_alg_variant_string(alg_id, algorithm_sub_parameter):
 
 
 def compute_aggregated_mean(list_of_aggregated_data, debug=False):
-    mean = 0.0
-    value_count = 0
-    for agg in list_of_aggregated_data:
-        mean += agg.mean * agg.value_count
-        value_count += agg.value_count
+    merged = merge_list_of_aggregated_data(list_of_aggregated_data)
     if debug:
-        print(len(list_of_aggregated_data), value_count, mean / value_count)
-    return mean / value_count
+        print(len(list_of_aggregated_data), merged.value_count, merged.mean)
+    return merged.mean
 
 
 def lookup_rounding_runtimes(rr_result):
@@ -282,6 +281,7 @@ lp_dynvmp_init_time_metric_max_profit = dict(
     name="Profit (max)",
     y_axis_title="max. Profit",
     lookup_function=extract_profits_max,
+    profit_reduction=("max", get_list_of_rr_settings(), np.max),
     result_num="single",
     filename="profits_max",
 )
@@ -290,6 +290,7 @@ lp_dynvmp_init_time_metric_mean_profit = dict(
     name="Profit (mean)",
     y_axis_title="average Profit",
     lookup_function=extract_profits_mean,
+    profit_reduction=("mean", get_list_of_rr_settings(), np.nanmean),
     result_num="single",
     filename="profits_mean",
 )
@@ -297,6 +298,7 @@ lp_dynvmp_init_time_metric_min_profit = dict(
     name="Profit (min)",
     y_axis_title="min. Profit",
     lookup_function=extract_profits_min,
+    profit_reduction=("min", get_list_of_rr_settings(), np.min),
     result_num="many",
     filename="profits_min",
 )
@@ -571,7 +573,9 @@ class AbstractPlotter(object):
                  paper_mode=True,
                  ):
         self.output_path = output_path
-        self.output_filetype = output_filetype
+        # all plots are saved in each of the output filetypes; the paths are constructed for the first one by default
+        self.output_filetypes = normalize_output_filetypes(output_filetype)
+        self.output_filetype = self.output_filetypes[0]
         self.scenario_solution_storage = scenario_solution_storage
 
         self.algorithm_id = algorithm_id
@@ -580,6 +584,15 @@ class AbstractPlotter(object):
         self.scenario_parameter_dict = self.scenario_solution_storage.scenario_parameter_container.scenario_parameter_dict
         self.scenarioparameter_room = self.scenario_solution_storage.scenario_parameter_container.scenarioparameter_room
         self.all_scenario_ids = set(scenario_solution_storage.algorithm_scenario_solution_dictionary[self.algorithm_id].keys())
+        self.scenario_parameter_index = ScenarioParameterIndex(self.scenario_parameter_dict, self.all_scenario_ids)
+        self.all_scenario_mask = self.scenario_parameter_index.get_mask_of_scenario_ids(self.all_scenario_ids)
+        # ScenarioExecutionParameterIndex of each solution storage, built on first use
+        self._solution_indices = {}
+        # metric values of the solutions of the plotter's storages (see metric_cube.MetricCube)
+        self.metric_cube = MetricCube()
+        self.metric_cube.add_solution_storage(self.scenario_solution_storage, self.algorithm_id)
+        # scenario masks of the filter specifications (see ScenarioSelectionCache)
+        self.scenario_selection_cache = ScenarioSelectionCache()
 
         lat_params = extract_latency_parameters(
             scenario_solution_storage.execution_parameter_container.algorithm_parameter_list,
@@ -602,6 +615,8 @@ class AbstractPlotter(object):
         else:
             self.forbidden_scenario_ids = forbidden_scenario_ids
         self.paper_mode = paper_mode
+        # directory of the render cache (see execute_render_job) or None if plots shall always be rendered
+        self.render_cache_path = None
 
     def _construct_output_path_and_filename(self, title, filter_specifications=None):
         filter_spec_path = ""
@@ -614,43 +629,71 @@ class AbstractPlotter(object):
         filename = os.path.join(output_path, title + "_" + filter_filename)
         return output_path, filename
 
-    def _construct_path_and_filename_for_filter_spec(self, filter_specifications):
+    def _construct_path_and_filename_for_filter_spec(self, filter_specifications, output_filetype=None):
+        if output_filetype is None:
+            output_filetype = self.output_filetype
         filter_path = ""
         filter_filename = ""
         for spec in filter_specifications:
             filter_path = os.path.join(filter_path, (spec['parameter'] + "_" + str(spec['value'])))
             filter_filename += spec['parameter'] + "_" + str(spec['value']) + "_"
-        filter_filename = filter_filename[:-1] + "." + self.output_filetype
+        filter_filename = filter_filename[:-1] + "." + output_filetype
         return filter_path, filter_filename
 
-    def _obtain_scenarios_based_on_filters(self, filter_specifications=None):
-        allowed_scenario_ids = set(self.all_scenario_ids)
+    def _obtain_scenario_mask_based_on_filters(self, filter_specifications=None):
+        return self.scenario_selection_cache.get_mask(filter_specifications,
+                                                      self._compute_scenario_mask_based_on_filters)
+
+    def _compute_scenario_mask_based_on_filters(self, filter_specifications=None):
+        allowed_scenario_mask = self.all_scenario_mask
         sps = self.scenarioparameter_room
-        spd = self.scenario_parameter_dict
         if filter_specifications:
             for filter_specification in filter_specifications:
                 filter_path, _ = extract_parameter_range(sps, filter_specification['parameter'])
-                filter_indices = lookup_scenarios_having_specific_values(spd, filter_path,
-                                                                         filter_specification['value'])
-                allowed_scenario_ids = allowed_scenario_ids & filter_indices
+                allowed_scenario_mask = allowed_scenario_mask & self.scenario_parameter_index.get_mask(
+                    filter_path, filter_specification['value'])
 
-        return allowed_scenario_ids
+        return allowed_scenario_mask
+
+    def _obtain_scenarios_based_on_filters(self, filter_specifications=None):
+        return self.scenario_parameter_index.get_scenario_ids(
+            self._obtain_scenario_mask_based_on_filters(filter_specifications))
 
     def _obtain_scenarios_based_on_axis(self, axis_path, axis_value):
-        spd = self.scenario_parameter_dict
-        return lookup_scenarios_having_specific_values(spd, axis_path, axis_value)
+        return self.scenario_parameter_index.get_scenario_ids(
+            self.scenario_parameter_index.get_mask(axis_path, axis_value))
+
+    def _get_solution_index(self, solution_storage=None):
+        """ Returns the ScenarioExecutionParameterIndex of the given solution storage (default: the plotted one). """
+        if solution_storage is None:
+            solution_storage = self.scenario_solution_storage
+        if id(solution_storage) not in self._solution_indices:
+            if solution_storage is self.scenario_solution_storage:
+                scenario_parameter_index = self.scenario_parameter_index
+            else:
+                scenario_parameter_index = ScenarioParameterIndex(
+                    solution_storage.scenario_parameter_container.scenario_parameter_dict,
+                    solution_storage.algorithm_scenario_solution_dictionary[self.algorithm_id].keys())
+            # the storage is referenced by the entry, such that its id cannot be reused
+            self._solution_indices[id(solution_storage)] = (solution_storage, ScenarioExecutionParameterIndex(
+                scenario_parameter_index, solution_storage.execution_parameter_container, self.algorithm_id))
+        return self._solution_indices[id(solution_storage)][1]
+
+    def _is_execution_parameter(self, parameter):
+        return self._get_solution_index().is_execution_parameter(parameter)
+
+    def _obtain_scenarios_based_on_parameter(self, parameter, value):
+        """ Returns the scenario ids having the value of the given generation parameter or all scenario ids if the
+            parameter is an execution parameter.
+        """
+        index = self._get_solution_index()
+        if index.is_execution_parameter(parameter):
+            return self.all_scenario_ids
+        return index.get_scenario_ids(index.get_mask(parameter, value))
 
     def _show_and_or_save_plots(self, output_path, filename):
         plt.tight_layout(pad=0)
-        if self.save_plot:
-            if not os.path.exists(output_path):
-                os.makedirs(output_path)
-            print("saving plot: {}".format(filename))
-            plt.savefig(filename)
-        if self.show_plot:
-            plt.show()
-
-        plt.close()
+        show_and_or_save_plots(output_path, filename, self.save_plot, self.show_plot, perform_tight_layout=False)
 
     def plot_figure(self, filter_specifications):
         raise RuntimeError("This is an abstract method")
@@ -693,11 +736,15 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
 
     def _construct_output_path_and_filename(self, metric_specification,
                                             inner_axis, outer_axis,
-                                            filter_specifications=None):
+                                            filter_specifications=None,
+                                            output_filetype=None):
+        if output_filetype is None:
+            output_filetype = self.output_filetype
         filter_spec_path = ""
-        filter_filename = "no_filter.{}".format(self.output_filetype)
+        filter_filename = "no_filter.{}".format(output_filetype)
         if filter_specifications:
-            filter_spec_path, filter_filename = self._construct_path_and_filename_for_filter_spec(filter_specifications)
+            filter_spec_path, filter_filename = self._construct_path_and_filename_for_filter_spec(filter_specifications,
+                                                                                                  output_filetype)
 
         base = os.path.normpath(self.output_path)
         date = strftime("%Y-%m-%d", gmtime())
@@ -705,9 +752,9 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
         sub_param_string = self.algorithm_variant_to_be_considered
 
         if sub_param_string is not None:
-            output_path = os.path.join(base, date, self.output_filetype, axes_foldername, sub_param_string, filter_spec_path)
+            output_path = os.path.join(base, date, output_filetype, axes_foldername, sub_param_string, filter_spec_path)
         else:
-            output_path = os.path.join(base, date, self.output_filetype, axes_foldername, filter_spec_path)
+            output_path = os.path.join(base, date, output_filetype, axes_foldername, filter_spec_path)
 
         fname = "{}__{}".format(metric_specification["filename"], filter_filename)
         filename = os.path.join(output_path, fname)
@@ -719,6 +766,16 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
                 for ms in self.metric_specifications:
                     self.plot_single_boxplot_general(ms, outer_axis, inner_axis, filter_specifications)
 
+    def collect_render_jobs(self, filter_specifications):
+        render_jobs = []
+        for outer_axis in self.boxplot_outer_axes_specifications:
+            for inner_axis in self.boxplot_inner_axes_specifications:
+                for ms in self.metric_specifications:
+                    render_job = self.extract_single_boxplot_data(ms, outer_axis, inner_axis, filter_specifications)
+                    if render_job is not None:
+                        render_jobs.append(render_job)
+        return render_jobs
+
     def _lookup_solutions(self, scenario_ids):
         solution_dicts = [
             self.scenario_solution_storage.get_solutions_by_scenario_index(x)
@@ -728,64 +785,63 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
         return result
 
 
+    @traced("lookup solutions")
     def _lookup_solutions_by_execution(self, scenario_ids, x_key, x_val, y_key, y_val, solution_container=None):
 
         if solution_container is None:
             solution_container = self.scenario_solution_storage
 
-        print("here")
-
-        exec_id_lookup = solution_container.execution_parameter_container.reverse_lookup['RandRoundSepLPOptDynVMPCollection']['ALGORITHM_PARAMETERS']
-
-        try:
-            x_axis_exec_ids = exec_id_lookup[x_key][x_val]
-        except KeyError:
-            x_axis_exec_ids = solution_container.execution_parameter_container.get_execution_ids(ALG_ID=self.algorithm_id)
-            path_x_axis, _ = extract_parameter_range(self.scenario_parameter_dict, x_key)
-            x_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_x_axis, x_val)
-            scenario_ids = scenario_ids & x_axis_scenarios
+        index = self._get_solution_index(solution_container)
+        mask = (index.get_mask_of_scenario_ids(scenario_ids) &
+                index.get_mask(x_key, x_val) &
+                index.get_mask(y_key, y_val) &
+                index.get_mask_of_execution_ids(self.execution_id_filter))
 
-        try:
-            y_axis_exec_ids = exec_id_lookup[y_key][y_val]
-        except KeyError:
-            y_axis_exec_ids = solution_container.execution_parameter_container.get_execution_ids(ALG_ID=self.algorithm_id)
-            path_y_axis, _ = extract_parameter_range(self.scenario_parameter_dict, y_key)
-            y_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_y_axis, y_val)
-            scenario_ids = scenario_ids & y_axis_scenarios
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Using Exec_IDS: {}".format(index.get_execution_ids(mask)))
+            logger.debug("Using Scenarios: {}".format(index.get_scenario_ids(mask)))
 
-        exec_ids_to_consider = x_axis_exec_ids & y_axis_exec_ids & self.execution_id_filter
-
-        print("Using Exec_IDS: ", exec_ids_to_consider)
-        print("Using Scenarios: ", scenario_ids)
-
-        solution_dicts = [solution_container.get_solutions_by_scenario_index(x) for x in scenario_ids]
-        results = [solution[self.algorithm_id][exec_id] for solution in solution_dicts for exec_id in exec_ids_to_consider]
+        solutions_by_scenario = solution_container.algorithm_scenario_solution_dictionary[self.algorithm_id]
+        results = [solutions_by_scenario[scenario_id][exec_id] for scenario_id, exec_id in index.get_pairs(mask)]
         return results
 
 
     def plot_single_boxplot_general(self, metric_specification, outer_axis,
                                     inner_axis,
                                     filter_specifications=None):
-        # data extraction
+        render_job = self.extract_single_boxplot_data(metric_specification, outer_axis, inner_axis,
+                                                      filter_specifications)
+        if render_job is not None:
+            execute_render_job(render_job)
+
+    @traced("extract boxplot data", category="plot")
+    def extract_single_boxplot_data(self, metric_specification, outer_axis,
+                                    inner_axis,
+                                    filter_specifications=None):
+        """ Extracts the data of a single boxplot and returns it as render job (see render_single_boxplot), or None
+            if the boxplot shall not be generated.
+        """
 
         sps = self.scenarioparameter_room
-        spd = self.scenario_parameter_dict
 
-        output_path, filename = self._construct_output_path_and_filename(metric_specification,
-                                                                         inner_axis, outer_axis,
-                                                                         filter_specifications)
+        output_files = [self._construct_output_path_and_filename(metric_specification,
+                                                                 inner_axis, outer_axis,
+                                                                 filter_specifications,
+                                                                 output_filetype)
+                        for output_filetype in self.output_filetypes]
+        output_path, filename = output_files[0]
 
         logger.debug("output_path is {};\t filename is {}".format(output_path, filename))
-        if not self.overwrite_existing_files and os.path.exists(filename):
+        if not self.overwrite_existing_files and all(os.path.exists(filename) for _, filename in output_files):
             logger.info("Skipping generation of {} as this file already exists".format(filename))
-            return
+            return None
         # check if filter specification conflicts with axes specification
         if filter_specifications is not None:
             for filter_specification in filter_specifications:
                 if (inner_axis['x_axis_parameter'] == filter_specification['parameter'] or
                         outer_axis['x_axis_parameter'] == filter_specification['parameter']):
                     logger.debug("Skipping generation of {} as the filter specification conflicts with the axes specification.")
-                    return
+                    return None
 
         path_outer_axis, outer_axis_parameters = extract_parameter_range(
             sps,
@@ -811,27 +867,30 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
         max_number_of_observed_values = 0
         observed_values = np.empty(0)
 
+        index = self.scenario_parameter_index
+        allowed_scenario_mask = (self._obtain_scenario_mask_based_on_filters(filter_specifications) &
+                                 ~index.get_mask_of_scenario_ids(self.forbidden_scenario_ids))
+        outer_axis_is_execution_parameter = self._is_execution_parameter(outer_axis['x_axis_parameter'])
+        inner_axis_is_execution_parameter = self._is_execution_parameter(inner_axis['x_axis_parameter'])
+
         for outer_index, outer_val in enumerate(outer_axis_parameters):
             # all scenario indices which has x_val as xaxis parameter (e.g. node_resource_factor = 0.5
 
-            if path_outer_axis[-1][:7] != "latency":
-                scenario_ids_matching_x_axis = lookup_scenarios_having_specific_values(spd, path_outer_axis, outer_val)
+            # execution parameters (e.g. latency_approximation_limit) are selected by _lookup_solutions_by_execution
+            if outer_axis_is_execution_parameter:
+                scenario_mask_matching_x_axis = self.all_scenario_mask
             else:
-                scenario_ids_matching_x_axis = self.all_scenario_ids
-                # if self.heatmap_plot_type not in [HeatmapPlotType.LatencyStudy, HeatmapPlotType.ComparisonLatencyBaseline] \
+                scenario_mask_matching_x_axis = index.get_mask(path_outer_axis, outer_val)
 
             for inner_index, inner_val in enumerate(inner_axis_parameters):
-                if path_inner_axis[-1][:7] != "latency":
-                    scenario_ids_matching_y_axis = lookup_scenarios_having_specific_values(spd, path_inner_axis, inner_val)
+                if inner_axis_is_execution_parameter:
+                    scenario_mask_matching_y_axis = self.all_scenario_mask
                 else:
-                    scenario_ids_matching_y_axis = self.all_scenario_ids
-                # if self.heatmap_plot_type not in [HeatmapPlotType.LatencyStudy, HeatmapPlotType.ComparisonLatencyBaseline] \
-                #     else set([i for i in range(len(self.scenario_solution_storage.algorithm_scenario_solution_dictionary[self.algorithm_id]))])
+                    scenario_mask_matching_y_axis = index.get_mask(path_inner_axis, inner_val)
 
-                filter_indices = self._obtain_scenarios_based_on_filters(filter_specifications)
-                scenario_ids_to_consider = (scenario_ids_matching_x_axis &
-                                            scenario_ids_matching_y_axis &
-                                            filter_indices) - self.forbidden_scenario_ids
+                scenario_ids_to_consider = index.get_scenario_ids(scenario_mask_matching_x_axis &
+                                                                  scenario_mask_matching_y_axis &
+                                                                  allowed_scenario_mask)
 
                 solutions = self._lookup_solutions_by_execution(scenario_ids_to_consider,
                                                                 outer_axis['x_axis_parameter'], outer_val,
@@ -850,9 +909,10 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
 
 
                 if metric_specification["result_num"] == "single":
-                    values = [metric_specification["lookup_function"](solution) for solution in solutions]
+                    values = self.metric_cube.get_values(metric_specification, solutions)
                 else:
-                    values = [value for solution in solutions for value in metric_specification["lookup_function"](solution)]
+                    values = [value for solution_values in self.metric_cube.get_values(metric_specification, solutions)
+                              for value in solution_values]
 
                 observed_values = np.append(observed_values, values)
 
@@ -873,9 +933,8 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
             solution_count_string = "between {} and {} values per square".format(min_number_of_observed_values,
                                                                                  max_number_of_observed_values)
 
-        fig, ax = plt.subplots(figsize=FIGSIZE)
         if self.paper_mode:
-            ax.set_title(metric_specification["name"], fontsize=PLOT_TITLE_FONTSIZE)
+            title = metric_specification["name"]
         else:
             title = metric_specification["name"] + "\n"
             title += self.algorithm_variant_to_be_considered + "\n"
@@ -886,132 +945,201 @@ class RuntimeBoxplotPlotter(AbstractPlotter):
                                                                      np.nanmean(observed_values),
                                                                      np.nanmax(observed_values))
 
-            ax.set_title(title)
-
-        # rc('font', **{'family': 'sans-serif', 'sans-serif': ['Helvetica']})
-        ## for Palatino and other serif fonts use:
-        # rc('font',**{'family':'serif','serif':['Palatino']})
-        # rc('font', **{'family': 'serif', 'serif': ['Computer Modern']})
-        # rc('text', usetex=True)
-
-        # group data
-        bins = []
-        positions = []
-        labels = {}
-        x_ticks = []
-        colors = []
-        pos = 0
-        cmap = plt.get_cmap("inferno")
-        for outer_index, outer_val in enumerate(outer_axis_parameters):
-            group_start_pos = pos
-            for inner_index, inner_val in enumerate(inner_axis_parameters):
-                bins.append(data[outer_val][inner_val])
-                positions.append(pos)
-                pos += 0.6
-                color = cmap(1.0 - (1 + float(inner_index)) / len(inner_axis_parameters))
-                colors.append(color)
-
-
-                if inner_val == 'no latencies':
-                    if SUPPRESS_NOLATENCY_DISPLAY:
-                        continue
-                    inner_val = 'baseline'
-                #     inner_val_str = inner_val
-                # elif inner_val == 'strict':
-                #     inner_val = r'\textsc{Strict}'
-                #     inner_val_str = inner_val
-                # elif inner_val == 'flex':
-                #     inner_val = r'\textsc{Flex}'
-                #     inner_val_str = inner_val
-                # else:
-                inner_val_str = str(inner_val)
-
-                labels[inner_val] = (inner_val_str, color)
-            x_ticks.append(group_start_pos + 0.5 * (pos - group_start_pos) - 0.5 * BOX_SEPARATION_WITHIN_GROUP)
-            pos += BOX_SEPARATION_BETWEEN_GROUPS
-
-        bplots = []
-        for _bin, pos in zip(bins, positions):
-            bplots.append(ax.boxplot(
-                x=_bin,
-                positions=[pos],
-                widths=[BOX_WIDTH],
-                patch_artist=True,
-                notch=True,
-                bootstrap=1000,
-            ))
-        for bplot, color in zip(
-                bplots,
-                colors,
-        ):
-            for patch in itertools.chain(bplot['boxes']):
-                patch.set_edgecolor(color)
-                patch.set_facecolor(
-                    matplotlib.colors.to_rgba(color, alpha=0.3)
-                )
-            for line in itertools.chain(
-                    bplot['medians'],
-                    bplot['fliers'],
-                    bplot['whiskers'],
-                    bplot['caps'],
-            ):
-                line.set_color(color)
-            for marker in bplot['fliers']:
-                marker.set(
-                    marker='o',
-                    markeredgecolor=matplotlib.colors.to_rgba(color, alpha=0.8),
-                )
-
-        legend_handles = [
-            mpatches.Patch(color=matplotlib.colors.to_rgba(color, alpha=0.6), label=label)
-            for (val, (label, color)) in sorted(labels.items())
-        ]
+        if self.output_filetype in DATA_EXPORT_FILETYPES:
+            render_function = export_single_boxplot_data
+        else:
+            render_function = render_single_boxplot
+
+        return dict(
+            render_function=render_function,
+            output_path=output_path,
+            filename=filename,
+            additional_output_files=output_files[1:],
+            save_plot=self.save_plot,
+            show_plot=self.show_plot,
+            render_cache_path=self.render_cache_path,
+            paper_mode=self.paper_mode,
+            title=title,
+            data=data,
+            outer_axis_parameters=outer_axis_parameters,
+            inner_axis_parameters=inner_axis_parameters,
+            outer_axis_title=outer_axis['x_axis_title'],
+            inner_axis_title_short=inner_axis["x_axis_title_short"],
+            y_axis_title=metric_specification["y_axis_title"],
+            non_log="non_log" in metric_specification,
+        )
 
-        #fig.subplots_adjust(top=0.85)
-        #fig.subplots_adjust(bottom=0.125)
-        fig.subplots_adjust(right=0.8)
-        #fig.subplots_adjust(hspace=0.3)
-        # fig.subplots_adjust(left=0.15)
-
-        legend = plt.legend(handles=legend_handles,
-                            title=inner_axis["x_axis_title_short"],
-                            loc='center left',
-                            fontsize=LEGEND_LABEL_FONTSIZE,
-                            handletextpad=0.35, bbox_to_anchor=(0.83, 0.5), bbox_transform=plt.gcf().transFigure,
-                            borderaxespad=-0.175, borderpad=0.2,
-                            handlelength=0.35)
-        legend.get_frame().set_alpha(1.0)
-        legend.get_frame().set_facecolor("#FFFFFF")
-        plt.setp(legend.get_title(), fontsize=LEGEND_TITLE_FONTSIZE)
-        plt.gca().add_artist(legend)
-
-        ax.set_xlim(min(positions) - 0.5, max(positions) + 0.5)
-        ax.set_xticks(x_ticks, minor=False)
-        ax.set_xticklabels(outer_axis_parameters, minor=False, fontsize=AXIS_TICKLABEL_FONTSIZE)
-
-        if not "non_log" in list(metric_specification.keys()):
-            ax.set_yscale("log", nonposy='clip')
-
-        ax.yaxis.grid(True, which="major", linestyle="-")
-        ax.yaxis.grid(True, which="minor", linestyle=":", linewidth=0.8, alpha=0.4)
-
-        for label in ax.get_yticklabels():
-            plt.setp(label, fontsize=AXIS_TICKLABEL_FONTSIZE)
-        ax.set_xlabel(outer_axis['x_axis_title'], fontsize=AXIS_LABEL_FONTSIZE)
-        ax.set_ylabel(metric_specification["y_axis_title"], fontsize=AXIS_LABEL_FONTSIZE)
-
-        # plt.axhline(y=100, color='g', linestyle=(0, (1, 10)))
-        # plt.axhline(y=150, color='g', linestyle=(0, (5, 10)))
 
-        plt.tight_layout(pad=0)
+def export_single_boxplot_data(render_job):
+    """ Writes the data extracted by RuntimeBoxplotPlotter.extract_single_boxplot_data instead of rendering it.
+
+    All observed values are stored in a single flat array together with the indices of the outer and inner axis
+    parameters they belong to.
+    """
+    data = render_job['data']
+    values = []
+    outer_axis_indices = []
+    inner_axis_indices = []
+    for outer_index, outer_val in enumerate(render_job['outer_axis_parameters']):
+        for inner_index, inner_val in enumerate(render_job['inner_axis_parameters']):
+            box_values = data[outer_val][inner_val]
+            values.extend(box_values)
+            outer_axis_indices.extend([outer_index] * len(box_values))
+            inner_axis_indices.extend([inner_index] * len(box_values))
+    boxplot_data = dict(
+        values=np.array(values, dtype=np.float64),
+        outer_axis_indices=np.array(outer_axis_indices, dtype=np.int32),
+        inner_axis_indices=np.array(inner_axis_indices, dtype=np.int32),
+        outer_axis_labels=[str(label) for label in render_job['outer_axis_parameters']],
+        inner_axis_labels=[str(label) for label in render_job['inner_axis_parameters']],
+        title=render_job['title'],
+        outer_axis_title=render_job['outer_axis_title'],
+        inner_axis_title_short=render_job['inner_axis_title_short'],
+        y_axis_title=render_job['y_axis_title'],
+    )
+    for output_path, filename in get_output_files(render_job):
+        write_plot_data(output_path, filename, boxplot_data)
 
-        # if "additional_hlines_at" in metric_specification:
-        #     for y in metric_specification["additional_hlines_at"]:
-        #         ax.axhline(y, linestyle=':', color='gray', alpha=0.4, linewidth=0.8)
 
-        self._show_and_or_save_plots(output_path, filename)
+def render_single_boxplot(render_job):
+    """ Renders a boxplot from the data extracted by RuntimeBoxplotPlotter.extract_single_boxplot_data.
+    """
+    data = render_job['data']
+    outer_axis_parameters = render_job['outer_axis_parameters']
+    inner_axis_parameters = render_job['inner_axis_parameters']
 
-        plt.close(fig)
+    fig, ax = plt.subplots(figsize=FIGSIZE)
+    if render_job['paper_mode']:
+        ax.set_title(render_job['title'], fontsize=PLOT_TITLE_FONTSIZE)
+    else:
+        ax.set_title(render_job['title'])
+
+    # rc('font', **{'family': 'sans-serif', 'sans-serif': ['Helvetica']})
+    ## for Palatino and other serif fonts use:
+    # rc('font',**{'family':'serif','serif':['Palatino']})
+    # rc('font', **{'family': 'serif', 'serif': ['Computer Modern']})
+    # rc('text', usetex=True)
+
+    # group data
+    bins = []
+    positions = []
+    labels = {}
+    x_ticks = []
+    colors = []
+    pos = 0
+    cmap = plt.get_cmap("inferno")
+    for outer_index, outer_val in enumerate(outer_axis_parameters):
+        group_start_pos = pos
+        for inner_index, inner_val in enumerate(inner_axis_parameters):
+            bins.append(data[outer_val][inner_val])
+            positions.append(pos)
+            pos += 0.6
+            color = cmap(1.0 - (1 + float(inner_index)) / len(inner_axis_parameters))
+            colors.append(color)
+
+
+            if inner_val == 'no latencies':
+                if SUPPRESS_NOLATENCY_DISPLAY:
+                    continue
+                inner_val = 'baseline'
+            #     inner_val_str = inner_val
+            # elif inner_val == 'strict':
+            #     inner_val = r'\textsc{Strict}'
+            #     inner_val_str = inner_val
+            # elif inner_val == 'flex':
+            #     inner_val = r'\textsc{Flex}'
+            #     inner_val_str = inner_val
+            # else:
+            inner_val_str = str(inner_val)
+
+            labels[inner_val] = (inner_val_str, color)
+        x_ticks.append(group_start_pos + 0.5 * (pos - group_start_pos) - 0.5 * BOX_SEPARATION_WITHIN_GROUP)
+        pos += BOX_SEPARATION_BETWEEN_GROUPS
+
+    bplots = []
+    for _bin, pos in zip(bins, positions):
+        bplots.append(ax.boxplot(
+            x=_bin,
+            positions=[pos],
+            widths=[BOX_WIDTH],
+            patch_artist=True,
+            notch=True,
+            bootstrap=1000,
+        ))
+    for bplot, color in zip(
+            bplots,
+            colors,
+    ):
+        for patch in itertools.chain(bplot['boxes']):
+            patch.set_edgecolor(color)
+            patch.set_facecolor(
+                matplotlib.colors.to_rgba(color, alpha=0.3)
+            )
+        for line in itertools.chain(
+                bplot['medians'],
+                bplot['fliers'],
+                bplot['whiskers'],
+                bplot['caps'],
+        ):
+            line.set_color(color)
+        for marker in bplot['fliers']:
+            marker.set(
+                marker='o',
+                markeredgecolor=matplotlib.colors.to_rgba(color, alpha=0.8),
+            )
+
+    legend_handles = [
+        mpatches.Patch(color=matplotlib.colors.to_rgba(color, alpha=0.6), label=label)
+        for (val, (label, color)) in sorted(labels.items())
+    ]
+
+    #fig.subplots_adjust(top=0.85)
+    #fig.subplots_adjust(bottom=0.125)
+    fig.subplots_adjust(right=0.8)
+    #fig.subplots_adjust(hspace=0.3)
+    # fig.subplots_adjust(left=0.15)
+
+    legend = plt.legend(handles=legend_handles,
+                        title=render_job['inner_axis_title_short'],
+                        loc='center left',
+                        fontsize=LEGEND_LABEL_FONTSIZE,
+                        handletextpad=0.35, bbox_to_anchor=(0.83, 0.5), bbox_transform=plt.gcf().transFigure,
+                        borderaxespad=-0.175, borderpad=0.2,
+                        handlelength=0.35)
+    legend.get_frame().set_alpha(1.0)
+    legend.get_frame().set_facecolor("#FFFFFF")
+    plt.setp(legend.get_title(), fontsize=LEGEND_TITLE_FONTSIZE)
+    plt.gca().add_artist(legend)
+
+    ax.set_xlim(min(positions) - 0.5, max(positions) + 0.5)
+    ax.set_xticks(x_ticks, minor=False)
+    ax.set_xticklabels(outer_axis_parameters, minor=False, fontsize=AXIS_TICKLABEL_FONTSIZE)
+
+    if not render_job['non_log']:
+        ax.set_yscale("log", nonposy='clip')
+
+    ax.yaxis.grid(True, which="major", linestyle="-")
+    ax.yaxis.grid(True, which="minor", linestyle=":", linewidth=0.8, alpha=0.4)
+
+    for label in ax.get_yticklabels():
+        plt.setp(label, fontsize=AXIS_TICKLABEL_FONTSIZE)
+    ax.set_xlabel(render_job['outer_axis_title'], fontsize=AXIS_LABEL_FONTSIZE)
+    ax.set_ylabel(render_job['y_axis_title'], fontsize=AXIS_LABEL_FONTSIZE)
+
+    # plt.axhline(y=100, color='g', linestyle=(0, (1, 10)))
+    # plt.axhline(y=150, color='g', linestyle=(0, (5, 10)))
+
+    plt.tight_layout(pad=0)
+
+    # if "additional_hlines_at" in metric_specification:
+    #     for y in metric_specification["additional_hlines_at"]:
+    #         ax.axhline(y, linestyle=':', color='gray', alpha=0.4, linewidth=0.8)
+
+    show_and_or_save_plots(render_job['output_path'], render_job['filename'],
+                           render_job['save_plot'], render_job['show_plot'], perform_tight_layout=False,
+                           additional_output_files=render_job['additional_output_files'])
+
+    plt.close(fig)
 
 
 class RuntimeBoxplotPlotter_LatencyStudy(RuntimeBoxplotPlotter):
@@ -1039,6 +1167,7 @@ class RuntimeBoxplotPlotter_LatencyStudy(RuntimeBoxplotPlotter):
 
         self.baseline_solution_storage = baseline_solution_storage
         if baseline_solution_storage is not None:
+            self.metric_cube.add_solution_storage(baseline_solution_storage, algorithm_id)
             self.scenarioparameter_room['latency_approx'][0]['latency_approximation_type'].append('no latencies')
 
         self.exec_id_lookup = self.scenario_solution_storage.execution_parameter_container.reverse_lookup[algorithm_id][
@@ -1059,6 +1188,7 @@ class RuntimeBoxplotPlotter_LatencyStudy(RuntimeBoxplotPlotter):
 
 
 
+    @traced("lookup solutions")
     def _lookup_solutions_by_execution(self, scenario_ids, x_key, x_val, y_key, y_val, solution_container=None):
 
         print(x_key, " : ", x_val, "   &   ", y_key , " :  ", y_val)
@@ -1066,14 +1196,7 @@ class RuntimeBoxplotPlotter_LatencyStudy(RuntimeBoxplotPlotter):
         if self.baseline_solution_storage is not None:
             if x_key == "latency_approximation_type":
 
-                path_y_axis, _ = extract_parameter_range(self.scenarioparameter_room, y_key)
-
-                if y_key[:7] != "latency":
-                    y_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_y_axis, y_val)
-                else:
-                    y_axis_scenarios = self.all_scenario_ids
-
-                scenario_ids = scenario_ids & y_axis_scenarios
+                scenario_ids = scenario_ids & self._obtain_scenarios_based_on_parameter(y_key, y_val)
 
                 solution_dicts_baseline = [self.baseline_solution_storage.get_solutions_by_scenario_index(x) for x in scenario_ids]
 
@@ -1096,13 +1219,7 @@ class RuntimeBoxplotPlotter_LatencyStudy(RuntimeBoxplotPlotter):
 
             elif y_key == "latency_approximation_type":
 
-                path_x_axis, _ = extract_parameter_range(self.scenarioparameter_room, x_key)
-
-                if x_key[:7] != "latency":
-                    x_axis_scenarios = lookup_scenarios_having_specific_values(self.scenario_parameter_dict, path_x_axis, x_val)
-                else:
-                    x_axis_scenarios = self.all_scenario_ids
-                scenario_ids = scenario_ids & x_axis_scenarios
+                scenario_ids = scenario_ids & self._obtain_scenarios_based_on_parameter(x_key, x_val)
 
                 solution_dicts_baseline = [self.baseline_solution_storage.get_solutions_by_scenario_index(x) for x in scenario_ids]
 
@@ -1136,6 +1253,7 @@ class RuntimeBoxplotPlotter_LatencyStudy(RuntimeBoxplotPlotter):
 
 
 
+@traced("enumerate filter specifications")
 def _construct_filter_specs(scenario_parameter_space_dict, parameter_filter_keys, maxdepth=3):
     parameter_value_dic = dict()
     for parameter in parameter_filter_keys:
@@ -1158,6 +1276,7 @@ def _construct_filter_specs(scenario_parameter_space_dict, parameter_filter_keys
     return result_list
 
 
+@traced("evaluate randround runtimes")
 def evaluate_randround_runtimes(dc_randround_seplp_dynvmp,
                                 randround_seplp_algorithm_id,
                                 randround_seplp_execution_id,
@@ -1229,6 +1348,12 @@ def evaluate_randround_runtimes(dc_randround_seplp_dynvmp,
         for plotter in plotters:
             plotter.plot_figure(filter_spec)
 
+    for plotter in plotters:
+        logger.info("Scenario selection cache statistics of {}: {}".format(
+            type(plotter).__name__, plotter.scenario_selection_cache.get_statistics()))
+
+
+@traced("evaluate randround runtimes latency study")
 def evaluate_randround_runtimes_latency_study(dc_randround_seplp_dynvmp,
                                 randround_seplp_algorithm_id,
                                 dc_baseline=None,
@@ -1242,7 +1367,9 @@ def evaluate_randround_runtimes_latency_study(dc_randround_seplp_dynvmp,
                                 maxdepthfilter=2,
                                 output_path="./",
                                 output_filetype="png",
-                              filter_exec_params=None):
+                              filter_exec_params=None,
+                              number_of_jobs=1,
+                              use_render_cache=False):
     if forbidden_scenario_ids is None:
         forbidden_scenario_ids = set()
 
@@ -1300,6 +1427,21 @@ def evaluate_randround_runtimes_latency_study(dc_randround_seplp_dynvmp,
 
     plotters.append(boxplotter_plotter)
 
-    for filter_spec in filter_specs:
+    if use_render_cache:
         for plotter in plotters:
-            plotter.plot_figure(filter_spec)
+            plotter.render_cache_path = os.path.join(os.path.normpath(output_path), RENDER_CACHE_DIRECTORY_NAME)
+
+    if number_of_jobs == 1:
+        for filter_spec in filter_specs:
+            for plotter in plotters:
+                plotter.plot_figure(filter_spec)
+    else:
+        render_jobs = [render_job
+                       for filter_spec in filter_specs
+                       for plotter in plotters
+                       for render_job in plotter.collect_render_jobs(filter_spec)]
+        run_render_jobs(render_jobs, number_of_jobs)
+
+    for plotter in plotters:
+        logger.info("Scenario selection cache statistics of {}: {}".format(
+            type(plotter).__name__, plotter.scenario_selection_cache.get_statistics()))
@@ -0,0 +1,247 @@
+# MIT License
+#
+# Copyright (c) 2016-2018 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Export of reduced results into a SQLite database for ad-hoc queries.
+
+The database holds a single table (RESULTS_TABLE_NAME) with one flattened row per (source, scenario, execution,
+randomized rounding setting), where the source names the exported storage (e.g. 'baseline' or 'with_latencies').
+Besides the ids, each row contains
+
+- the generation parameters of the scenario (e.g. topology, number_of_requests),
+- the algorithm parameters of the execution (e.g. latency_approximation_type, latency_approximation_factor and
+  latency_approximation_limit),
+- the randomized rounding setting (rr_setting, lp_recomputation_mode and rounding_order),
+- all reduced metrics, following the column names of reduced_data.ColumnarReducedRandRoundResults.
+
+All parameter columns are indexed. Results without a solution yield a single row having has_solution = 0, e.g.
+
+    SELECT AVG(lp_time_optimization) FROM results
+    WHERE latency_approximation_type = 'flex' AND latency_approximation_limit = 10 AND topology = 'Netrail'
+      AND rr_setting = 'NONE__RANDOM'
+"""
+
+import numbers
+import os
+import sqlite3
+
+import numpy as np
+
+from alib import util
+from evaluation_acm_ccr_2019.reduced_data import AggregatedData, ColumnarReducedRandRoundResults, get_rr_settings_name
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+RESULTS_TABLE_NAME = "results"
+
+_ID_COLUMNS = [("source", "TEXT"), ("algorithm_id", "TEXT"), ("scenario_id", "INTEGER"), ("exec_id", "INTEGER")]
+_RR_SETTING_COLUMNS = [("rr_setting", "TEXT"), ("lp_recomputation_mode", "TEXT"), ("rounding_order", "TEXT")]
+
+
+def _get_metric_columns():
+    statistics = AggregatedData._fields
+    columns = [("has_solution", "INTEGER"), ("lp_status", "TEXT")]
+    columns += [(field, "REAL") for field in ColumnarReducedRandRoundResults.SCALAR_FIELDS]
+    columns += [("lp_time_dynvmp_computation_sum_of_means", "REAL"),
+                ("lp_time_dynvmp_computation_number_of_separations", "INTEGER")]
+    for field in ColumnarReducedRandRoundResults.AGGREGATED_FIELDS + ColumnarReducedRandRoundResults.PER_RR_SETTING_FIELDS:
+        columns += [("{}_{}".format(field, statistic), "REAL") for statistic in statistics]
+    return columns
+
+
+def _to_sql_value(value):
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (bool, numbers.Integral)):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    return str(getattr(value, "name", value))
+
+
+def _get_sql_type(values):
+    values = [value for value in values if value is not None]
+    if values and all(isinstance(value, int) for value in values):
+        return "INTEGER"
+    if values and all(isinstance(value, (int, float)) for value in values):
+        return "REAL"
+    return "TEXT"
+
+
+def _quote(identifier):
+    return '"{}"'.format(identifier.replace('"', '""'))
+
+
+def get_generation_parameters_by_scenario(scenario_parameter_dict):
+    """ Inverts the scenario parameter dict of a scenario parameter container, i.e. returns a dict mapping each
+        scenario id to a dict mapping the names of the generation parameters to the scenario's values.
+    """
+    generation_parameters = {}
+
+    def collect(parameter_dict, parameter_name):
+        for key, value in parameter_dict.items():
+            if isinstance(value, set):
+                if key == "all":
+                    continue
+                for scenario_id in value:
+                    scenario_parameters = generation_parameters.setdefault(scenario_id, {})
+                    if parameter_name in scenario_parameters and scenario_parameters[parameter_name] != key:
+                        raise ValueError("Scenario {} has several values for the generation parameter {}: {} and {}".format(
+                            scenario_id, parameter_name, scenario_parameters[parameter_name], key))
+                    scenario_parameters[parameter_name] = key
+            elif isinstance(value, dict):
+                collect(value, key)
+            elif isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+                collect(value[0], key)
+
+    collect(scenario_parameter_dict, None)
+    return generation_parameters
+
+
+def _get_parameters(algorithm_id, scenario_solution_storage):
+    """ Returns the generation parameters by scenario id and the algorithm parameters by execution id of a storage. """
+    generation_parameters = get_generation_parameters_by_scenario(
+        scenario_solution_storage.scenario_parameter_container.scenario_parameter_dict)
+    algorithm_parameters = {
+        exec_id: parameters['ALGORITHM_PARAMETERS']
+        for exec_id, parameters in enumerate(scenario_solution_storage.execution_parameter_container.algorithm_parameter_list)
+        if parameters['ALG_ID'] == algorithm_id
+    }
+    return generation_parameters, algorithm_parameters
+
+
+def _get_parameter_columns(parameters_by_source, fixed_column_names):
+    """ Returns the columns of the generation and algorithm parameters of all sources, raising a ValueError if a
+        parameter shares its name with a fixed column or with a parameter of the other kind.
+    """
+    values_by_column = {}
+    kind_of_column = {}
+    for source, generation_parameters, algorithm_parameters in parameters_by_source:
+        for kind, parameters_by_id in (("generation", generation_parameters), ("algorithm", algorithm_parameters)):
+            for _, parameters in sorted(parameters_by_id.items()):
+                for column, value in parameters.items():
+                    if column in fixed_column_names:
+                        raise ValueError("The {} parameter {} of {} collides with the column of the same name".format(
+                            kind, column, source))
+                    if kind_of_column.setdefault(column, kind) != kind:
+                        raise ValueError("The {} parameter {} of {} collides with the {} parameter of the same "
+                                         "name".format(kind, column, source, kind_of_column[column]))
+                    values_by_column.setdefault(column, []).append(_to_sql_value(value))
+    return [(column, _get_sql_type(values)) for column, values in values_by_column.items()]
+
+
+def _get_result_rows(source, algorithm_id, scenario_solution_storage, generation_parameters, algorithm_parameters):
+    """ Yields the rows of a single storage as dicts mapping column names to SQL values. """
+    statistics = AggregatedData._fields
+
+    scenario_solution_dict = scenario_solution_storage.algorithm_scenario_solution_dictionary[algorithm_id]
+    for scenario_id in sorted(scenario_solution_dict):
+        for exec_id in sorted(scenario_solution_dict[scenario_id]):
+            solution = scenario_solution_dict[scenario_id][exec_id]
+            row = dict(source=source, algorithm_id=algorithm_id, scenario_id=scenario_id, exec_id=exec_id)
+            row.update(generation_parameters.get(scenario_id, {}))
+            row.update(algorithm_parameters.get(exec_id, {}))
+            if solution is None:
+                row["has_solution"] = 0
+                yield {column: _to_sql_value(value) for column, value in row.items()}
+                continue
+
+            row["has_solution"] = 1
+            row["lp_status"] = str(solution.lp_status)
+            row["lp_time_dynvmp_computation_sum_of_means"] = sum(aggregated_data.mean for aggregated_data in
+                                                                 solution.lp_time_dynvmp_computation)
+            row["lp_time_dynvmp_computation_number_of_separations"] = len(solution.lp_time_dynvmp_computation)
+            for field in ColumnarReducedRandRoundResults.SCALAR_FIELDS:
+                row[field] = getattr(solution, field)
+            for field in ColumnarReducedRandRoundResults.AGGREGATED_FIELDS:
+                aggregated_data = getattr(solution, field)
+                for statistic in statistics:
+                    row["{}_{}".format(field, statistic)] = getattr(aggregated_data, statistic)
+
+            for rr_settings in solution.profits:
+                rr_row = dict(row)
+                rr_row["rr_setting"] = get_rr_settings_name(rr_settings)
+                rr_row["lp_recomputation_mode"] = rr_settings[0]
+                rr_row["rounding_order"] = rr_settings[1]
+                for field in ColumnarReducedRandRoundResults.PER_RR_SETTING_FIELDS:
+                    aggregated_data = getattr(solution, field)[rr_settings]
+                    for statistic in statistics:
+                        rr_row["{}_{}".format(field, statistic)] = getattr(aggregated_data, statistic)
+                yield {column: _to_sql_value(value) for column, value in rr_row.items()}
+
+
+def export_reduced_storages_to_sqlite(database_path, storages_by_source, algorithm_id, overwrite=False):
+    """ Writes the reduced results of the given storages into a new SQLite database at database_path.
+
+    :param database_path:       file of the database; an existing file is only replaced if overwrite is True
+    :param storages_by_source:  list of (source, scenario solution storage) tuples, where source names the storage
+                                in the column 'source' (e.g. 'baseline' or 'with_latencies')
+    :param algorithm_id:        algorithm whose results are exported
+    :param overwrite:           replace an existing database
+    :return: number of written rows
+
+    Raises a ValueError if a generation or algorithm parameter is named like a column of the results or like a
+    parameter of the other kind, as its values would otherwise overwrite the column's.
+    """
+    parameters_by_source = [(source,) + _get_parameters(algorithm_id, scenario_solution_storage)
+                            for source, scenario_solution_storage in storages_by_source]
+    fixed_columns = _ID_COLUMNS + _RR_SETTING_COLUMNS + _get_metric_columns()
+    parameter_columns = _get_parameter_columns(parameters_by_source, set(column for column, _ in fixed_columns))
+    parameter_column_names = [column for column, _ in parameter_columns]
+
+    if os.path.exists(database_path):
+        if not overwrite:
+            raise RuntimeError("The database {} already exists; set overwrite to replace it".format(database_path))
+        os.remove(database_path)
+
+    columns = _ID_COLUMNS + parameter_columns + _RR_SETTING_COLUMNS + _get_metric_columns()
+    column_names = [column for column, _ in columns]
+    indexed_column_names = ["source", "scenario_id", "exec_id", "rr_setting"] + parameter_column_names
+    insert_statement = "INSERT INTO {} ({}) VALUES ({})".format(_quote(RESULTS_TABLE_NAME),
+                                                                ", ".join(_quote(column) for column in column_names),
+                                                                ", ".join("?" for _ in column_names))
+
+    number_of_rows = 0
+    connection = sqlite3.connect(database_path)
+    try:
+        with connection:
+            connection.execute("CREATE TABLE {} ({})".format(
+                _quote(RESULTS_TABLE_NAME),
+                ", ".join("{} {}".format(_quote(column), sql_type) for column, sql_type in columns)))
+            for (source, scenario_solution_storage), (_, generation_parameters, algorithm_parameters) in zip(
+                    storages_by_source, parameters_by_source):
+                logger.info("Writing results of {} into {}".format(source, database_path))
+                # the rows of each source are streamed into the database instead of being collected first
+                cursor = connection.executemany(insert_statement, (
+                    [row.get(column) for column in column_names]
+                    for row in _get_result_rows(source, algorithm_id, scenario_solution_storage,
+                                                generation_parameters, algorithm_parameters)))
+                number_of_rows += cursor.rowcount
+            for column in indexed_column_names:
+                connection.execute("CREATE INDEX {} ON {} ({})".format(
+                    _quote("{}_{}_index".format(RESULTS_TABLE_NAME, column)), _quote(RESULTS_TABLE_NAME),
+                    _quote(column)))
+    finally:
+        connection.close()
+    return number_of_rows
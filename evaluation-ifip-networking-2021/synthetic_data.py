@@ -0,0 +1,410 @@
+# MIT License
+#
+# Copyright (c) 2016-2018 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Synthetic reduced results for exercising the evaluation without running experiments.
+
+The generated scenario solution storages expose the interface of alib's ScenarioSolutionStorage used by the evaluation
+(scenario and execution parameter containers including their reverse lookups) and contain one
+ReducedRandRoundSepLPOptDynVMPCollectionResult per scenario and execution. The default parameter rooms mirror the
+latency study (see latency_study/main_evaluation); the number of scenarios is controlled via the scenario repetition
+and the number of executions via the algorithm parameter space. Values are random but depend on the parameters in
+plausible ways (e.g. runtimes grow with the number of requests and with tighter latency approximations), such that
+plots look like those of real experiments.
+"""
+
+import copy
+import itertools
+from collections import namedtuple
+
+import numpy as np
+
+from alib import util
+from vnep_approx import treewidth_model
+from evaluation_acm_ccr_2019.plot_data import ReducedRandRoundSepLPOptDynVMPCollectionResult, get_aggregated_data
+
+logger = util.get_logger(__name__, make_file=False, propagate=True)
+
+ALGORITHM_ID = "RandRoundSepLPOptDynVMPCollection"
+
+DEFAULT_SCENARIO_PARAMETER_ROOM = {
+    'request_generation': [{'cactus': {'CactusRequestGenerator': {
+        'number_of_requests': [30],
+        'node_resource_factor': [0.3, 0.8],
+        'edge_resource_factor': [0.3, 0.8],
+    }}}],
+    'substrate_generation': [{'substrates': {'TopologyZooReader': {
+        'topology': ['Eunetworks', 'Funet', 'Noel', 'Oxford', 'Netrail'],
+    }}}],
+}
+
+#: number of substrate nodes of the topologies; other topologies are assumed to have DEFAULT_TOPOLOGY_SIZE nodes
+TOPOLOGY_SIZES = {'Eunetworks': 14, 'Funet': 26, 'Noel': 19, 'Oxford': 20, 'Netrail': 7}
+DEFAULT_TOPOLOGY_SIZE = 20
+
+DEFAULT_LATENCY_ALGORITHM_PARAMETER_SPACE = {
+    'latency_approximation_type': ['flex', 'strict'],
+    'latency_approximation_factor': [0.5, 0.1, 0.02],
+    'latency_approximation_limit': [3, 5, 10, 15],
+}
+
+DEFAULT_BASELINE_ALGORITHM_PARAMETER_SPACE = {
+    'latency_approximation_type': ['no latencies'],
+    'latency_approximation_factor': [1],
+    'latency_approximation_limit': [1],
+}
+
+#: number of rounding samples per LP recomputation mode, as in the latency study's execution configuration
+ROUNDING_SAMPLES_PER_LP_RECOMPUTATION_MODE = {
+    treewidth_model.LPRecomputationMode.NONE: 50,
+    treewidth_model.LPRecomputationMode.RECOMPUTATION_WITHOUT_SEPARATION: 2,
+}
+
+
+class SyntheticScenarioParameterContainer(object):
+    """ Scenario parameter room together with the reverse lookup of alib's ScenarioParameterContainer, i.e. a dict
+        mapping generation type, generator strategy, generator class, parameter and value to the set of scenario ids.
+    """
+
+    def __init__(self, scenarioparameter_room, scenario_repetition=1):
+        self.scenarioparameter_room = scenarioparameter_room
+        self.scenario_list = None
+        self.scenario_triple = None
+        self.scenario_parameter_combination_list = []
+        self.scenario_parameter_dict = {}
+
+        parameter_paths = []
+        for generation_type, generators in scenarioparameter_room.items():
+            for generator in generators:
+                for strategy, classes in generator.items():
+                    for class_name, parameters in classes.items():
+                        for parameter, values in parameters.items():
+                            parameter_paths.append(((generation_type, strategy, class_name, parameter), values))
+
+        scenario_id = 0
+        for combination in itertools.product(*[values for (_, values) in parameter_paths]):
+            for _ in range(scenario_repetition):
+                scenario_parameters = {}
+                for ((generation_type, strategy, class_name, parameter), _), value in zip(parameter_paths,
+                                                                                         combination):
+                    scenario_parameters[parameter] = value
+                    strategy_dict = self.scenario_parameter_dict.setdefault(generation_type, {}).setdefault(strategy, {})
+                    strategy_dict.setdefault('all', set()).add(scenario_id)
+                    strategy_dict.setdefault(class_name, {}).setdefault(parameter, {}).setdefault(value, set()).add(
+                        scenario_id)
+                self.scenario_parameter_combination_list.append(scenario_parameters)
+                scenario_id += 1
+
+    def get_number_of_scenarios(self):
+        return len(self.scenario_parameter_combination_list)
+
+
+class SyntheticExecutionParameterContainer(object):
+    """ Execution parameters of a single algorithm together with the reverse lookup of alib's
+        ExecutionParameterContainer, i.e. a dict mapping the algorithm id, the parameter type, the parameter and the
+        value to the set of execution ids.
+    """
+
+    def __init__(self, algorithm_id, algorithm_parameter_space, gurobi_parameter_space=None):
+        if gurobi_parameter_space is None:
+            gurobi_parameter_space = {'threads': [1]}
+        self.algorithm_parameter_list = []
+        self.reverse_lookup = {algorithm_id: {'all': set(), 'ALGORITHM_PARAMETERS': {}, 'GUROBI_PARAMETERS': {}}}
+
+        algorithm_parameter_keys = sorted(algorithm_parameter_space)
+        gurobi_parameter_keys = sorted(gurobi_parameter_space)
+        for execution_id, (algorithm_values, gurobi_values) in enumerate(itertools.product(
+                itertools.product(*[algorithm_parameter_space[key] for key in algorithm_parameter_keys]),
+                itertools.product(*[gurobi_parameter_space[key] for key in gurobi_parameter_keys]))):
+            parameters = {
+                'ALG_ID': algorithm_id,
+                'ALGORITHM_PARAMETERS': dict(zip(algorithm_parameter_keys, algorithm_values)),
+                'GUROBI_PARAMETERS': dict(zip(gurobi_parameter_keys, gurobi_values)),
+            }
+            self.algorithm_parameter_list.append(parameters)
+            lookup = self.reverse_lookup[algorithm_id]
+            lookup['all'].add(execution_id)
+            for parameter_type in ['ALGORITHM_PARAMETERS', 'GUROBI_PARAMETERS']:
+                for key, value in parameters[parameter_type].items():
+                    lookup[parameter_type].setdefault(key, {}).setdefault(value, set()).add(execution_id)
+
+    def get_execution_ids(self, ALG_ID=None, **algorithm_parameters):
+        if ALG_ID is None:
+            execution_ids = set(range(len(self.algorithm_parameter_list)))
+        else:
+            execution_ids = set(self.reverse_lookup[ALG_ID]['all'])
+        for key, value in algorithm_parameters.items():
+            execution_ids &= {execution_id for execution_id, parameters in enumerate(self.algorithm_parameter_list)
+                              if parameters['ALGORITHM_PARAMETERS'].get(key) == value}
+        return execution_ids
+
+
+class SyntheticScenarioSolutionStorage(object):
+    """ Scenario solution storage providing the interface of alib's ScenarioSolutionStorage used by the evaluation.
+    """
+
+    def __init__(self, scenario_parameter_container, execution_parameter_container):
+        self.scenario_parameter_container = scenario_parameter_container
+        self.scenario_parameter_dict = scenario_parameter_container.scenario_parameter_dict
+        self.execution_parameter_container = execution_parameter_container
+        self.algorithm_scenario_solution_dictionary = {}
+
+    def add_solution(self, algorithm_id, scenario_id, execution_id, solution):
+        self.algorithm_scenario_solution_dictionary.setdefault(algorithm_id, {}).setdefault(
+            scenario_id, {})[execution_id] = solution
+
+    def get_solutions_by_scenario_index(self, index):
+        return {algorithm_id: scenario_solution_dict[index]
+                for algorithm_id, scenario_solution_dict in self.algorithm_scenario_solution_dictionary.items()
+                if index in scenario_solution_dict}
+
+
+def _get_rr_settings():
+    return [rr_settings for rr_settings in itertools.product(treewidth_model.LPRecomputationMode,
+                                                             treewidth_model.RoundingOrder)
+            if rr_settings[0] in ROUNDING_SAMPLES_PER_LP_RECOMPUTATION_MODE]
+
+
+def _sample_values(random_state, mean, number_of_values, sigma=0.3):
+    # log-normally distributed values having (approximately) the given mean
+    return mean * random_state.lognormal(-0.5 * sigma ** 2, sigma, size=max(1, number_of_values))
+
+
+def _sample_aggregated_data(random_state, mean, number_of_values, sigma=0.3):
+    return get_aggregated_data(_sample_values(random_state, mean, number_of_values, sigma))
+
+
+#: raw rounding results and mappings as read by RandRoundSepLPOptDynVMPCollectionResultReducer
+SyntheticRoundingResult = namedtuple("SyntheticRoundingResult",
+                                     ["solution", "profit", "max_node_load", "max_edge_load", "time_to_round_solution"])
+SyntheticIntegralSolution = namedtuple("SyntheticIntegralSolution", ["request_mapping"])
+SyntheticLatencyMapping = namedtuple("SyntheticLatencyMapping", ["latency_limit", "mapping_latencies"])
+
+
+class _ResultModel(object):
+    """ Derives the expected values of a single execution's result from the scenario and algorithm parameters. """
+
+    def __init__(self, random_state, scenario_parameters, algorithm_parameters):
+        self.number_of_requests = scenario_parameters.get('number_of_requests', 30)
+        node_resource_factor = scenario_parameters.get('node_resource_factor', 0.5)
+        edge_resource_factor = scenario_parameters.get('edge_resource_factor', 0.5)
+        self.substrate_size = TOPOLOGY_SIZES.get(scenario_parameters.get('topology'), DEFAULT_TOPOLOGY_SIZE)
+
+        self.latency_type = algorithm_parameters.get('latency_approximation_type', 'no latencies')
+        if self.latency_type == 'no latencies':
+            latency_slowdown = 1.0
+            self.latency_limit = None
+        else:
+            # smaller approximation factors and tighter limits increase the DynVMP runtime; strict is harder than flex
+            latency_slowdown = ((1.0 + 0.05 / algorithm_parameters['latency_approximation_factor']) *
+                                (1.0 + 2.0 / algorithm_parameters['latency_approximation_limit']) *
+                                (1.5 if self.latency_type == 'strict' else 1.0))
+            self.latency_limit = algorithm_parameters['latency_approximation_limit']
+
+        self.request_runtime = 0.002 * self.substrate_size * latency_slowdown
+        self.number_of_separation_rounds = int(random_state.randint(3, 9))
+
+        # scarcer resources and tighter latency limits decrease the achievable profit
+        self.resource_scarcity = 1.0 / (1.0 + 1.5 * (node_resource_factor + edge_resource_factor))
+        latency_penalty = 0.0 if self.latency_limit is None else 0.5 / self.latency_limit
+        self.lp_profit = float(self.number_of_requests * 10.0 * (1.0 - 0.6 * self.resource_scarcity) *
+                               (1.0 - latency_penalty) * random_state.lognormal(0.0, 0.1))
+        self.lp_time_preprocess = float(0.05 * self.substrate_size * random_state.lognormal(0.0, 0.2))
+        self.lp_generated_columns = int(self.number_of_separation_rounds * self.number_of_requests *
+                                        random_state.randint(5, 50))
+
+    def get_mean_latency_percentage(self):
+        # latencies of the mappings in percent of the respective latency limit
+        return 60.0 + 20.0 * (self.latency_type == 'flex')
+
+
+def generate_reduced_result(random_state, scenario_parameters, algorithm_parameters, rr_settings_list=None):
+    """ Generates a single ReducedRandRoundSepLPOptDynVMPCollectionResult for the given scenario and algorithm
+        parameters.
+    """
+    if rr_settings_list is None:
+        rr_settings_list = _get_rr_settings()
+    model = _ResultModel(random_state, scenario_parameters, algorithm_parameters)
+
+    lp_time_dynvmp_computation = [_sample_aggregated_data(random_state, model.request_runtime,
+                                                          model.number_of_requests)
+                                  for _ in range(model.number_of_separation_rounds)]
+    lp_time_gurobi_optimization = _sample_aggregated_data(random_state, 0.01 * model.number_of_requests,
+                                                          model.number_of_separation_rounds)
+    lp_time_optimization = sum(aggregated_data.mean * aggregated_data.value_count
+                               for aggregated_data in lp_time_dynvmp_computation + [lp_time_gurobi_optimization])
+
+    max_node_loads = {}
+    max_edge_loads = {}
+    rounding_runtimes = {}
+    profits = {}
+    for rr_settings in rr_settings_list:
+        number_of_samples = ROUNDING_SAMPLES_PER_LP_RECOMPUTATION_MODE[rr_settings[0]]
+        max_node_loads[rr_settings] = _sample_aggregated_data(random_state, 0.8 + model.resource_scarcity,
+                                                              number_of_samples)
+        max_edge_loads[rr_settings] = _sample_aggregated_data(random_state, 0.8 + model.resource_scarcity,
+                                                              number_of_samples)
+        rounding_runtimes[rr_settings] = _sample_aggregated_data(random_state, 0.001 * model.number_of_requests,
+                                                                 number_of_samples)
+        profits[rr_settings] = _sample_aggregated_data(random_state, 0.8 * model.lp_profit, number_of_samples,
+                                                       sigma=0.1)
+
+    if model.latency_limit is None:
+        latency_information = get_aggregated_data([0.0])
+    else:
+        latency_information = _sample_aggregated_data(random_state, model.get_mean_latency_percentage(),
+                                                      model.number_of_requests * 3, sigma=0.2)
+
+    return ReducedRandRoundSepLPOptDynVMPCollectionResult(
+        lp_time_preprocess=model.lp_time_preprocess,
+        lp_time_tree_decomposition=_sample_aggregated_data(random_state, 0.001 * model.substrate_size,
+                                                           model.number_of_requests),
+        lp_time_dynvmp_initialization=_sample_aggregated_data(random_state, 0.5 * model.request_runtime,
+                                                              model.number_of_requests),
+        lp_time_dynvmp_computation=lp_time_dynvmp_computation,
+        lp_time_gurobi_optimization=lp_time_gurobi_optimization,
+        lp_time_optimization=float(lp_time_optimization),
+        lp_status="OPTIMAL",
+        lp_profit=model.lp_profit,
+        lp_generated_columns=model.lp_generated_columns,
+        max_node_loads=max_node_loads,
+        max_edge_loads=max_edge_loads,
+        rounding_runtimes=rounding_runtimes,
+        profits=profits,
+        latency_information=latency_information,
+    )
+
+
+def generate_raw_result(random_state, scenario_parameters, algorithm_parameters, rr_settings_list=None):
+    """ Generates a single (unreduced) RandRoundSepLPOptDynVMPCollectionResult for the given scenario and algorithm
+        parameters, as consumed by RandRoundSepLPOptDynVMPCollectionResultReducer.reduce_single_solution.
+
+        Only the attributes read by the reducer are set: the results are created without invoking the constructors
+        of vnep_approx, and the rounding results are SyntheticRoundingResult instances.
+    """
+    if rr_settings_list is None:
+        rr_settings_list = _get_rr_settings()
+    model = _ResultModel(random_state, scenario_parameters, algorithm_parameters)
+
+    dynvmp_computation_runtimes = [list(_sample_values(random_state, model.request_runtime, model.number_of_requests))
+                                   for _ in range(model.number_of_separation_rounds)]
+    gurobi_runtimes = list(_sample_values(random_state, 0.01 * model.number_of_requests,
+                                          model.number_of_separation_rounds))
+
+    lp_computation_information = treewidth_model.SeparationLPSolution.__new__(treewidth_model.SeparationLPSolution)
+    lp_computation_information.time_preprocessing = model.lp_time_preprocess
+    lp_computation_information.time_optimization = float(sum(map(sum, dynvmp_computation_runtimes)) +
+                                                         sum(gurobi_runtimes))
+    lp_computation_information.tree_decomp_runtimes = list(_sample_values(random_state, 0.001 * model.substrate_size,
+                                                                          model.number_of_requests))
+    lp_computation_information.dynvmp_init_runtimes = list(_sample_values(random_state, 0.5 * model.request_runtime,
+                                                                          model.number_of_requests))
+    lp_computation_information.dynvmp_computation_runtimes = dynvmp_computation_runtimes
+    lp_computation_information.gurobi_runtimes = gurobi_runtimes
+    lp_computation_information.status = "OPTIMAL"
+    lp_computation_information.profit = model.lp_profit
+    lp_computation_information.number_of_generated_mappings = model.lp_generated_columns
+
+    result = treewidth_model.RandRoundSepLPOptDynVMPCollectionResult.__new__(
+        treewidth_model.RandRoundSepLPOptDynVMPCollectionResult)
+    result.lp_computation_information = lp_computation_information
+    result.solutions = {}
+    for rr_settings in rr_settings_list:
+        number_of_samples = ROUNDING_SAMPLES_PER_LP_RECOMPUTATION_MODE[rr_settings[0]]
+        rounding_results = []
+        for _ in range(number_of_samples):
+            request_mapping = {}
+            if model.latency_limit is not None:
+                for request_index in range(model.number_of_requests):
+                    latencies = _sample_values(random_state,
+                                               model.latency_limit * model.get_mean_latency_percentage() / 100.0,
+                                               2, sigma=0.2)
+                    request_mapping["req_{}".format(request_index)] = SyntheticLatencyMapping(
+                        latency_limit=model.latency_limit,
+                        mapping_latencies={("i", "j"): latencies[0], ("j", "k"): latencies[1]})
+            rounding_results.append(SyntheticRoundingResult(
+                solution=SyntheticIntegralSolution(request_mapping=request_mapping),
+                profit=float(0.8 * model.lp_profit * random_state.lognormal(0.0, 0.1)),
+                max_node_load=float((0.8 + model.resource_scarcity) * random_state.lognormal(0.0, 0.3)),
+                max_edge_load=float((0.8 + model.resource_scarcity) * random_state.lognormal(0.0, 0.3)),
+                time_to_round_solution=float(0.001 * model.number_of_requests * random_state.lognormal(0.0, 0.3)),
+            ))
+        result.solutions[rr_settings] = rounding_results
+    return result
+
+
+def generate_reduced_scenario_solution_storage(algorithm_parameter_space=None,
+                                               scenarioparameter_room=None,
+                                               scenario_repetition=10,
+                                               seed=0,
+                                               algorithm_id=ALGORITHM_ID):
+    """ Generates a scenario solution storage containing a synthetic reduced result for each scenario and execution.
+
+    :param algorithm_parameter_space: dict mapping the algorithm parameters to their lists of values; the executions
+                                      are given by their cartesian product (default: the latency study's executions)
+    :param scenarioparameter_room:    scenario parameter room in the format of alib's scenario generation
+                                      (default: the latency study's scenarios)
+    :param scenario_repetition:       number of scenarios per combination of scenario parameters
+    :param seed:                      seed of the random values
+    :param algorithm_id:              algorithm id under which the results are stored
+    :return: SyntheticScenarioSolutionStorage
+    """
+    if algorithm_parameter_space is None:
+        algorithm_parameter_space = DEFAULT_LATENCY_ALGORITHM_PARAMETER_SPACE
+    if scenarioparameter_room is None:
+        scenarioparameter_room = DEFAULT_SCENARIO_PARAMETER_ROOM
+
+    scenario_parameter_container = SyntheticScenarioParameterContainer(copy.deepcopy(scenarioparameter_room),
+                                                                       scenario_repetition)
+    execution_parameter_container = SyntheticExecutionParameterContainer(algorithm_id, algorithm_parameter_space)
+    storage = SyntheticScenarioSolutionStorage(scenario_parameter_container, execution_parameter_container)
+
+    logger.info("Generating synthetic results for {} scenarios and {} executions".format(
+        scenario_parameter_container.get_number_of_scenarios(),
+        len(execution_parameter_container.algorithm_parameter_list)))
+
+    random_state = np.random.RandomState(seed)
+    rr_settings_list = _get_rr_settings()
+    for scenario_id, scenario_parameters in enumerate(scenario_parameter_container.scenario_parameter_combination_list):
+        for execution_id, parameters in enumerate(execution_parameter_container.algorithm_parameter_list):
+            storage.add_solution(algorithm_id, scenario_id, execution_id,
+                                 generate_reduced_result(random_state, scenario_parameters,
+                                                         parameters['ALGORITHM_PARAMETERS'], rr_settings_list))
+    return storage
+
+
+def generate_latency_study_storages(scenario_repetition=10,
+                                    latency_approximation_limits=None,
+                                    seed=0):
+    """ Generates a pair (baseline storage, latency storage) as evaluated by evaluate_latency_and_baseline and
+        evaluate_randround_runtimes_latency_study. Both storages share the scenario parameters.
+    """
+    latency_algorithm_parameter_space = dict(DEFAULT_LATENCY_ALGORITHM_PARAMETER_SPACE)
+    if latency_approximation_limits is not None:
+        latency_algorithm_parameter_space['latency_approximation_limit'] = list(latency_approximation_limits)
+    baseline = generate_reduced_scenario_solution_storage(DEFAULT_BASELINE_ALGORITHM_PARAMETER_SPACE,
+                                                          scenario_repetition=scenario_repetition,
+                                                          seed=seed)
+    with_latencies = generate_reduced_scenario_solution_storage(latency_algorithm_parameter_space,
+                                                                scenario_repetition=scenario_repetition,
+                                                                seed=seed + 1)
+    return baseline, with_latencies
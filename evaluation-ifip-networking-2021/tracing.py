@@ -0,0 +1,170 @@
+# MIT License
+#
+# Copyright (c) 2016-2018 Matthias Rost, Elias Doehne, Alexander Elvers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""Recording of the evaluation's stages as timeline in the Chrome trace event format.
+
+Spans are recorded via the module-level tracer, e.g.
+
+    with tracer.span("load pickle", category="io", filename=filename):
+        ...
+
+or by decorating functions using traced. Unless the tracer is enabled (e.g. via the --trace option of the CLI), spans
+are not recorded and cost a single attribute lookup. The written JSON files can be opened in any viewer supporting
+the Chrome trace event format, e.g. chrome://tracing or https://ui.perfetto.dev.
+
+Work dispatched to worker processes is traced by dispatching call_traced(function, argument) instead of
+function(argument) and passing the returned events to Tracer.add_events (see dispatch_traced).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+# labels of the processes in the trace: the process having enabled the tracer and all others
+_MAIN_PROCESS_LABEL = "evaluation"
+_WORKER_PROCESS_LABEL = "worker"
+
+
+class _Span(object):
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.time()
+        self.tracer.events.append(dict(
+            name=self.name,
+            cat=self.category,
+            ph="X",
+            ts=self.start * 1e6,
+            dur=(end - self.start) * 1e6,
+            pid=os.getpid(),
+            tid=threading.get_ident(),
+            args={key: str(value) for key, value in self.args.items()},
+        ))
+        return False
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer(object):
+    """ Records complete events ("ph": "X") of spans, timestamped in microseconds since the epoch such that the events
+        of several processes can be merged into a single timeline.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.main_pid = None
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self.main_pid = os.getpid()
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, category="evaluation", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def add_events(self, events):
+        self.events.extend(events)
+
+    def get_trace(self):
+        process_names = []
+        for pid in sorted(set(event['pid'] for event in self.events) | {self.main_pid or os.getpid()}):
+            label = _MAIN_PROCESS_LABEL if pid == self.main_pid else _WORKER_PROCESS_LABEL
+            process_names.append(dict(name="process_name", ph="M", pid=pid, tid=0, args=dict(name=label)))
+        return dict(traceEvents=process_names + self.events, displayTimeUnit="ms")
+
+    def write(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.get_trace(), f)
+
+
+tracer = Tracer()
+
+
+def traced(name, category="evaluation"):
+    """ Decorator recording each call of the decorated function as span. """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(name, category=category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def call_traced(function, argument):
+    """ Calls function(argument) with tracing enabled and returns the result together with the events recorded during
+        the call. Used to trace work executed by worker processes, whose tracer is not the one writing the trace.
+    """
+    number_of_previous_events = len(tracer.events)
+    was_enabled = tracer.enabled
+    tracer.enabled = True
+    try:
+        result = function(argument)
+    finally:
+        tracer.enabled = was_enabled
+    events = tracer.events[number_of_previous_events:]
+    del tracer.events[number_of_previous_events:]
+    return result, events
+
+
+def dispatch_traced(map_function, function, arguments):
+    """ Applies function to the arguments via map_function (e.g. the imap of a multiprocessing.Pool) and yields the
+        results. If tracing is enabled, the events recorded by the worker processes are added to the tracer.
+    """
+    if not tracer.enabled:
+        for result in map_function(function, arguments):
+            yield result
+        return
+    for result, events in map_function(functools.partial(call_traced, function), arguments):
+        tracer.add_events(events)
+        yield result
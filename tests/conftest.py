@@ -0,0 +1,16 @@
+import importlib.util
+import os
+import sys
+
+PACKAGE_NAME = "evaluation_acm_ccr_2019"
+PACKAGE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "evaluation-ifip-networking-2021")
+
+# the package directory is not a valid module name; unless the package is installed (see README), it is imported from
+# the source tree under the name used by its modules
+if PACKAGE_NAME not in sys.modules and importlib.util.find_spec(PACKAGE_NAME) is None:
+    _spec = importlib.util.spec_from_file_location(PACKAGE_NAME, os.path.join(PACKAGE_DIRECTORY, "__init__.py"),
+                                                   submodule_search_locations=[PACKAGE_DIRECTORY])
+    _package = importlib.util.module_from_spec(_spec)
+    sys.modules[PACKAGE_NAME] = _package
+    _spec.loader.exec_module(_package)
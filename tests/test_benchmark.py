@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_acm_ccr_2019 import benchmark
+
+
+def test_measure_calls_setup_before_each_execution():
+    calls = []
+    benchmark.measure(lambda: calls.append("function"), repetitions=2, setup=lambda: calls.append("setup"))
+    assert calls == ["setup", "function"] * 3
+
+
+def test_stages_are_measured_without_cache_hits():
+    context = benchmark.BenchmarkContext(0.1)
+    try:
+        cache = context.heatmap_plotter.scenario_selection_cache
+        hits_per_execution = []
+
+        def run_stage():
+            hits_before = cache.hits
+            context.run_plot_single_heatmap_general()
+            hits_per_execution.append(cache.hits - hits_before)
+
+        benchmark.measure(run_stage, repetitions=2, setup=context.clear_caches)
+        assert len(set(hits_per_execution)) == 1
+        assert context.heatmap_plotter.metric_cube._columns
+        assert context.boxplot_plotter.scenario_selection_cache is not cache
+    finally:
+        context.cleanup()
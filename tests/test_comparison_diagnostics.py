@@ -0,0 +1,100 @@
+import csv
+import os
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_acm_ccr_2019 import algorithm_heatmap_plots, synthetic_data
+
+
+def _list_output_files(output_path):
+    return set(os.path.relpath(os.path.join(directory, filename), output_path)
+               for directory, _, filenames in os.walk(output_path)
+               for filename in filenames)
+
+
+def test_comparison_is_only_evaluated_on_request(tmp_path):
+    baseline, with_latencies = synthetic_data.generate_latency_study_storages(scenario_repetition=1)
+    default_path = str(tmp_path / "default")
+    comparison_path = str(tmp_path / "comparison")
+
+    algorithm_heatmap_plots.evaluate_latency_and_baseline(baseline, with_latencies, synthetic_data.ALGORITHM_ID,
+                                                          output_path=default_path, output_filetype="npz")
+    algorithm_heatmap_plots.evaluate_latency_and_baseline(baseline, with_latencies, synthetic_data.ALGORITHM_ID,
+                                                          output_path=comparison_path, output_filetype="npz",
+                                                          plot_comparison=True)
+
+    default_files = _list_output_files(default_path)
+    comparison_files = _list_output_files(comparison_path)
+    assert algorithm_heatmap_plots.COMPARISON_DIAGNOSTICS_FILENAME not in default_files
+    assert algorithm_heatmap_plots.COMPARISON_DIAGNOSTICS_FILENAME in comparison_files
+    assert default_files < comparison_files
+
+
+def test_evaluation_writes_one_diagnostics_row_per_compared_pair(tmp_path):
+    baseline, with_latencies = synthetic_data.generate_latency_study_storages(scenario_repetition=1)
+
+    algorithm_heatmap_plots.evaluate_latency_and_baseline(baseline, with_latencies, synthetic_data.ALGORITHM_ID,
+                                                          output_path=str(tmp_path), output_filetype="npz",
+                                                          plot_comparison=True)
+
+    with open(os.path.join(str(tmp_path), algorithm_heatmap_plots.COMPARISON_DIAGNOSTICS_FILENAME)) as f:
+        rows = list(csv.DictReader(f))
+    compared_pairs = set((scenario_id, exec_id)
+                         for scenario_id, exec_solution_dict in with_latencies.algorithm_scenario_solution_dictionary[
+                             synthetic_data.ALGORITHM_ID].items()
+                         for exec_id in exec_solution_dict)
+    assert len(rows) == len(compared_pairs)
+    assert set((int(row['scenario_id']), int(row['exec_id'])) for row in rows) == compared_pairs
+    for row in rows:
+        assert float(row['ratio']) == pytest.approx(
+            100.0 * float(row['with_latency_profit']) / float(row['baseline_profit']))
+
+
+def _write_comparison_diagnostics(output_path, storages, axes_specification):
+    baseline, with_latencies = storages
+    sink = algorithm_heatmap_plots.ComparisonDiagnosticsSink()
+    plotter = algorithm_heatmap_plots.LatencyStudyPlotter(
+        output_path=output_path, output_filetype="npz", baseline_solution_storage=baseline,
+        with_latencies_solution_storage=with_latencies, second_with_latencies_results=None,
+        algorithm_id=synthetic_data.ALGORITHM_ID, comparison=True,
+        heatmap_plot_type=algorithm_heatmap_plots.HeatmapPlotType.ComparisonLatencyBaseline,
+        list_of_axes_specifications=[axes_specification], comparison_diagnostics_sink=sink)
+    plotter.plot_figure(None)
+    with open(sink.write(output_path)) as f:
+        return list(csv.DictReader(f))
+
+
+def test_diagnostics_do_not_depend_on_the_axis_showing_the_type(tmp_path):
+    storages = synthetic_data.generate_latency_study_storages(scenario_repetition=1)
+    type_on_x = algorithm_heatmap_plots.heatmap_axes_specification_type_topology
+    type_on_y = dict(type_on_x,
+                     x_axis_parameter=type_on_x['y_axis_parameter'], y_axis_parameter=type_on_x['x_axis_parameter'],
+                     x_axis_title=type_on_x['y_axis_title'], y_axis_title=type_on_x['x_axis_title'])
+
+    rows_type_on_x = _write_comparison_diagnostics(str(tmp_path / "x"), storages, type_on_x)
+    rows_type_on_y = _write_comparison_diagnostics(str(tmp_path / "y"), storages, type_on_y)
+
+    assert rows_type_on_x
+    assert rows_type_on_y == rows_type_on_x
+
+
+def test_executions_missing_in_either_storage_are_not_compared(tmp_path):
+    baseline, with_latencies = synthetic_data.generate_latency_study_storages(scenario_repetition=1)
+    solutions_by_scenario = with_latencies.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID]
+    baseline_solutions_by_scenario = baseline.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID]
+    scenario_ids = sorted(solutions_by_scenario)
+    # an unfinished execution with latencies and an unfinished baseline execution
+    missing_exec_id = min(solutions_by_scenario[scenario_ids[0]])
+    del solutions_by_scenario[scenario_ids[0]][missing_exec_id]
+    baseline_solutions_by_scenario[scenario_ids[1]].clear()
+
+    rows = _write_comparison_diagnostics(str(tmp_path), (baseline, with_latencies),
+                                         algorithm_heatmap_plots.heatmap_axes_specification_type_topology)
+
+    compared_pairs = set((scenario_id, exec_id)
+                         for scenario_id in scenario_ids[2:] + scenario_ids[:1]
+                         for exec_id in solutions_by_scenario[scenario_id])
+    assert set((int(row['scenario_id']), int(row['exec_id'])) for row in rows) == compared_pairs
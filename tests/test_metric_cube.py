@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_acm_ccr_2019 import algorithm_heatmap_plots, runtime_evaluation, synthetic_data
+from evaluation_acm_ccr_2019.metric_cube import MetricCube
+
+
+@pytest.fixture(scope="module")
+def storages():
+    return synthetic_data.generate_latency_study_storages(scenario_repetition=1)
+
+
+def _get_solutions(storage):
+    return [solution
+            for exec_solution_dict in storage.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID].values()
+            for solution in exec_solution_dict.values()]
+
+
+def _assert_cube_matches_direct_lookup(metric_cube, metric_specifications, solutions):
+    for metric_specification in metric_specifications:
+        expected = [metric_specification['lookup_function'](solution) for solution in solutions]
+        actual = metric_cube.get_values(metric_specification, solutions)
+        np.testing.assert_array_equal(np.array(actual, dtype=float), np.array(expected, dtype=float),
+                                      err_msg=metric_specification['name'])
+
+
+def _create_latency_study_plotter(tmp_path, storages, comparison):
+    baseline, with_latencies = storages
+    return algorithm_heatmap_plots.LatencyStudyPlotter(
+        output_path=str(tmp_path), output_filetype="npz", baseline_solution_storage=baseline,
+        with_latencies_solution_storage=with_latencies, second_with_latencies_results=None,
+        algorithm_id=synthetic_data.ALGORITHM_ID, comparison=comparison,
+        heatmap_plot_type=(algorithm_heatmap_plots.HeatmapPlotType.ComparisonLatencyBaseline if comparison else
+                           algorithm_heatmap_plots.HeatmapPlotType.LatencyStudy))
+
+
+def test_heatmap_metrics_match_direct_lookup(tmp_path, storages):
+    plotter = _create_latency_study_plotter(tmp_path, storages, comparison=False)
+    baseline, with_latencies = storages
+    _assert_cube_matches_direct_lookup(plotter.metric_cube, plotter.list_of_metric_specifications,
+                                       _get_solutions(with_latencies) + _get_solutions(baseline))
+
+
+def test_comparison_metrics_match_direct_lookup(tmp_path, storages):
+    plotter = _create_latency_study_plotter(tmp_path, storages, comparison=True)
+    pair_table = plotter._get_baseline_pair_table(plotter.scenario_solution_storage)
+    pairs = pair_table.get_pairs(np.ones(len(pair_table.solutions), dtype=bool))
+    _assert_cube_matches_direct_lookup(plotter.metric_cube, plotter.list_of_metric_specifications, pairs)
+
+
+def test_boxplot_metrics_match_direct_lookup(tmp_path, storages):
+    baseline, with_latencies = storages
+    plotter = runtime_evaluation.RuntimeBoxplotPlotter_LatencyStudy(
+        output_path=str(tmp_path), output_filetype="npz", scenario_solution_storage=with_latencies,
+        baseline_solution_storage=baseline, algorithm_id=synthetic_data.ALGORITHM_ID)
+    solutions = _get_solutions(with_latencies) + _get_solutions(baseline)
+    for metric_specification in plotter.metric_specifications:
+        expected = [metric_specification['lookup_function'](solution) for solution in solutions]
+        actual = plotter.metric_cube.get_values(metric_specification, solutions)
+        if metric_specification['result_num'] != "single":
+            expected = [value for solution_values in expected for value in solution_values]
+            actual = [value for solution_values in actual for value in solution_values]
+        np.testing.assert_array_equal(np.array(actual, dtype=float), np.array(expected, dtype=float),
+                                      err_msg=metric_specification['name'])
+
+
+def test_cube_is_owned_by_plotter(tmp_path, storages):
+    first = _create_latency_study_plotter(tmp_path, storages, comparison=False)
+    second = _create_latency_study_plotter(tmp_path, storages, comparison=False)
+    assert first.metric_cube is not second.metric_cube
+
+
+def test_metrics_are_only_evaluated_for_requested_solutions(storages):
+    baseline, with_latencies = storages
+    metric_cube = MetricCube()
+    metric_cube.add_solution_storage(with_latencies, synthetic_data.ALGORITHM_ID)
+    looked_up = []
+    metric_specification = dict(lookup_function=lambda solution: looked_up.append(solution) or 1.0)
+    solutions = _get_solutions(with_latencies)
+
+    metric_cube.get_values(metric_specification, solutions[:10])
+    assert len(looked_up) == 10
+    metric_cube.get_values(metric_specification, solutions[5:20])
+    assert len(looked_up) == 20
+    assert set(map(id, looked_up)) == set(map(id, solutions[:20]))
@@ -0,0 +1,203 @@
+import copy
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from alib import util
+from evaluation_acm_ccr_2019 import plot_data, synthetic_data
+from evaluation_acm_ccr_2019.tracing import tracer
+
+
+@pytest.fixture
+def experiment_directories(tmp_path, monkeypatch):
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    input_dir.mkdir()
+    output_dir.mkdir()
+    monkeypatch.setattr(util.ExperimentPathHandler, "INPUT_DIR", str(input_dir), raising=False)
+    monkeypatch.setattr(util.ExperimentPathHandler, "OUTPUT_DIR", str(output_dir), raising=False)
+    return str(input_dir), str(output_dir)
+
+
+SMALL_ALGORITHM_PARAMETER_SPACE = {
+    'latency_approximation_type': ['strict'],
+    'latency_approximation_factor': [0.5],
+    'latency_approximation_limit': [3, 10],
+}
+
+
+def _get_small_scenario_parameter_room():
+    scenarioparameter_room = copy.deepcopy(synthetic_data.DEFAULT_SCENARIO_PARAMETER_ROOM)
+    scenarioparameter_room['substrate_generation'][0]['substrates']['TopologyZooReader']['topology'] = ['Netrail']
+    return scenarioparameter_room
+
+
+def _generate_raw_storage(seed=0):
+    """ Returns a small storage of raw results: 4 scenarios with 2 executions each. """
+    storage = synthetic_data.generate_reduced_scenario_solution_storage(
+        SMALL_ALGORITHM_PARAMETER_SPACE, _get_small_scenario_parameter_room(), scenario_repetition=1, seed=seed)
+    random_state = np.random.RandomState(seed)
+    scenario_parameter_container = storage.scenario_parameter_container
+    for scenario_id, exec_solution_dict in storage.algorithm_scenario_solution_dictionary[
+            synthetic_data.ALGORITHM_ID].items():
+        scenario_parameters = scenario_parameter_container.scenario_parameter_combination_list[scenario_id]
+        for exec_id in exec_solution_dict:
+            algorithm_parameters = storage.execution_parameter_container.algorithm_parameter_list[exec_id][
+                'ALGORITHM_PARAMETERS']
+            exec_solution_dict[exec_id] = synthetic_data.generate_raw_result(random_state, scenario_parameters,
+                                                                             algorithm_parameters)
+    return storage
+
+
+def _count_reductions(monkeypatch):
+    reductions = []
+    reduce_single_solution = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer.reduce_single_solution
+
+    def counting_reduce_single_solution(self, solution):
+        reductions.append(solution)
+        return reduce_single_solution(self, solution)
+
+    monkeypatch.setattr(plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer, "reduce_single_solution",
+                        counting_reduce_single_solution)
+    return reductions
+
+
+def test_solution_digest_is_stable_across_pickling():
+    storage = _generate_raw_storage()
+    for exec_solution_dict in storage.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID].values():
+        for solution in exec_solution_dict.values():
+            assert (plot_data._compute_solution_digest(pickle.loads(pickle.dumps(solution))) ==
+                    plot_data._compute_solution_digest(solution))
+
+
+def test_incremental_reduction_of_unchanged_input_is_full_cache_hit(experiment_directories, monkeypatch):
+    input_dir, _ = experiment_directories
+    storage = _generate_raw_storage()
+    number_of_executions = sum(len(exec_solution_dict) for exec_solution_dict in
+                               storage.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID].values())
+    with open(os.path.join(input_dir, "raw.pickle"), "wb") as f:
+        pickle.dump(storage, f)
+    reductions = _count_reductions(monkeypatch)
+    reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(incremental=True)
+
+    first = reducer.reduce_randround_result_collection("raw.pickle")
+    assert len(reductions) == number_of_executions
+
+    del reductions[:]
+    second = reducer.reduce_randround_result_collection("raw.pickle")
+    assert len(reductions) == 0
+    assert pickle.dumps(second.algorithm_scenario_solution_dictionary) == \
+        pickle.dumps(first.algorithm_scenario_solution_dictionary)
+
+
+def test_incremental_reduction_discards_cache_of_other_version(experiment_directories, monkeypatch):
+    input_dir, _ = experiment_directories
+    storage = _generate_raw_storage()
+    number_of_executions = sum(len(exec_solution_dict) for exec_solution_dict in
+                               storage.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID].values())
+    with open(os.path.join(input_dir, "raw.pickle"), "wb") as f:
+        pickle.dump(storage, f)
+    reductions = _count_reductions(monkeypatch)
+    reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(incremental=True)
+    reducer.reduce_randround_result_collection("raw.pickle")
+
+    del reductions[:]
+    monkeypatch.setattr(plot_data, "REDUCTION_CACHE_VERSION", plot_data.REDUCTION_CACHE_VERSION + 1)
+    reducer.reduce_randround_result_collection("raw.pickle")
+    assert len(reductions) == number_of_executions
+
+    del reductions[:]
+    reducer.reduce_randround_result_collection("raw.pickle")
+    assert len(reductions) == 0
+
+
+def _get_records(scenario_solution_storage):
+    return {(alg, sc_id, ex_id): solution
+            for alg, scenario_solution_dict in scenario_solution_storage.algorithm_scenario_solution_dictionary.items()
+            for sc_id, ex_param_solution_dict in scenario_solution_dict.items()
+            for ex_id, solution in ex_param_solution_dict.items()}
+
+
+def test_parallel_reduction_matches_sequential_reduction(experiment_directories):
+    input_dir, _ = experiment_directories
+    with open(os.path.join(input_dir, "raw.pickle"), "wb") as f:
+        pickle.dump(_generate_raw_storage(), f)
+
+    sequential = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(number_of_workers=1)\
+        .reduce_randround_result_collection("raw.pickle", write_output_pickle=False)
+    parallel = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(number_of_workers=2)\
+        .reduce_randround_result_collection("raw.pickle", write_output_pickle=False)
+
+    assert _get_records(parallel) == _get_records(sequential)
+
+
+@pytest.mark.parametrize("number_of_workers", [1, 2])
+def test_streaming_reduction_of_split_pickles_matches_reduction(experiment_directories, number_of_workers):
+    input_dir, output_dir = experiment_directories
+    storage = _generate_raw_storage()
+    with open(os.path.join(input_dir, "raw.pickle"), "wb") as f:
+        pickle.dump(storage, f)
+    # two pickles covering disjoint scenarios, as written when executing the experiment in chunks of scenarios
+    scenario_solution_dict = storage.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID]
+    scenario_ids = sorted(scenario_solution_dict.keys())
+    chunk_paths = []
+    for chunk_index, chunk_scenario_ids in enumerate([scenario_ids[:2], scenario_ids[2:]]):
+        chunk = copy.copy(storage)
+        chunk.algorithm_scenario_solution_dictionary = {
+            synthetic_data.ALGORITHM_ID: {sc_id: scenario_solution_dict[sc_id] for sc_id in chunk_scenario_ids}}
+        chunk_paths.append(os.path.join(input_dir, "raw_{}.pickle".format(chunk_index)))
+        with open(chunk_paths[-1], "wb") as f:
+            pickle.dump(chunk, f)
+    plot_data.write_scenario_split_of_pickles(chunk_paths, os.path.join(input_dir, "raw_split"))
+
+    reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(number_of_workers=number_of_workers)
+    reduced_directory = reducer.reduce_randround_result_collection_streaming("raw_split")
+
+    assert reduced_directory == os.path.join(output_dir, "raw_split_reduced")
+    assert len(plot_data._get_scenario_split_files(reduced_directory)) == len(scenario_ids)
+    expected = reducer.reduce_randround_result_collection("raw.pickle", write_output_pickle=False)
+    assert _get_records(plot_data.read_scenario_split(reduced_directory)) == _get_records(expected)
+
+
+def test_parallel_reduction_traces_each_execution_in_the_workers(experiment_directories):
+    input_dir, _ = experiment_directories
+    storage = _generate_raw_storage()
+    number_of_executions = sum(len(exec_solution_dict) for exec_solution_dict in
+                               storage.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID].values())
+    with open(os.path.join(input_dir, "raw.pickle"), "wb") as f:
+        pickle.dump(storage, f)
+    reducer = plot_data.RandRoundSepLPOptDynVMPCollectionResultReducer(number_of_workers=2, incremental=True)
+
+    tracer.enable()
+    try:
+        reducer.reduce_randround_result_collection("raw.pickle", write_output_pickle=False)
+    finally:
+        tracer.disable()
+
+    execution_events = [event for event in tracer.events if event['name'] == "reduce execution"]
+    assert len(execution_events) == number_of_executions
+    assert all(event['pid'] != tracer.main_pid for event in execution_events)
+
+
+def test_split_of_pickles_with_overlapping_scenarios_is_rejected(tmp_path):
+    storage = _generate_raw_storage()
+    paths = []
+    for index in range(2):
+        paths.append(str(tmp_path / "raw_{}.pickle".format(index)))
+        with open(paths[-1], "wb") as f:
+            pickle.dump(storage, f)
+    with pytest.raises(ValueError):
+        plot_data.write_scenario_split_of_pickles(paths, str(tmp_path / "split"))
+
+
+def test_compute_aggregated_mean_weights_by_value_count():
+    from evaluation_acm_ccr_2019 import algorithm_heatmap_plots, runtime_evaluation
+    list_of_values = [[1.0], [2.0, 4.0, 6.0]]
+    list_of_aggregated_data = [plot_data.get_aggregated_data(values) for values in list_of_values]
+    for module in (algorithm_heatmap_plots, runtime_evaluation):
+        assert module.compute_aggregated_mean(list_of_aggregated_data) == pytest.approx(13.0 / 4)
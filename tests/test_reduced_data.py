@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from evaluation_acm_ccr_2019 import reduced_data
+
+
+def test_merged_aggregated_data_equals_aggregation_of_concatenated_values():
+    random_state = np.random.RandomState(0)
+    list_of_values = [list(random_state.lognormal(size=size)) for size in (1, 7, 30, 2)]
+
+    merged = reduced_data.merge_list_of_aggregated_data([reduced_data.get_aggregated_data(values)
+                                                         for values in list_of_values])
+
+    expected = reduced_data.get_aggregated_data([value for values in list_of_values for value in values])
+    assert merged.value_count == expected.value_count
+    for statistic in ("min", "mean", "max", "std_dev"):
+        assert getattr(merged, statistic) == pytest.approx(getattr(expected, statistic), rel=1e-12)
+
+
+def test_merging_with_empty_aggregated_data_returns_the_other():
+    aggregated_data = reduced_data.get_aggregated_data([1.0, 3.0])
+    empty = reduced_data.AggregatedData(min=np.nan, mean=np.nan, max=np.nan, std_dev=np.nan, value_count=0)
+    assert reduced_data.merge_aggregated_data(empty, aggregated_data) is aggregated_data
+    assert reduced_data.merge_aggregated_data(aggregated_data, empty) is aggregated_data
+    with pytest.raises(ValueError):
+        reduced_data.merge_list_of_aggregated_data([])
+
+
+class _Substrate(object):
+
+    def __init__(self, nodes, edges):
+        self.nodes = set(nodes)
+        self.edges = set(edges)
+        self.node = {u: {'supported_types': types} for u, types in nodes.items()}
+
+    def get_types(self):
+        return set(t for u in self.nodes for t in self.node[u]['supported_types'])
+
+
+class _Scenario(object):
+
+    def __init__(self, substrate):
+        self.substrate = substrate
+
+
+def _add_random_loads(scenario, resource_index):
+    """ Returns the loads of 20 random demands as dict of the resources and as slots and demands of the index. """
+    random_state = np.random.RandomState(0)
+    load_dict = {resource: 0.0 for resource in resource_index.resources}
+    slots = []
+    demands = []
+    for _ in range(20):
+        resource = resource_index.resources[random_state.randint(len(resource_index.resources))]
+        demand = random_state.uniform(0.0, 10.0)
+        load_dict[resource] += demand
+        slots.append(resource_index.get_slot(resource))
+        demands.append(demand)
+    return load_dict, slots, demands
+
+
+@pytest.mark.parametrize("edges", [[("u", "v"), ("v", "w"), ("w", "u")], []], ids=["with_edges", "without_edges"])
+def test_substrate_resource_index_accumulates_loads_per_resource(edges):
+    scenario = _Scenario(_Substrate({"u": ["t1", "t2"], "v": ["t1"], "w": []}, edges))
+    resource_index = reduced_data.SubstrateResourceIndex(scenario)
+    assert sorted(resource_index.resources) == sorted(edges + [("t1", "u"), ("t2", "u"), ("t1", "v")])
+
+    load_dict, slots, demands = _add_random_loads(scenario, resource_index)
+
+    load_vector = resource_index.compute_load_vector(slots, demands)
+    for resource, load in load_dict.items():
+        assert load_vector[resource_index.get_slot(resource)] == pytest.approx(load)
+    assert resource_index.get_max_node_and_edge_load(load_vector) == pytest.approx((
+        max([load_dict[edge] for edge in edges] + [0.0]),
+        max(load for resource, load in load_dict.items() if resource not in edges)))
+    with pytest.raises(ValueError):
+        resource_index.get_slot(("t2", "v"))
+
+
+def test_substrate_resource_index_loads_match_load_dict():
+    pytest.importorskip("alib")
+    pytest.importorskip("vnep_approx")
+    from evaluation_acm_ccr_2019 import plot_data
+    edges = [("u", "v"), ("v", "w"), ("w", "u")]
+    scenario = _Scenario(_Substrate({"u": ["t1", "t2"], "v": ["t1"], "w": []}, edges))
+    resource_index = reduced_data.SubstrateResourceIndex(scenario)
+
+    assert sorted(plot_data._initialize_load_dict(scenario).keys()) == sorted(resource_index.resources)
+    load_dict, slots, demands = _add_random_loads(scenario, resource_index)
+    assert resource_index.get_max_node_and_edge_load(resource_index.compute_load_vector(slots, demands)) == \
+        pytest.approx(plot_data.get_max_node_and_edge_load(load_dict, scenario.substrate))
+
+
+RR_SETTINGS = [("NONE", "RAND"), ("RECOMPUTATION_WITHOUT_SEPARATION", "RAND")]
+
+
+def _generate_reduced_solution(random_state, rr_settings):
+    def aggregated_data(number_of_values=3):
+        return reduced_data.get_aggregated_data(random_state.uniform(size=number_of_values))
+
+    solution = SimpleNamespace(lp_status="optimal", lp_time_dynvmp_computation=[aggregated_data(), aggregated_data()])
+    for field in reduced_data.ColumnarReducedRandRoundResults.SCALAR_FIELDS:
+        setattr(solution, field, random_state.uniform())
+    for field in reduced_data.ColumnarReducedRandRoundResults.AGGREGATED_FIELDS:
+        setattr(solution, field, aggregated_data())
+    for field in reduced_data.ColumnarReducedRandRoundResults.PER_RR_SETTING_FIELDS:
+        setattr(solution, field, {settings: aggregated_data() for settings in rr_settings})
+    return solution
+
+
+def test_columnar_results_round_trip(tmp_path):
+    random_state = np.random.RandomState(0)
+    # scenario 1 lacks the second setting, execution 1 of scenario 2 has no solution
+    scenario_solution_dict = {
+        0: {0: _generate_reduced_solution(random_state, RR_SETTINGS),
+            1: _generate_reduced_solution(random_state, RR_SETTINGS)},
+        1: {0: _generate_reduced_solution(random_state, RR_SETTINGS[:1])},
+        2: {0: _generate_reduced_solution(random_state, RR_SETTINGS), 1: None},
+    }
+    storage = SimpleNamespace(algorithm_scenario_solution_dictionary={"algorithm": scenario_solution_dict})
+    columnar = reduced_data.ColumnarReducedRandRoundResults.from_scenario_solution_storage(storage, "algorithm")
+    npz_path = str(tmp_path / "columnar.npz")
+    columnar.save(npz_path)
+
+    loaded = reduced_data.ColumnarReducedRandRoundResults.load(npz_path)
+
+    assert len(loaded) == 5
+    assert loaded.rr_settings_names == [reduced_data.get_rr_settings_name(settings) for settings in RR_SETTINGS]
+    assert sorted(loaded.columns.keys()) == sorted(columnar.columns.keys())
+    for column_name, values in columnar.columns.items():
+        np.testing.assert_array_equal(loaded[column_name], values, err_msg=column_name)
+
+    solution = scenario_solution_dict[0][1]
+    mask = loaded.get_mask(scenario_ids=[0], exec_ids=[1])
+    assert np.flatnonzero(mask).tolist() == [loaded.get_row(0, 1)]
+    assert loaded["lp_profit"][mask][0] == solution.lp_profit
+    assert loaded["latency_information_std_dev"][mask][0] == solution.latency_information.std_dev
+    for settings, aggregated_data in solution.profits.items():
+        assert loaded["profits_max"][mask, loaded.get_rr_setting_column(settings)][0] == aggregated_data.max
+    assert np.isnan(loaded["profits_max"][loaded.get_row(1, 0), loaded.get_rr_setting_column(RR_SETTINGS[1])])
+    assert loaded["has_solution"].tolist() == [True, True, True, True, False]
+    assert np.isnan(loaded["lp_profit"][loaded.get_row(2, 1)])
@@ -0,0 +1,52 @@
+import copy
+import sqlite3
+
+import pytest
+
+pytest.importorskip("alib")
+pytest.importorskip("vnep_approx")
+
+from evaluation_acm_ccr_2019 import sqlite_export, synthetic_data
+
+
+@pytest.fixture(scope="module")
+def storages():
+    return synthetic_data.generate_latency_study_storages(scenario_repetition=1)
+
+
+def _count_rows(storage):
+    return sum(len(solution.profits) if solution is not None else 1
+               for exec_solution_dict in storage.algorithm_scenario_solution_dictionary[synthetic_data.ALGORITHM_ID].values()
+               for solution in exec_solution_dict.values())
+
+
+def test_export_writes_one_row_per_solution_and_setting(tmp_path, storages):
+    baseline, with_latencies = storages
+    database_path = str(tmp_path / "results.sqlite")
+
+    number_of_rows = sqlite_export.export_reduced_storages_to_sqlite(
+        database_path, [("baseline", baseline), ("with_latencies", with_latencies)], synthetic_data.ALGORITHM_ID)
+
+    assert number_of_rows == _count_rows(baseline) + _count_rows(with_latencies)
+    connection = sqlite3.connect(database_path)
+    try:
+        rows_by_source = dict(connection.execute("SELECT source, COUNT(*) FROM {} GROUP BY source".format(
+            sqlite_export.RESULTS_TABLE_NAME)).fetchall())
+    finally:
+        connection.close()
+    assert rows_by_source == {"baseline": _count_rows(baseline), "with_latencies": _count_rows(with_latencies)}
+
+
+def test_parameter_named_like_a_column_is_rejected(tmp_path, storages):
+    baseline, with_latencies = storages
+    with_latencies = copy.copy(with_latencies)
+    with_latencies.execution_parameter_container = copy.deepcopy(with_latencies.execution_parameter_container)
+    with_latencies.execution_parameter_container.algorithm_parameter_list[0]['ALGORITHM_PARAMETERS'][
+        'rounding_order'] = "RAND"
+    database_path = tmp_path / "results.sqlite"
+
+    with pytest.raises(ValueError, match="rounding_order"):
+        sqlite_export.export_reduced_storages_to_sqlite(
+            str(database_path), [("baseline", baseline), ("with_latencies", with_latencies)],
+            synthetic_data.ALGORITHM_ID)
+    assert not database_path.exists()
@@ -0,0 +1,68 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from evaluation_acm_ccr_2019.tracing import tracer, traced, dispatch_traced
+
+
+@pytest.fixture
+def enabled_tracer():
+    tracer.enable()
+    try:
+        yield tracer
+    finally:
+        tracer.disable()
+
+
+@traced("square", category="test")
+def _square(value):
+    with tracer.span("inner", category="test", value=value):
+        return value * value
+
+
+def test_disabled_tracer_records_nothing():
+    tracer.disable()
+    number_of_events = len(tracer.events)
+    assert _square(3) == 9
+    assert len(tracer.events) == number_of_events
+
+
+def test_spans_are_recorded_as_complete_events(enabled_tracer):
+    assert _square(3) == 9
+
+    inner, outer = enabled_tracer.events
+    assert (outer['name'], outer['cat'], outer['ph']) == ("square", "test", "X")
+    assert inner['name'] == "inner" and inner['args'] == {"value": "3"}
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+    assert outer['pid'] == enabled_tracer.main_pid == os.getpid()
+
+
+def test_dispatched_calls_are_traced_in_the_workers(enabled_tracer, tmp_path):
+    pool = multiprocessing.Pool(processes=2)
+    try:
+        results = list(dispatch_traced(pool.imap, _square, range(6)))
+    finally:
+        pool.close()
+        pool.join()
+
+    assert results == [value * value for value in range(6)]
+    square_events = [event for event in enabled_tracer.events if event['name'] == "square"]
+    assert len(square_events) == 6
+    assert all(event['pid'] != enabled_tracer.main_pid for event in square_events)
+
+    trace_path = str(tmp_path / "trace.json")
+    enabled_tracer.write(trace_path)
+    with open(trace_path) as f:
+        trace = json.load(f)
+    process_labels = {event['pid']: event['args']['name'] for event in trace['traceEvents'] if event['ph'] == "M"}
+    assert process_labels[enabled_tracer.main_pid] == "evaluation"
+    assert set(process_labels[event['pid']] for event in square_events) == {"worker"}
+
+
+def test_dispatch_without_tracing_only_maps():
+    tracer.disable()
+    number_of_events = len(tracer.events)
+    assert list(dispatch_traced(map, _square, range(3))) == [0, 1, 4]
+    assert len(tracer.events) == number_of_events